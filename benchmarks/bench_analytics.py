@@ -0,0 +1,96 @@
+"""
+Analytics benchmark.
+
+Loads 1M synthetic bookings into NumPy columns and times each report in
+utils/analytics.py on them. Room usage is timed both through the SQL report that
+/api/rooms/usage runs and through room_utilization below, a NumPy version the route
+no longer uses, and the two are checked to agree.
+
+    python -m benchmarks.bench_analytics
+"""
+import os
+import tempfile
+import time
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from benchmarks.synthetic import make_bookings, make_database
+from database.models import Room
+from database.types import minutes
+from utils.analytics import BookingColumns, count_days, daily_occupancy, hourly_load, length_histogram, load_columns, window
+from utils.datetime import to_epoch_minutes
+from utils.usage import calculate_percentage_per_room
+
+BOOKINGS = 1_000_000
+REPEAT = 5
+
+def room_utilization(columns: BookingColumns, rooms: list, room_ids: list = None) -> dict:
+    """
+    Calculates time each room was used against open as a percentage
+
+    Booked minutes are summed per room with one bincount. Like the SQL report, the time
+    available is the room's daily open minutes times the days on which any booking starts.
+
+    Args:
+        columns (BookingColumns): The bookings to count.
+        rooms (list): (room_id, open minutes per day) for every room.
+        room_ids (list, optional): Only report these rooms.
+    """
+    booked = np.bincount(columns.id_room, weights=columns.end - columns.start) if len(columns.id_room) else np.zeros(0)
+    days_in_range = count_days(columns)
+
+    percentage_dict = {}
+    for room_id, open_minutes in rooms:
+        if room_ids and room_id not in room_ids:
+            continue
+        booked_minutes = booked[room_id] if room_id < len(booked) else 0
+        available_minutes = open_minutes * days_in_range
+        if available_minutes == 0:
+            percentage = 0.0
+        else:
+            percentage = round((float(booked_minutes) / available_minutes) * 100, 0)
+        percentage_dict[room_id] = f'{percentage}%'
+    return percentage_dict
+
+def best_of(function):
+    seconds = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        result = function()
+        seconds.append(time.perf_counter() - started)
+    return result, min(seconds)
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        engine = make_database(f'sqlite:///{os.path.join(directory, "bench.db")}', make_bookings(BOOKINGS))
+        with Session(engine) as session:
+            rooms = session.execute(select(Room.room_id, minutes(Room.closing) - minutes(Room.opening))).all()
+            open_minutes = sum(room_open for _, room_open in rooms)
+            july = (to_epoch_minutes('2023-07-01T00:00Z'), to_epoch_minutes('2023-08-01T00:00Z'))
+
+            cases = [
+                ('sql usage', lambda: calculate_percentage_per_room(session)),
+                ('sql usage/july', lambda: calculate_percentage_per_room(session, *july)),
+                ('load columns', lambda: load_columns(session)),
+            ]
+            columns = load_columns(session)
+            cases += [
+                ('numpy usage', lambda: room_utilization(columns, rooms)),
+                ('numpy usage/july', lambda: room_utilization(window(columns, *july), rooms)),
+                ('daily occupancy', lambda: daily_occupancy(columns, open_minutes)),
+                ('hourly load', lambda: hourly_load(columns)),
+                ('length histogram', lambda: length_histogram(columns)),
+            ]
+            print(f'{"report":<20}{"bookings":>10}{"seconds":>10}')
+            results = {}
+            for name, function in cases:
+                results[name], seconds = best_of(function)
+                print(f'{name:<20}{BOOKINGS:>10}{seconds:>10.4f}')
+            assert results['numpy usage'] == results['sql usage']
+            assert results['numpy usage/july'] == results['sql usage/july']
+        engine.dispose()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Concurrency benchmark.
+
+Drives the app in-process with 50 to 200 concurrent clients and reports
+requests/second for the async database layer, against the previous pattern of
+an 'async def' route calling the synchronous Session, which blocks the event
+loop for every query. Two endpoints are measured: a paged /api/bookings listing,
+where time goes to ORM hydration and JSON encoding, and /api/rooms/usage, where
+time goes to SQLite itself.
+
+    python -m benchmarks.bench_concurrency
+"""
+import asyncio
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import make_bookings, make_database
+
+CONCURRENCY = [50, 100, 200]
+REQUESTS = 1_000
+BOOKINGS = 100_000
+PAGE_SIZE = 100
+
+def blocking_app():
+    """
+    The two routes with synchronous Session queries inside 'async def' handlers.
+    """
+    from fastapi import FastAPI
+
+    from database.db import Session
+    from database.models import Booking
+    from utils.usage import calculate_percentage_per_room
+
+    app = FastAPI()
+
+    @app.get('/api/bookings/')
+    async def get_all_bookings(limit: int, after: int) -> dict:
+        with Session() as session:
+            bookings = session.query(Booking).order_by(Booking.id).filter(Booking.id > after).limit(limit).all()
+            return {"All bookings": bookings, "Next cursor": bookings[-1].id}
+
+    @app.get('/api/rooms/usage')
+    async def get_rooms_usage() -> dict:
+        with Session() as session:
+            return {'Usage percentage by room': calculate_percentage_per_room(session)}
+
+    return app
+
+def listing_request(number: int):
+    return '/api/bookings/', {'limit': PAGE_SIZE, 'after': number * PAGE_SIZE % (BOOKINGS - PAGE_SIZE)}
+
+def usage_request(number: int):
+    return '/api/rooms/usage', {}
+
+async def drive(app, make_request, concurrency: int) -> float:
+    import httpx
+
+    queue = asyncio.Queue()
+    for number in range(REQUESTS):
+        queue.put_nowait(make_request(number))
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://bench') as client:
+        async def worker():
+            while not queue.empty():
+                url, params = queue.get_nowait()
+                response = await client.get(url, params=params)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return REQUESTS / (time.perf_counter() - started)
+
+async def run(apps):
+    print(f'{"endpoint":<10}{"layer":<8}{"clients":>10}{"req/s":>12}')
+    for endpoint, make_request in (('listing', listing_request), ('usage', usage_request)):
+        for concurrency in CONCURRENCY:
+            for name, app in apps:
+                requests_per_second = await drive(app, make_request, concurrency)
+                print(f'{endpoint:<10}{name:<8}{concurrency:>10}{requests_per_second:>12.1f}')
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.db')
+        make_database(f'sqlite:///{path}', make_bookings(BOOKINGS)).dispose()
+        os.environ['COWORKING_DB_PATH'] = path
+
+        from database.db import async_sqlite_engine
+        from main import app
+
+        async def run_and_dispose():
+            await run([('sync', blocking_app()), ('async', app)])
+            await async_sqlite_engine.dispose()
+
+        asyncio.run(run_and_dispose())
+
+if __name__ == '__main__':
+    main()
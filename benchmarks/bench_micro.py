@@ -0,0 +1,87 @@
+"""
+Micro-benchmarks, pytest-benchmark style.
+
+Times check_overlap, calculate_percentage_per_room and convert_time on seeded synthetic
+data at several scales and overlap densities. With pytest-benchmark installed its
+'benchmark' fixture is used, with its statistics and --benchmark-compare; without it a
+minimal stand-in reports the best of a few rounds. Not collected by the test suite; run:
+
+    python -m pytest benchmarks/bench_micro.py
+"""
+import timeit
+
+import pytest
+from sqlalchemy.orm import Session
+
+from benchmarks.synthetic import iter_bookings, make_database
+from utils.datetime import convert_time, to_epoch_minutes
+from utils.overlap import check_overlap
+from utils.usage import calculate_percentage_per_room
+
+try:
+    import pytest_benchmark
+except ImportError:
+    pytest_benchmark = None
+
+OVERLAP_SIZES = [1_000, 10_000, 100_000]
+OVERLAP_DENSITIES = [0.0, 0.5]
+USAGE_BOOKINGS = 100_000
+TIMESTAMPS = 10_000
+ROUNDS = 5
+
+if pytest_benchmark is None:
+    class Benchmark:
+        """
+        Calls a function a few rounds and reports the best time, as benchmark(function, *args) does.
+        """
+
+        def __init__(self, name: str, capsys):
+            self.name = name
+            self.capsys = capsys
+
+        def __call__(self, function, *args, **kwargs):
+            result = function(*args, **kwargs)
+            seconds = min(timeit.repeat(lambda: function(*args, **kwargs), number=1, repeat=ROUNDS))
+            with self.capsys.disabled():
+                print(f'\n{self.name:<60}{seconds * 1e3:>12.3f} ms', end='')
+            return result
+
+    @pytest.fixture
+    def benchmark(request, capsys):
+        return Benchmark(request.node.name, capsys)
+
+def rooms_for(size: int) -> int:
+    return max(10, size // 1_000)
+
+@pytest.mark.parametrize('overlap', OVERLAP_DENSITIES)
+@pytest.mark.parametrize('size', OVERLAP_SIZES)
+def test_check_overlap(benchmark, size, overlap):
+    intervals = [
+        (booking, to_epoch_minutes(booking.start), to_epoch_minutes(booking.end), 1)
+        for booking in iter_bookings(size, rooms=rooms_for(size), overlap=overlap)
+    ]
+    result = benchmark(check_overlap, intervals, limit=100)
+    assert result
+
+@pytest.fixture(scope='module')
+def usage_session(tmp_path_factory):
+    path = tmp_path_factory.mktemp('usage') / 'bench.db'
+    engine = make_database(f'sqlite:///{path}', iter_bookings(USAGE_BOOKINGS))
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+@pytest.mark.parametrize('window', [
+    (None, None),
+    ('2023-03-01T00:00Z', '2023-06-01T00:00Z'),
+    ('2023-03-01T12:00Z', '2023-06-01T12:00Z'),
+], ids=['all', 'whole-days', 'part-days'])
+def test_calculate_percentage_per_room(benchmark, usage_session, window):
+    start, end = (None if bound is None else to_epoch_minutes(bound) for bound in window)
+    result = benchmark(calculate_percentage_per_room, usage_session, start, end)
+    assert len(result) == 50
+
+def test_convert_time(benchmark):
+    times = [booking.start for booking in iter_bookings(TIMESTAMPS)]
+    result = benchmark(lambda: [convert_time(time) for time in times])
+    assert len(result) == TIMESTAMPS
@@ -0,0 +1,64 @@
+"""
+Overlap detection benchmark.
+
+Times the sweep-line engine from 1k to 1M synthetic bookings, and the previous
+pairwise scan up to the sizes where it still finishes in reasonable time.
+The sweep is fed epoch minutes, as read from the database; the pairwise scan
+parses the strings on every comparison, as it used to.
+
+    python -m benchmarks.bench_overlap
+"""
+import time
+
+from benchmarks.bench_timestamps import previous_convert_time
+from benchmarks.synthetic import make_bookings
+from utils.datetime import to_epoch_minutes
+from utils.overlap import find_overlapping_pairs
+
+SWEEP_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+PAIRWISE_SIZES = [500, 1_000, 2_000]
+
+def overlap(booking1, booking2):
+    """
+    The previous pairwise predicate, parsing all four timestamps on every call.
+    """
+    if booking1.id_room != booking2.id_room:
+        return False
+    start1 = previous_convert_time(booking1.start)
+    end1 = previous_convert_time(booking1.end)
+    start2 = previous_convert_time(booking2.start)
+    end2 = previous_convert_time(booking2.end)
+    return start1 < end2 and start2 < end1
+
+def pairwise_pairs(bookings):
+    """
+    Returns every overlapping (i, j) pair by comparing each booking with every other one.
+    """
+    pairs = []
+    for i, booking1 in enumerate(bookings):
+        for j, booking2 in enumerate(bookings):
+            if i != j and overlap(booking1, booking2):
+                pairs.append((booking1, booking2))
+    return pairs
+
+def timed(function, bookings):
+    started = time.perf_counter()
+    pairs = function(bookings)
+    return time.perf_counter() - started, len(pairs)
+
+def main():
+    print(f'{"engine":<10}{"bookings":>12}{"pairs":>12}{"seconds":>12}')
+    for size in SWEEP_SIZES:
+        bookings = make_bookings(size, rooms=max(10, size // 1_000))
+        intervals = [
+            (booking, to_epoch_minutes(booking.start), to_epoch_minutes(booking.end), 1) for booking in bookings
+        ]
+        seconds, pairs = timed(find_overlapping_pairs, intervals)
+        print(f'{"sweep":<10}{size:>12}{pairs:>12}{seconds:>12.3f}')
+    for size in PAIRWISE_SIZES:
+        bookings = make_bookings(size, rooms=max(10, size // 1_000))
+        seconds, pairs = timed(pairwise_pairs, bookings)
+        print(f'{"pairwise":<10}{size:>12}{pairs // 2:>12}{seconds:>12.3f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Listing serialization benchmark.
+
+Times GET /api/bookings for a 100k-booking listing, in-process, against two
+earlier ways of writing the route: returning ORM objects for FastAPI's
+jsonable_encoder and the stdlib JSON encoder, and returning column rows
+validated through the BookingPage response model. Each path is checked to
+send the same bookings.
+
+    python -m benchmarks.bench_serialization
+"""
+import asyncio
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import make_bookings, make_database
+
+BOOKINGS = 100_000
+REPEAT = 3
+
+def previous_apps():
+    """
+    Builds one app per earlier listing route: ORM objects, and rows validated by BookingPage.
+    """
+    from fastapi import Depends, FastAPI
+    from fastapi.responses import JSONResponse
+    from sqlalchemy import select
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from database.db import get_db_session
+    from database.models import Booking
+    from database.schemas import BookingPage
+    from routers.booking_routes import BOOKING_COLUMNS
+
+    orm_app = FastAPI(default_response_class=JSONResponse)
+
+    @orm_app.get('/api/bookings/')
+    async def get_bookings_as_orm(session: AsyncSession = Depends(get_db_session)) -> dict:
+        return {'All bookings': (await session.scalars(select(Booking).order_by(Booking.id))).all()}
+
+    validated_app = FastAPI()
+
+    @validated_app.get('/api/bookings/')
+    async def get_bookings_validated(session: AsyncSession = Depends(get_db_session)) -> BookingPage:
+        rows = await session.execute(select(*BOOKING_COLUMNS).order_by(Booking.id))
+        return {'All bookings': [row._asdict() for row in rows]}
+
+    return orm_app, validated_app
+
+async def time_listing(app):
+    import httpx
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://bench') as client:
+        seconds = []
+        for _ in range(REPEAT):
+            started = time.perf_counter()
+            response = await client.get('/api/bookings/')
+            seconds.append(time.perf_counter() - started)
+            response.raise_for_status()
+    return min(seconds), response
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.db')
+        make_database(f'sqlite:///{path}', make_bookings(BOOKINGS)).dispose()
+        os.environ['COWORKING_DB_PATH'] = path
+
+        from database.db import async_sqlite_engine
+        from main import app
+
+        async def run():
+            orm_app, validated_app = previous_apps()
+            print(f'{"path":<12}{"bookings":>10}{"seconds":>10}{"MB":>8}')
+            expected = None
+            for name, application in (('orm', orm_app), ('validated', validated_app), ('current', app)):
+                seconds, response = await time_listing(application)
+                bookings = sorted(response.json()['All bookings'], key=lambda booking: booking['id'])
+                bookings = [dict(sorted(booking.items())) for booking in bookings]
+                expected = expected or bookings
+                assert bookings == expected
+                print(f'{name:<12}{BOOKINGS:>10}{seconds:>10.3f}{len(response.content) / 1e6:>8.1f}')
+            await async_sqlite_engine.dispose()
+
+        asyncio.run(run())
+
+if __name__ == '__main__':
+    main()
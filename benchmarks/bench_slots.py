@@ -0,0 +1,90 @@
+"""
+Free-slot search benchmark.
+
+Times /api/rooms/slots' search over a month-long window for a growing number of
+rooms, against the previous way of drawing a calendar: one availability lookup
+per room per half hour. The lookups run for the first 25 rooms only and their
+time is scaled up to all rooms; both paths are checked to agree on which half
+hours of those rooms are free. Every room count gets its own database.
+
+    python -m benchmarks.bench_slots
+"""
+import asyncio
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import make_bookings, make_database
+from database.engine import create_async_sqlite_engine
+from utils.datetime import to_epoch_minutes
+from utils.slots import MINUTES_PER_DAY, find_free_slots
+
+ROOMS = [50, 200, 500]
+BOOKINGS_PER_ROOM = 400
+WINDOW = ('2023-07-01T00:00Z', '2023-08-01T00:00Z')
+STEP = 30
+SAMPLED_ROOMS = 25
+
+async def previous_free_half_hours(session, start: int, end: int):
+    """
+    One lookup per room per half hour, as the booking UI did with /availability.
+    """
+    from sqlalchemy import select
+
+    from database.models import Booking, Room
+    from database.types import minutes
+
+    free = set()
+    rooms = (await session.execute(
+        select(Room.room_id, minutes(Room.opening), minutes(Room.closing)).where(Room.room_id <= SAMPLED_ROOMS)
+    )).all()
+    for room_id, opening, closing in rooms:
+        for moment in range(start, end, STEP):
+            if not opening <= moment % MINUTES_PER_DAY < closing:
+                continue
+            busy = await session.scalar(
+                select(Booking.id)
+                .where(Booking.id_room == room_id, Booking.start < moment + STEP, Booking.end > moment)
+                .limit(1)
+            )
+            if busy is None:
+                free.add((room_id, moment))
+    return free
+
+def half_hours(slots):
+    return {
+        (room_id, moment)
+        for room_id, slot_start, slot_end in slots
+        for moment in range(slot_start, slot_end - STEP + 1, STEP)
+    }
+
+async def run(path: str, rooms: int):
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    engine = create_async_sqlite_engine(path)
+    start, end = (to_epoch_minutes(bound) for bound in WINDOW)
+    async with AsyncSession(engine) as session:
+        started = time.perf_counter()
+        slots = await find_free_slots(session, start, end, STEP)
+        slot_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        previous = await previous_free_half_hours(session, start, end)
+        previous_seconds = time.perf_counter() - started
+    await engine.dispose()
+
+    assert {free for free in half_hours(slots) if free[0] <= SAMPLED_ROOMS} == previous
+    return slot_seconds, previous_seconds * rooms / SAMPLED_ROOMS, len(slots)
+
+def main():
+    print(f'{"rooms":>8}{"bookings":>12}{"slots":>10}{"search s":>12}{"per-probe s":>14}  (per-probe time projected from 25 rooms)')
+    for rooms in ROOMS:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bench.db')
+            bookings = make_bookings(rooms * BOOKINGS_PER_ROOM, rooms=rooms)
+            make_database(f'sqlite:///{path}', bookings, rooms=rooms).dispose()
+            slot_seconds, previous_seconds, count = asyncio.run(run(path, rooms))
+            print(f'{rooms:>8}{len(bookings):>12}{count:>10}{slot_seconds:>12.3f}{previous_seconds:>14.3f}')
+
+if __name__ == '__main__':
+    main()
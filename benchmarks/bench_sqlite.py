@@ -0,0 +1,97 @@
+"""
+SQLite profile benchmark.
+
+Compares SQLite's defaults (rollback journal, synchronous=FULL) with the PRAGMA
+profile from database.engine on a temporary database file:
+
+- write: single-booking insert + commit, as make_new_booking does;
+- mixed: one writer thread committing while reader threads run indexed
+  range queries, reporting both throughputs.
+
+    python -m benchmarks.bench_sqlite
+"""
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import OperationalError
+
+from benchmarks.synthetic import make_bookings, make_database
+from database.engine import create_sqlite_engine, sqlite_pragmas
+from database.models import Booking
+from database.types import minutes
+
+BOOKINGS = 100_000
+WRITES = 1_000
+MIXED_SECONDS = 5
+READERS = 4
+
+PROFILES = {
+    'default': {},
+    'tuned': sqlite_pragmas(),
+}
+
+def new_booking(number: int) -> dict:
+    return {'id_room': number % 50 + 1, 'id_client': 1,
+            'start': 28_000_000 + number * 60, 'end': 28_000_000 + number * 60 + 30}
+
+def write_throughput(engine) -> float:
+    started = time.perf_counter()
+    for number in range(WRITES):
+        with engine.begin() as connection:
+            connection.execute(insert(Booking), new_booking(number))
+    return WRITES / (time.perf_counter() - started)
+
+def mixed_throughput(engine):
+    stop = threading.Event()
+    counts = {'reads': 0, 'writes': 0, 'busy': 0}
+
+    def writer():
+        number = WRITES
+        while not stop.is_set():
+            try:
+                with engine.begin() as connection:
+                    connection.execute(insert(Booking), new_booking(number))
+                counts['writes'] += 1
+            except OperationalError:
+                counts['busy'] += 1
+            number += 1
+
+    def reader(room_id: int):
+        query = select(func.count(), func.sum(minutes(Booking.end) - minutes(Booking.start))).where(
+            Booking.id_room == room_id, Booking.start >= '2023-03-01T00:00Z', Booking.start < '2023-04-01T00:00Z'
+        )
+        while not stop.is_set():
+            try:
+                with engine.connect() as connection:
+                    connection.execute(query).one()
+                counts['reads'] += 1
+            except OperationalError:
+                counts['busy'] += 1
+
+    threads = [threading.Thread(target=writer)]
+    threads += [threading.Thread(target=reader, args=(room_id,)) for room_id in range(1, READERS + 1)]
+    for thread in threads:
+        thread.start()
+    time.sleep(MIXED_SECONDS)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return counts['reads'] / MIXED_SECONDS, counts['writes'] / MIXED_SECONDS, counts['busy']
+
+def main():
+    print(f'{"profile":<10}{"commits/s":>12}{"mixed reads/s":>16}{"mixed writes/s":>16}{"busy errors":>13}')
+    for name, pragmas in PROFILES.items():
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bench.db')
+            make_database(f'sqlite:///{path}', make_bookings(BOOKINGS)).dispose()
+            engine = create_sqlite_engine(path, pragmas=pragmas, pool_size=READERS + 1)
+            commits = write_throughput(engine)
+            reads, writes, busy = mixed_throughput(engine)
+            engine.dispose()
+        print(f'{name:<10}{commits:>12.1f}{reads:>16.1f}{writes:>16.1f}{busy:>13}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Timestamp parsing micro-benchmarks.
+
+Compares the previous strptime-based convert_time with the fixed-offset parser in
+utils/timestamps.py, its LRU-cached variant and parse_many, on 100k synthetic
+booking times (which repeat, as real booking columns do) and on 100k distinct
+times. Every path is checked to produce the same epoch minutes.
+
+    python -m benchmarks.bench_timestamps
+"""
+import timeit
+from datetime import datetime, timedelta
+
+from benchmarks.synthetic import make_bookings
+from utils.timestamps import np, parse_many, parse_minutes, parse_minutes_cached
+
+SIZE = 100_000
+REPEAT = 5
+EPOCH = datetime(1970, 1, 1)
+
+def previous_convert_time(time: str):
+    """
+    Parses a timestamp by rebuilding it as 'YYYY-MM-DD HH:MM' for strptime.
+    """
+    return datetime.strptime(time.split('T')[0] + ' ' + time.split('T')[1][:-1], '%Y-%m-%d %H:%M')
+
+def previous_to_epoch_minutes(time: str) -> int:
+    return (previous_convert_time(time) - EPOCH) // timedelta(minutes=1)
+
+def columns():
+    repeated = [booking.start for booking in make_bookings(SIZE)]
+    first = datetime(2000, 1, 1)
+    distinct = [(first + timedelta(minutes=7 * number)).strftime('%Y-%m-%dT%H:%MZ') for number in range(SIZE)]
+    return {'repeated': repeated, 'distinct': distinct}
+
+def paths():
+    yield 'strptime', lambda values: [previous_to_epoch_minutes(value) for value in values]
+    yield 'fixed', lambda values: [parse_minutes(value) for value in values]
+    yield 'fixed+lru', lambda values: [parse_minutes_cached(value) for value in values]
+    yield 'parse_many', parse_many
+    if np is not None:
+        yield 'parse_many/np', lambda values: parse_many(values, numpy=True)
+
+def main():
+    print(f'{"path":<16}{"column":<10}{"seconds":>10}{"ns/value":>10}')
+    for name, column in columns().items():
+        expected = [previous_to_epoch_minutes(value) for value in column]
+        for path, function in paths():
+            parse_minutes_cached.cache_clear()
+            assert list(function(column)) == expected
+            seconds = min(timeit.repeat(lambda: function(column), number=1, repeat=REPEAT))
+            print(f'{path:<16}{name:<10}{seconds:>10.3f}{seconds / SIZE * 1e9:>10.0f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Room usage benchmark.
+
+Compares the room_daily_usage rollup behind /api/rooms/usage with the grouped
+SQL aggregate over every booking, and with the first implementation, which loaded
+every booking three times and summed durations in Python. Every size is seeded
+into a new database.
+
+    python -m benchmarks.bench_usage
+"""
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import timedelta
+
+from sqlalchemy.orm import Session
+
+from benchmarks.synthetic import make_bookings, make_database
+from database.models import Booking, Room
+from database.types import minutes
+from utils.usage import MINUTES_PER_DAY, calculate_percentage_per_room, percentages, room_usage_query
+
+SIZES = [10_000, 100_000, 500_000]
+
+def previous_percentage_per_room(session: Session):
+    """
+    Sums booked time per room in Python, reading the bookings table twice.
+    """
+    rooms_open_hours = {
+        room_id: (closing - opening) / 60
+        for room_id, opening, closing in session.query(Room.room_id, minutes(Room.opening), minutes(Room.closing))
+    }
+    num_unique_dates = len(set(start // MINUTES_PER_DAY for start, in session.query(minutes(Booking.start))))
+    bookings_per_room = {}
+    for room_id, start, end in session.query(Booking.id_room, minutes(Booking.start), minutes(Booking.end)):
+        bookings_per_room[room_id] = bookings_per_room.get(room_id, timedelta()) + timedelta(minutes=end - start)
+
+    percentage_dict = {}
+    for room_id, hours in rooms_open_hours.items():
+        open_time = timedelta(hours=hours * num_unique_dates)
+        if room_id in bookings_per_room and open_time.total_seconds() != 0:
+            percentage = round((bookings_per_room[room_id].total_seconds() / open_time.total_seconds()) * 100, 0)
+        else:
+            percentage = 0.0
+        percentage_dict[room_id] = f'{percentage}%'
+    return percentage_dict
+
+def measure(function, engine):
+    with Session(engine) as session:
+        tracemalloc.start()
+        started = time.perf_counter()
+        result = function(session)
+        seconds = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, seconds, peak / 1_000_000
+
+def main():
+    print(f'{"path":<12}{"bookings":>12}{"seconds":>12}{"peak MB":>12}')
+    for size in SIZES:
+        with tempfile.TemporaryDirectory() as directory:
+            engine = make_database(f'sqlite:///{os.path.join(directory, "bench.db")}', make_bookings(size))
+            previous, seconds, peak = measure(previous_percentage_per_room, engine)
+            print(f'{"python":<12}{size:>12}{seconds:>12.3f}{peak:>12.1f}')
+            aggregate, seconds, peak = measure(lambda session: percentages(session.execute(room_usage_query())), engine)
+            print(f'{"sql":<12}{size:>12}{seconds:>12.3f}{peak:>12.1f}')
+            current, seconds, peak = measure(calculate_percentage_per_room, engine)
+            print(f'{"rollup":<12}{size:>12}{seconds:>12.3f}{peak:>12.1f}')
+            assert previous == aggregate == current
+            engine.dispose()
+
+if __name__ == '__main__':
+    main()
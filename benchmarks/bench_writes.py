@@ -0,0 +1,105 @@
+"""
+Booking write benchmark.
+
+Times POST /api/bookings/make one request at a time, in-process, against a copy
+of the previous write path: separate client, room and conflict lookups before
+the insert, and a SELECT of the new row after the commit. Reports per-write
+latency and the number of SQL statements each write sends, with 100k bookings
+already stored.
+
+    python -m benchmarks.bench_writes
+"""
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+from benchmarks.synthetic import make_bookings, make_database
+
+WRITES = 1_000
+ROOMS = 50
+BOOKINGS = 100_000
+
+def previous_app():
+    """
+    Builds an app whose booking route looks up the client, room and conflicts one query at a time.
+    """
+    from fastapi import Depends, FastAPI, Form
+    from sqlalchemy import select
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from database.db import get_db_session
+    from database.models import Booking, Client, Room
+    from database.rollups import add_usage, usage_increments
+    from database.types import minutes
+    from utils.conflicts import find_conflict, within_opening_hours
+    from utils.datetime import to_epoch_minutes
+
+    app = FastAPI()
+
+    @app.post('/api/bookings/make')
+    async def make_new_booking(
+        id_room: int = Form(...), id_client: int = Form(...), start: str = Form(...), end: str = Form(...),
+        session: AsyncSession = Depends(get_db_session)
+    ) -> dict:
+        start_minutes, end_minutes = to_epoch_minutes(start), to_epoch_minutes(end)
+        await session.connection(execution_options={'sqlite_begin': 'IMMEDIATE'})
+        assert await session.scalar(select(Client).where(Client.client_id == id_client))
+        opening_hours = (await session.execute(
+            select(minutes(Room.opening), minutes(Room.closing)).where(Room.room_id == id_room)
+        )).first()
+        assert within_opening_hours(*opening_hours, start_minutes, end_minutes)
+        assert await find_conflict(session, id_room, start_minutes, end_minutes) is None
+        new_booking = Booking(id_room=id_room, id_client=id_client, start=start, end=end)
+        session.add(new_booking)
+        await session.execute(add_usage(), usage_increments([(id_room, start_minutes, end_minutes)]))
+        await session.commit()
+        added_booking = await session.scalar(select(Booking).where(Booking.id == new_booking.id))
+        return {'Booking confirmed': added_booking}
+
+    return app
+
+def booking_form(number: int, first_day: date) -> dict:
+    day = (first_day + timedelta(days=number // ROOMS)).isoformat()
+    return {'id_room': number % ROOMS + 1, 'id_client': 1, 'start': f'{day}T10:00Z', 'end': f'{day}T11:00Z'}
+
+async def drive(app, first_day: date, engine):
+    import httpx
+    from sqlalchemy import event
+
+    statements = []
+    listener = lambda *args: statements.append(1)
+    event.listen(engine.sync_engine, 'before_cursor_execute', listener)
+    latencies = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://bench') as client:
+        for number in range(WRITES):
+            started = time.perf_counter()
+            response = await client.post('/api/bookings/make', data=booking_form(number, first_day))
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+    event.remove(engine.sync_engine, 'before_cursor_execute', listener)
+    return latencies, len(statements) / WRITES
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.db')
+        make_database(f'sqlite:///{path}', make_bookings(BOOKINGS, rooms=ROOMS), rooms=ROOMS).dispose()
+        os.environ['COWORKING_DB_PATH'] = path
+
+        from database.db import async_sqlite_engine
+        from main import app
+
+        async def run():
+            print(f'{"path":<10}{"writes":>8}{"mean ms":>10}{"p50 ms":>10}{"p95 ms":>10}{"SQL/write":>11}')
+            for name, application, first_day in (('previous', previous_app(), date(2030, 1, 1)), ('current', app, date(2040, 1, 1))):
+                latencies, statements = await drive(application, first_day, async_sqlite_engine)
+                p50, p95 = (statistics.quantiles(latencies, n=100)[index] * 1000 for index in (49, 94))
+                print(f'{name:<10}{WRITES:>8}{statistics.mean(latencies) * 1000:>10.2f}{p50:>10.2f}{p95:>10.2f}{statements:>11.1f}')
+            await async_sqlite_engine.dispose()
+
+        asyncio.run(run())
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+In-process load driver.
+
+Fills a temporary SQLite file with seeded synthetic data, then sends every endpoint a
+stream of GET requests with seeded random parameters from concurrent clients over
+httpx's ASGI transport, and reports latency percentiles per endpoint. The same
+arguments always send the same requests, so runs can be compared across commits.
+The response cache is off unless --cache is given, so the handlers themselves are timed.
+
+    python -m benchmarks.load --bookings 100000 --requests 200 --concurrency 20
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.synthetic import WIRE_FORMAT, iter_bookings, make_database
+
+FIRST_DAY = datetime(2023, 1, 1)
+
+def endpoints(rng: random.Random, rooms: int, clients: int, days: int):
+    """
+    Returns (name, request factory) pairs; each factory returns the (url, params) of one request.
+    """
+    def day(offset: int = 0, hour: int = 0):
+        return (FIRST_DAY + timedelta(days=offset, hours=hour)).strftime(WIRE_FORMAT)
+
+    def window(length: int):
+        first = rng.randrange(days - length + 1)
+        return {'from': day(first), 'to': day(first + length)}
+
+    return [
+        ('rooms', lambda: ('/api/rooms/all', {})),
+        ('bookings page', lambda: ('/api/bookings/', {'limit': 100, 'after': rng.randrange(1000)})),
+        ('bookings by room', lambda: ('/api/bookings/filter', {'room_id': rng.randint(1, rooms)})),
+        ('usage week', lambda: ('/api/rooms/usage', window(7))),
+        ('usage part-day', lambda: ('/api/rooms/usage', {'from': day(0, 12), 'to': day(days, 12)})),
+        ('hourly stats', lambda: ('/api/rooms/stats/hourly', window(30))),
+        ('overlap week', lambda: ('/api/rooms/overlap', {**window(7), 'limit': 100})),
+        ('availability', lambda: (f'/api/rooms/availability/{rng.randint(1, rooms)}/{day(rng.randrange(days), rng.randint(8, 18))}', {})),
+        ('availability grid', lambda: ('/api/rooms/availability', window(1))),
+        ('slots', lambda: ('/api/rooms/slots', {**window(1), 'limit': 100})),
+        ('occupancy', lambda: ('/api/rooms/occupancy', window(1))),
+        ('client counts', lambda: ('/api/clients/bookings', {**window(30), 'top': 10})),
+        ('client summary', lambda: (f'/api/clients/{rng.randint(1, clients)}/summary', {})),
+    ]
+
+def percentile(latencies: list, percent: int) -> float:
+    return statistics.quantiles(latencies, n=100, method='inclusive')[percent - 1]
+
+async def drive(app, requests: list, concurrency: int) -> list:
+    """
+    Sends the (url, params) requests from 'concurrency' clients and returns each one's latency in seconds
+    """
+    import httpx
+
+    queue = asyncio.Queue()
+    for request in requests:
+        queue.put_nowait(request)
+    latencies = []
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://load', timeout=None) as client:
+        async def worker():
+            while not queue.empty():
+                url, params = queue.get_nowait()
+                started = time.perf_counter()
+                response = await client.get(url, params=params)
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+async def run(app, arguments):
+    rng = random.Random(arguments.seed)
+    print(f'{"endpoint":<20}{"requests":>10}{"req/s":>10}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}')
+    for name, make_request in endpoints(rng, arguments.rooms, arguments.clients, arguments.days):
+        requests = [make_request() for _ in range(arguments.requests)]
+        started = time.perf_counter()
+        latencies = await drive(app, requests, arguments.concurrency)
+        seconds = time.perf_counter() - started
+        print(
+            f'{name:<20}{len(latencies):>10}{len(latencies) / seconds:>10.1f}'
+            + ''.join(f'{percentile(latencies, percent) * 1e3:>10.2f}' for percent in (50, 95, 99))
+        )
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--bookings', type=int, default=100_000, help='Synthetic bookings to load (1e3 to 1e7)')
+    parser.add_argument('--overlap', type=float, default=0.0, help='Share of bookings placed to overlap the previous one')
+    parser.add_argument('--rooms', type=int, default=50)
+    parser.add_argument('--clients', type=int, default=500)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=20, help='Concurrent clients')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cache', action='store_true', help='Keep the response cache on')
+    return parser.parse_args()
+
+def main():
+    arguments = parse_arguments()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'load.db')
+        bookings = iter_bookings(
+            arguments.bookings, arguments.rooms, arguments.clients, arguments.days, arguments.seed, arguments.overlap
+        )
+        make_database(f'sqlite:///{path}', bookings, arguments.rooms, arguments.clients).dispose()
+        os.environ['COWORKING_DB_PATH'] = path
+        if not arguments.cache:
+            os.environ['COWORKING_CACHE_SIZE'] = '0'
+
+        from database.db import async_sqlite_engine
+        from main import app
+
+        async def run_and_dispose():
+            await run(app, arguments)
+            await async_sqlite_engine.dispose()
+
+        asyncio.run(run_and_dispose())
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+import random
+from collections import namedtuple
+from datetime import datetime, timedelta
+from itertools import islice
+
+SyntheticBooking = namedtuple('SyntheticBooking', ['id', 'id_room', 'id_client', 'start', 'end'])
+
+WIRE_FORMAT = '%Y-%m-%dT%H:%MZ'
+SCALES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+INSERT_BATCH = 50_000
+
+def make_rooms(count: int, seed: int = 0) -> list:
+    """
+    Returns synthetic rooms opening between 07:00 and 09:00 and closing between 17:00 and 21:00.
+    """
+    rng = random.Random(seed)
+    return [
+        {'room_id': room_id, 'opening': f'{rng.randint(7, 9):02d}:00',
+         'closing': f'{rng.randint(17, 21):02d}:00', 'capacity': rng.randint(2, 20)}
+        for room_id in range(1, count + 1)
+    ]
+
+def make_clients(count: int) -> list:
+    """
+    Returns synthetic clients named 'Client 1', 'Client 2', ...
+    """
+    return [{'client_id': client_id, 'name': f'Client {client_id}'} for client_id in range(1, count + 1)]
+
+def iter_bookings(count: int, rooms: int = 50, clients: int = 500, days: int = 365, seed: int = 0, overlap: float = 0.0):
+    """
+    Yields synthetic bookings spread over the given number of rooms and days.
+
+    Bookings start on the half hour between 08:00 and 18:00 and last 30 minutes to 4 hours.
+    With probability 'overlap', a booking is instead put in the previous booking's room,
+    starting while that one is still running: at least that share of bookings overlaps another
+    one whatever the scale, on top of the chance collisions of the rooms and days drawn
+    (set by bookings per room and day). The same arguments always yield the same bookings.
+    """
+    rng = random.Random(seed)
+    first_day = datetime(2023, 1, 1)
+    previous = None
+    for booking_id in range(1, count + 1):
+        if previous is not None and overlap and rng.random() < overlap:
+            id_room, previous_start, previous_end = previous
+            start = previous_start + timedelta(minutes=30 * rng.randrange((previous_end - previous_start) // timedelta(minutes=30)))
+        else:
+            id_room = None
+            start = first_day + timedelta(days=rng.randrange(days), minutes=480 + 30 * rng.randrange(20))
+        end = start + timedelta(minutes=30 * rng.randint(1, 8))
+        if id_room is None:
+            id_room = rng.randint(1, rooms)
+        id_client = rng.randint(1, clients)
+        previous = (id_room, start, end)
+        yield SyntheticBooking(
+            id=booking_id,
+            id_room=id_room,
+            id_client=id_client,
+            start=start.strftime(WIRE_FORMAT),
+            end=end.strftime(WIRE_FORMAT),
+        )
+
+def make_bookings(count: int, rooms: int = 50, clients: int = 500, days: int = 365, seed: int = 0, overlap: float = 0.0):
+    """
+    Returns a list of the bookings of iter_bookings.
+    """
+    return list(iter_bookings(count, rooms, clients, days, seed, overlap))
+
+def make_database(url: str, bookings, rooms: int = 50, clients: int = 500, seed: int = None):
+    """
+    Creates the schema at the given database URL and fills it with synthetic data.
+
+    Bookings may be any iterable, e.g. iter_bookings for scales that do not fit in memory;
+    they are inserted INSERT_BATCH at a time.
+
+    Returns:
+        Engine: An engine bound to the new database.
+    """
+    from sqlalchemy import create_engine, insert
+
+    from database import rollups
+    from database.migrations import migrate
+    from database.models import Base, Booking, Client, Room
+
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    migrate(engine)
+    bookings = iter(bookings)
+    with engine.begin() as connection:
+        connection.execute(insert(Room), make_rooms(rooms, rooms if seed is None else seed))
+        connection.execute(insert(Client), make_clients(clients))
+        while batch := [booking._asdict() for booking in islice(bookings, INSERT_BATCH)]:
+            connection.execute(insert(Booking), batch)
+        rollups.rebuild(connection)
+    return engine
@@ -1,18 +1,32 @@
+import os
+
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
+from database.engine import create_async_sqlite_engine, create_sqlite_engine
 from database.models import Base
+from database.migrations import migrate
+
+database_path = os.environ.get('COWORKING_DB_PATH', 'coworking.db')
+pool_size = int(os.environ.get('COWORKING_DB_POOL_SIZE', '10'))
+max_overflow = int(os.environ.get('COWORKING_DB_MAX_OVERFLOW', '10'))
 
-sqlite_url = "sqlite:///coworking.db"
-sqlite_engine = create_engine(sqlite_url)
+sqlite_engine = create_sqlite_engine(database_path)
 Session = sessionmaker(bind=sqlite_engine)
 sqlite_session = Session()
 
+async_sqlite_engine = create_async_sqlite_engine(
+    database_path,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=pool_size,
+    max_overflow=max_overflow,
+)
+async_session = async_sessionmaker(async_sqlite_engine, expire_on_commit=False)
+
 Base.metadata.create_all(sqlite_engine)
+migrate(sqlite_engine)
 
-def get_db_session():
-    db_session = Session()
-    try:
+async def get_db_session():
+    async with async_session() as db_session:
         yield db_session
-    finally:
-        db_session.close()
\ No newline at end of file
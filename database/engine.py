@@ -0,0 +1,101 @@
+"""
+SQLite engine factory.
+
+Every connection is configured with a performance profile of PRAGMAs when it is
+opened. The defaults favour concurrent reads and cheap commits:
+
+- journal_mode=WAL lets readers continue while a writer commits.
+- synchronous=NORMAL skips the fsync on every commit. In WAL mode this is still
+  corruption-safe; only the last transactions can be lost on power failure.
+- cache_size, mmap_size and temp_store keep hot pages and temporary b-trees in memory.
+- busy_timeout makes writers wait for the lock instead of failing straight away.
+
+Each value can be overridden with an environment variable, e.g. COWORKING_SQLITE_SYNCHRONOUS=FULL.
+
+The driver's own transaction handling is switched off, and SQLAlchemy emits BEGIN itself.
+Without this, pysqlite/aiosqlite defer BEGIN until the first write. A session can ask
+for 'BEGIN IMMEDIATE', which takes the write lock up front, with the 'sqlite_begin'
+execution option:
+
+    await session.connection(execution_options={'sqlite_begin': 'IMMEDIATE'})
+"""
+import os
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': '-65536',
+    'mmap_size': '268435456',
+    'temp_store': 'MEMORY',
+    'busy_timeout': '5000',
+}
+
+
+def sqlite_pragmas() -> dict:
+    """
+    Returns the PRAGMA profile, with COWORKING_SQLITE_<NAME> environment overrides applied.
+    """
+    return {
+        name: os.environ.get(f'COWORKING_SQLITE_{name.upper()}', value)
+        for name, value in DEFAULT_PRAGMAS.items()
+    }
+
+
+def apply_pragmas(engine: Engine, pragmas: dict):
+    """
+    Runs the given PRAGMAs on every new DBAPI connection of a sync engine.
+    """
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+
+def apply_transaction_control(engine: Engine):
+    """
+    Makes the engine emit BEGIN itself, honouring the 'sqlite_begin' execution option.
+    """
+    @event.listens_for(engine, 'connect')
+    def disable_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, 'begin')
+    def begin(connection):
+        mode = connection.get_execution_options().get('sqlite_begin', 'DEFERRED')
+        connection.exec_driver_sql(f'BEGIN {mode}')
+
+
+def create_sqlite_engine(path: str, pragmas: dict = None, **kwargs) -> Engine:
+    """
+    Creates a sync engine for the SQLite file at 'path'.
+
+    Args:
+        path (str): The database file.
+        pragmas (dict, optional): PRAGMAs to run on connect. Defaults to sqlite_pragmas().
+        **kwargs: Passed on to create_engine.
+    """
+    engine = create_engine(f'sqlite:///{path}', **kwargs)
+    apply_pragmas(engine, sqlite_pragmas() if pragmas is None else pragmas)
+    apply_transaction_control(engine)
+    return engine
+
+
+def create_async_sqlite_engine(path: str, pragmas: dict = None, **kwargs) -> AsyncEngine:
+    """
+    Creates an aiosqlite engine for the SQLite file at 'path'.
+
+    Args:
+        path (str): The database file.
+        pragmas (dict, optional): PRAGMAs to run on connect. Defaults to sqlite_pragmas().
+        **kwargs: Passed on to create_async_engine.
+    """
+    engine = create_async_engine(f'sqlite+aiosqlite:///{path}', **kwargs)
+    apply_pragmas(engine.sync_engine, sqlite_pragmas() if pragmas is None else pragmas)
+    apply_transaction_control(engine.sync_engine)
+    return engine
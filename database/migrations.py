@@ -0,0 +1,95 @@
+"""
+Schema upgrades for existing coworking.db files.
+
+Early databases stored booking and room times as 'YYYY-MM-DDTHH:MMZ' / 'HH:MM' strings.
+'migrate' rewrites those tables to integer minutes, adds columns the models gained later
+(such as bookings.headcount), creates any missing indexes and fills the room_daily_usage
+rollup for databases created before it existed.
+It is idempotent and runs on startup; it can also be run by hand:
+
+    python -m database.migrations
+"""
+from sqlalchemy import inspect, Integer, MetaData
+from sqlalchemy.engine import Engine
+
+from database import rollups
+from database.models import Base, Booking, Room
+
+EPOCH_MINUTES_SQL = "CAST(strftime('%s', substr({0}, 1, 16)) AS INTEGER) / 60"
+CLOCK_MINUTES_SQL = "CAST(substr({0}, 1, 2) AS INTEGER) * 60 + CAST(substr({0}, 4, 2) AS INTEGER)"
+
+
+def _stores_text(inspector, table: str, column: str) -> bool:
+    for column_info in inspector.get_columns(table):
+        if column_info['name'] == column:
+            return not isinstance(column_info['type'], Integer)
+    return False
+
+
+def _add_missing_columns(connection, inspector):
+    """
+    Adds model columns missing from existing tables, e.g. bookings.headcount.
+
+    SQLite's ADD COLUMN can only add columns that allow NULL, which covers every column added so far.
+    """
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column_info['name'] for column_info in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                column_type = column.type.compile(connection.dialect)
+                connection.exec_driver_sql(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}')
+
+
+def _rebuild(connection, table, converted: dict):
+    """
+    Copies 'table' into a new table with the current schema, converting the given columns.
+
+    Follows SQLite's create-copy-drop-rename procedure, since column types cannot be altered.
+    Indexes are left to 'migrate', which creates them once the table has its final name.
+    """
+    metadata = MetaData()
+    for referenced in Base.metadata.sorted_tables:
+        referenced.to_metadata(metadata)
+    new_table = table.to_metadata(metadata, name=f'{table.name}_new')
+    new_table.indexes.clear()
+    new_table.create(connection)
+
+    columns = [column.name for column in table.columns]
+    target = ', '.join(f'"{name}"' for name in columns)
+    source = ', '.join(converted.get(name, '{0}').format(f'"{name}"') for name in columns)
+    connection.exec_driver_sql(f'INSERT INTO "{new_table.name}" ({target}) SELECT {source} FROM "{table.name}"')
+    connection.exec_driver_sql(f'DROP TABLE "{table.name}"')
+    connection.exec_driver_sql(f'ALTER TABLE "{new_table.name}" RENAME TO "{table.name}"')
+
+
+def migrate(engine: Engine):
+    """
+    Upgrades string time columns to integer minutes, adds missing columns and indexes and fills an empty rollup.
+    """
+    with engine.begin() as connection:
+        _add_missing_columns(connection, inspect(connection))
+        inspector = inspect(connection)
+        if _stores_text(inspector, Room.__tablename__, 'opening'):
+            _rebuild(connection, Room.__table__, {
+                'opening': CLOCK_MINUTES_SQL,
+                'closing': CLOCK_MINUTES_SQL,
+            })
+        if _stores_text(inspector, Booking.__tablename__, 'start'):
+            _rebuild(connection, Booking.__table__, {
+                'start': EPOCH_MINUTES_SQL,
+                'end': EPOCH_MINUTES_SQL,
+            })
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+        if rollups.needs_rebuild(connection):
+            rollups.rebuild(connection)
+
+
+if __name__ == '__main__':
+    from database.db import sqlite_engine
+
+    migrate(sqlite_engine)
+    print('Database schema is up to date.')
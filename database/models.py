@@ -1,14 +1,16 @@
-from sqlalchemy import  Column, Integer, String, ForeignKey
+from sqlalchemy import  Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import declarative_base
 
+from database.types import ClockMinutes, EpochMinutes
+
 Base = declarative_base()
 
 class Room(Base):
     __tablename__ = 'rooms'
 
     room_id = Column(Integer, primary_key=True)
-    opening = Column('opening', String)
-    closing = Column('closing', String)
+    opening = Column('opening', ClockMinutes)
+    closing = Column('closing', ClockMinutes)
     capacity = Column('capacity', Integer)
 
 
@@ -20,11 +22,57 @@ class Client(Base):
 
 
 class Booking(Base):
+    """
+    A booking of 'headcount' seats in a room; a NULL headcount books the whole room.
+    """
     __tablename__ = 'bookings'
+    __table_args__ = (
+        Index('ix_bookings_room_start_end', 'id_room', 'start', 'end'),
+        Index('ix_bookings_client_start', 'id_client', 'start'),
+        Index('ix_bookings_start', 'start'),
+        Index('ix_bookings_end_start', 'end', 'start'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    id_room = Column('id_room', Integer, ForeignKey('rooms.room_id'))
+    id_client = Column('id_client', Integer, ForeignKey('clients.client_id'))
+    start = Column('start', EpochMinutes)
+    end = Column('end', EpochMinutes)
+    headcount = Column('headcount', Integer)
+
+
+class RecurringBooking(Base):
+    """
+    A booking repeated every 'interval' days or weeks, stored once and expanded on read.
+
+    'start' and 'end' are the first occurrence; later occurrences keep its time of day
+    and must start before 'until'. Occurrences book the whole room. See utils/recurrence.py
+    for the expansion.
+    """
+    __tablename__ = 'recurring_bookings'
+    __table_args__ = (
+        Index('ix_recurring_bookings_room_start_until', 'id_room', 'start', 'until'),
+    )
 
     id = Column(Integer, primary_key=True)
     id_room = Column('id_room', Integer, ForeignKey('rooms.room_id'))
     id_client = Column('id_client', Integer, ForeignKey('clients.client_id'))
-    start = Column('start', String)
-    end = Column('end', String)
-    
+    start = Column('start', EpochMinutes)
+    end = Column('end', EpochMinutes)
+    frequency = Column('frequency', String, nullable=False)
+    interval = Column('interval', Integer, nullable=False, default=1)
+    until = Column('until', EpochMinutes, nullable=False)
+
+
+class RoomDailyUsage(Base):
+    """
+    Booked minutes and bookings per room per day, kept in step with 'bookings'.
+
+    A booking counts in full towards the day it starts on; 'day' is whole days since 1970-01-01.
+    """
+    __tablename__ = 'room_daily_usage'
+
+    id_room = Column('id_room', Integer, ForeignKey('rooms.room_id'), primary_key=True)
+    day = Column('day', Integer, primary_key=True)
+    booked_minutes = Column('booked_minutes', Integer, nullable=False, default=0)
+    booking_count = Column('booking_count', Integer, nullable=False, default=0)
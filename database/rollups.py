@@ -0,0 +1,79 @@
+"""
+The room_daily_usage rollup.
+
+Every write of bookings adds its increments to the rollup in the same transaction, so
+usage reports read a few rows per room and day instead of every booking. 'rebuild'
+recomputes the whole table from 'bookings' in one statement; it runs on startup when
+the rollup is empty and can be run by hand:
+
+    python -m database.rollups
+"""
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from database.models import Booking, RoomDailyUsage
+from database.types import minutes
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def usage_increments(bookings) -> list:
+    """
+    Sums (id_room, start, end) bookings in epoch minutes into one row per room and day.
+    """
+    totals = {}
+    for id_room, start, end in bookings:
+        key = (id_room, start // MINUTES_PER_DAY)
+        booked_minutes, booking_count = totals.get(key, (0, 0))
+        totals[key] = (booked_minutes + end - start, booking_count + 1)
+    return [
+        {'id_room': id_room, 'day': day, 'booked_minutes': booked_minutes, 'booking_count': booking_count}
+        for (id_room, day), (booked_minutes, booking_count) in totals.items()
+    ]
+
+
+def add_usage():
+    """
+    Returns the upsert that adds usage_increments rows onto the rollup.
+
+    Example:
+        await session.execute(add_usage(), usage_increments([(id_room, start, end)]))
+    """
+    statement = sqlite_insert(RoomDailyUsage)
+    return statement.on_conflict_do_update(
+        index_elements=[RoomDailyUsage.id_room, RoomDailyUsage.day],
+        set_={
+            'booked_minutes': RoomDailyUsage.booked_minutes + statement.excluded.booked_minutes,
+            'booking_count': RoomDailyUsage.booking_count + statement.excluded.booking_count,
+        },
+    )
+
+
+def rebuild(connection):
+    """
+    Recomputes the rollup from scratch with one INSERT ... SELECT ... GROUP BY.
+    """
+    day = minutes(Booking.start) // MINUTES_PER_DAY
+    connection.execute(delete(RoomDailyUsage))
+    connection.execute(insert(RoomDailyUsage).from_select(
+        ['id_room', 'day', 'booked_minutes', 'booking_count'],
+        select(Booking.id_room, day, func.sum(minutes(Booking.end) - minutes(Booking.start)), func.count())
+        .where(Booking.id_room.is_not(None))
+        .group_by(Booking.id_room, day),
+    ))
+
+
+def needs_rebuild(connection) -> bool:
+    """
+    Returns True if there are bookings but the rollup is empty, e.g. on a database from before it existed.
+    """
+    has_rollup = connection.scalar(select(RoomDailyUsage.day).limit(1)) is not None
+    return not has_rollup and connection.scalar(select(Booking.id).limit(1)) is not None
+
+
+if __name__ == '__main__':
+    from database.db import sqlite_engine
+
+    with sqlite_engine.begin() as connection:
+        rebuild(connection)
+    print('room_daily_usage rebuilt.')
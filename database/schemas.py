@@ -0,0 +1,67 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class BookingOut(BaseModel):
+    """
+    A booking as returned by the API, with times in YYYY-MM-DDTHH:MMZ format; a null headcount books the whole room.
+    """
+    id: int
+    id_room: int
+    id_client: int
+    start: str
+    end: str
+    headcount: Optional[int]
+
+    class Config:
+        orm_mode = True
+
+
+class BookingPage(BaseModel):
+    """
+    A page of bookings; 'Next cursor' is only sent when the page was limited.
+    """
+    all_bookings: List[BookingOut] = Field(..., alias='All bookings')
+    next_cursor: Optional[int] = Field(None, alias='Next cursor')
+
+
+class RoomOut(BaseModel):
+    """
+    A room as returned by the API, with opening hours in HH:MM format.
+    """
+    room_id: int
+    opening: str
+    closing: str
+    capacity: int
+
+    class Config:
+        orm_mode = True
+
+
+class RecurringBookingOut(BaseModel):
+    """
+    A recurring booking as returned by the API: its first occurrence, how often it repeats and until when.
+    """
+    id: int
+    id_room: int
+    id_client: int
+    start: str
+    end: str
+    frequency: str
+    interval: int
+    until: str
+
+    class Config:
+        orm_mode = True
+
+
+class OccurrenceOut(BaseModel):
+    """
+    One occurrence of a recurring booking, with times in YYYY-MM-DDTHH:MMZ format.
+    """
+    recurring_id: int
+    id_room: int
+    id_client: int
+    start: str
+    end: str
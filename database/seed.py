@@ -0,0 +1,240 @@
+"""
+Streaming seed loader.
+
+Reads rooms, clients and bookings from a JSON, NDJSON or CSV file without holding it
+in memory, and inserts them in fixed-size batches with Core bulk inserts, committing
+after every batch. Booking batches add their increments to the room_daily_usage rollup
+in the same transaction. Seed files use the shape of original_data/original_data.py:
+
+    JSON     {"rooms": [{"id": 1, ...}, ...], "clients": [...], "bookings": [...]}
+    NDJSON   one record per line, naming its table: {"table": "rooms", "id": 1, ...}
+    CSV      one table per file, named after the file (rooms.csv, ...) or given with --table
+
+Rooms and clients must come before the bookings that refer to them. Load a file into
+the configured database (COWORKING_DB_PATH) with:
+
+    python -m database.seed bookings.ndjson --batch-size 10000
+
+A server already running sees the new rows on its next request: its response cache
+notices commits from other processes through SQLite's data_version.
+"""
+import csv
+import json
+import os
+
+from sqlalchemy import Integer, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import Booking, Client, Room
+from database.rollups import add_usage, usage_increments
+from utils.datetime import to_epoch_minutes
+
+BATCH_SIZE = 10_000
+READ_SIZE = 1 << 16
+TABLES = {'rooms': Room, 'clients': Client, 'bookings': Booking}
+# Seed records name their primary key 'id', as original_data does.
+ID_COLUMNS = {'rooms': 'room_id', 'clients': 'client_id', 'bookings': 'id'}
+
+
+class SeedFormatError(ValueError):
+    """
+    Raised when a seed file cannot be parsed or names an unknown table.
+    """
+
+
+def row(table: str, record: dict) -> dict:
+    """
+    Returns the insert parameters for a seed record, with every column of its table
+
+    The record itself is left untouched.
+    """
+    if table not in TABLES:
+        raise SeedFormatError(f'Unknown table: {table}')
+    id_column = ID_COLUMNS[table]
+    values = {name: record.get(name) for name in TABLES[table].__table__.columns.keys()}
+    values[id_column] = record.get('id', record.get(id_column))
+    return values
+
+
+def iter_data(data: dict):
+    """
+    Yields (table, record) pairs from a dict shaped like original_data's 'data'
+    """
+    for table, records in data.items():
+        for record in records:
+            yield table, record
+
+
+def iter_json(file):
+    """
+    Yields (table, record) pairs from a JSON object of arrays, reading it READ_SIZE characters at a time
+
+    Only one record is decoded at a time, so memory does not grow with the file.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    exhausted = False
+
+    def fill() -> bool:
+        nonlocal buffer, position, exhausted
+        chunk = '' if exhausted else file.read(READ_SIZE)
+        exhausted = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+        return not exhausted
+
+    def skip(characters: str = ''):
+        nonlocal position
+        while True:
+            while position < len(buffer) and (buffer[position].isspace() or buffer[position] in characters):
+                position += 1
+            if position < len(buffer) or not fill():
+                return
+
+    def expect(character: str):
+        nonlocal position
+        skip()
+        if buffer[position:position + 1] != character:
+            raise SeedFormatError(f'Expected {character!r} in seed file')
+        position += 1
+
+    def value():
+        nonlocal position
+        while True:
+            try:
+                decoded, position = decoder.raw_decode(buffer, position)
+                return decoded
+            except json.JSONDecodeError as error:
+                if not fill():
+                    raise SeedFormatError(f'Invalid JSON in seed file: {error}') from error
+
+    expect('{')
+    while True:
+        skip(',')
+        if buffer[position:position + 1] == '}':
+            return
+        table = value()
+        expect(':')
+        expect('[')
+        while True:
+            skip(',')
+            if buffer[position:position + 1] == ']':
+                position += 1
+                break
+            yield table, value()
+
+
+def iter_ndjson(file):
+    """
+    Yields (table, record) pairs from one JSON record per line, each naming its 'table'
+    """
+    for line in file:
+        if line.strip():
+            record = json.loads(line)
+            yield record.pop('table', None), record
+
+
+def iter_csv(file, table: str):
+    """
+    Yields (table, record) pairs from a CSV file with a header row; empty fields are NULL
+    """
+    if table not in TABLES:
+        raise SeedFormatError(f'Unknown table: {table}')
+    columns = TABLES[table].__table__.columns
+    integers = {name for name, column in columns.items() if isinstance(column.type, Integer)}
+    integers.add('id')
+    for record in csv.DictReader(file):
+        yield table, {
+            name: None if value == '' else int(value) if name in integers else value
+            for name, value in record.items()
+        }
+
+
+def iter_file(file, path: str, table: str = None):
+    """
+    Yields (table, record) pairs from an open seed file, picking the parser by extension
+    """
+    stem, extension = os.path.splitext(os.path.basename(path))
+    if extension == '.json':
+        return iter_json(file)
+    if extension in ('.ndjson', '.jsonl'):
+        return iter_ndjson(file)
+    if extension == '.csv':
+        return iter_csv(file, table or stem)
+    raise SeedFormatError(f'Unsupported seed file: {path}')
+
+
+async def load_records(session: AsyncSession, records, batch_size: int = BATCH_SIZE, progress=None) -> dict:
+    """
+    Inserts (table, record) pairs batch_size rows at a time, committing after every batch
+
+    A batch holds rows of one table, so a table's pending rows are written as soon as a
+    record of another table arrives, which keeps rooms and clients ahead of bookings.
+
+    Args:
+        session (AsyncSession): The session to write with.
+        records (iterable): (table, record) pairs, e.g. from iter_file or iter_data.
+        batch_size (int, optional): Rows per insert and commit.
+        progress (callable, optional): Called with the rows loaded per table after every commit.
+
+    Returns:
+        dict: Rows loaded per table.
+    """
+    loaded = dict.fromkeys(TABLES, 0)
+    batch_table, batch = None, []
+
+    async def flush():
+        if not batch:
+            return
+        await session.execute(insert(TABLES[batch_table]), batch)
+        if batch_table == 'bookings':
+            increments = usage_increments(
+                (values['id_room'], to_epoch_minutes(values['start']), to_epoch_minutes(values['end']))
+                for values in batch
+            )
+            await session.execute(add_usage(), increments)
+        await session.commit()
+        loaded[batch_table] += len(batch)
+        batch.clear()
+        if progress is not None:
+            progress(loaded)
+
+    for table, record in records:
+        values = row(table, record)
+        if table != batch_table:
+            await flush()
+            batch_table = table
+        batch.append(values)
+        if len(batch) >= batch_size:
+            await flush()
+    await flush()
+    return loaded
+
+
+async def main():
+    import argparse
+    import sys
+
+    from database.db import async_session, async_sqlite_engine
+
+    parser = argparse.ArgumentParser(description='Streams a seed file into the database.')
+    parser.add_argument('path', help='A .json, .ndjson/.jsonl or .csv seed file')
+    parser.add_argument('--table', choices=sorted(TABLES), help='Table of a CSV file, if not its name')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Rows per insert and commit')
+    arguments = parser.parse_args()
+
+    def report(loaded: dict):
+        print(', '.join(f'{count} {table}' for table, count in loaded.items()), file=sys.stderr)
+
+    with open(arguments.path, newline='', encoding='utf-8') as file:
+        async with async_session() as session:
+            loaded = await load_records(session, iter_file(file, arguments.path, arguments.table), arguments.batch_size, report)
+    await async_sqlite_engine.dispose()
+    print(f'Loaded {sum(loaded.values())} rows from {arguments.path}.')
+
+
+if __name__ == '__main__':
+    import asyncio
+
+    asyncio.run(main())
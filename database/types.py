@@ -0,0 +1,65 @@
+from sqlalchemy import Integer
+from sqlalchemy.sql.expression import type_coerce
+from sqlalchemy.types import TypeDecorator
+
+from utils.datetime import from_epoch_minutes, to_clock_minutes, to_epoch_minutes
+
+MINUTES_PER_DAY = 24 * 60
+
+
+class EpochMinutes(TypeDecorator):
+    """
+    Stores a 'YYYY-MM-DDTHH:MMZ' timestamp as whole UTC minutes since 1970-01-01.
+
+    Python code keeps seeing the wire format string, while SQLite stores and indexes
+    a plain integer, so range filters and arithmetic can run inside the database.
+    """
+
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, int):
+            return value
+        return to_epoch_minutes(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return value
+        return from_epoch_minutes(value)
+
+
+class ClockMinutes(TypeDecorator):
+    """
+    Stores an 'HH:MM' time of day as minutes since midnight.
+
+    Times outside 00:00-23:59 raise ValueError rather than being stored as minutes that
+    would read back as a different time.
+    """
+
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return value
+        if isinstance(value, int):
+            if not 0 <= value < MINUTES_PER_DAY:
+                raise ValueError(f'Not a time of day in minutes: {value}')
+            return value
+        return to_clock_minutes(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return value
+        return f'{value // 60:02d}:{value % 60:02d}'
+
+
+def minutes(column):
+    """
+    Returns the raw integer minutes of an EpochMinutes or ClockMinutes column.
+
+    Example:
+        session.query(minutes(Booking.start)) yields ints instead of wire format strings.
+    """
+    return type_coerce(column, Integer)
@@ -1,11 +1,23 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from starlette.responses import RedirectResponse
 
-from database.db import Session
+from database.db import Session, async_sqlite_engine, sqlite_engine
 
-from routers import client_routes, booking_routes, room_routes, data_routes
+from routers import client_routes, booking_routes, room_routes, data_routes, metrics_routes
+from utils.metrics import MetricsMiddleware, instrument_engine, metrics_enabled
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Closes pooled database connections on shutdown, so their worker threads exit
+    """
+    yield
+    await async_sqlite_engine.dispose()
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 def get_db_session():
     db_session = Session()
@@ -34,3 +46,10 @@ app.include_router(room_routes.router, prefix="/api/rooms")
     
 # #----- CLIENT ENDPOINT -----#
 app.include_router(client_routes.router, prefix="/api/clients")
+
+#----- METRICS (opt-in with COWORKING_METRICS=1) -----#
+if metrics_enabled:
+    instrument_engine(sqlite_engine)
+    instrument_engine(async_sqlite_engine.sync_engine)
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_routes.router)
@@ -1,31 +1,149 @@
-from fastapi import APIRouter, HTTPException, Depends, Form, Query
-from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Form, Query, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional
+from heapq import merge
+from operator import itemgetter
+import orjson
 import re
 
-from database.db import Session, get_db_session
-from database.models import Booking, Client, Room
+from database.db import async_session, get_db_session
+from database.models import Booking, Client, RecurringBooking, Room
+from database.rollups import add_usage, usage_increments
+from database.schemas import BookingOut, BookingPage, OccurrenceOut, RecurringBookingOut
+from database.types import minutes
+
+from routers.room_routes import check_time_window
+from utils.bulk import read_booking_rows, validate_booking_rows
+from utils.cache import response_cache
+from utils.conflicts import booked_seats, booking_checks, within_opening_hours
+from utils.datetime import to_epoch_minutes
+from utils.existence import table_existence
+from utils.interval_index import booking_index
+from utils.recurrence import FREQUENCIES, MINUTES_PER_DAY, find_overlaps, first_overlap, load_occurrences, occurrences, rule_period, with_wire_times
 
 router = APIRouter()
 
-@router.get('/')
-async def get_all_bookings(session: Session = Depends(get_db_session))-> dict:
+STREAM_BATCH_SIZE = 1000
+RECURRENCE_LIMIT = 1000
+TIMESTAMP_PATTERN = r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}Z$'
+BOOKING_COLUMNS = (Booking.id, Booking.id_room, Booking.id_client, Booking.start, Booking.end, Booking.headcount)
+
+def parse_booking_time(value: str, name: str) -> int:
+    """
+    Converts a YYYY-MM-DDTHH:MMZ form field to epoch minutes.
+
+    Raises:
+        HTTPException (status_code=400):
+            - If the value is not a valid time in the format YYYY-MM-DDTHH:MMZ.
+    """
+    if not re.match(TIMESTAMP_PATTERN, value):
+        raise HTTPException(status_code=400, detail=f'Incorrect date format for {name} time')
+    try:
+        return to_epoch_minutes(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f'Incorrect date format for {name} time')
+
+def booking_dicts(rows) -> list:
+    """
+    Turns rows of BOOKING_COLUMNS into plain dicts, ready for orjson
+    """
+    return [
+        {'id': booking_id, 'id_room': id_room, 'id_client': id_client, 'start': start, 'end': end, 'headcount': headcount}
+        for booking_id, id_room, id_client, start, end, headcount in rows
+    ]
+
+@router.get('/', response_model=BookingPage)
+async def get_all_bookings(
+    limit: Optional[int] = Query(None, ge=1, description='Maximum number of bookings to return'),
+    after: Optional[int] = Query(None, description='Cursor: only return bookings with an id greater than this'),
+    session: AsyncSession = Depends(get_db_session)
+    )-> ORJSONResponse:
     """
     Gets all available bookings.
 
     This endpoint retrieves and returns all available booking records from the database.
-    
+    Bookings are ordered by id and can be paged with a keyset cursor: pass 'limit', then
+    pass the returned 'Next cursor' as 'after' to get the following page. Only the booking
+    columns are fetched, and the response is encoded with orjson directly, skipping
+    per-object validation, so large listings stay cheap.
+
+    Parameters:
+        - limit (int, optional): Maximum number of bookings to return.
+        - after (int, optional): Only return bookings with an id greater than this.
+
     Returns:
-        dict: A dictionary containing all available booking records.
+        dict: A dictionary containing all available booking records, plus the cursor of the
+        next page when 'limit' is given ('Next cursor' is None on the last page).
 
     Raises:
         HTTPException (status_code=404):
             - If no booking information is found in the database. Try using the 'data/load' endpoint first.
+
+    Example:
+        To page through bookings 100 at a time:
+        ```
+        GET api/bookings?limit=100
+        GET api/bookings?limit=100&after=100
+        ```
     """
 
-    bookings = session.query(Booking).all()
-    if not bookings:
+    query = select(*BOOKING_COLUMNS).order_by(Booking.id)
+    if after is not None:
+        query = query.where(Booking.id > after)
+    if limit is not None:
+        query = query.limit(limit)
+
+    bookings = booking_dicts(await session.execute(query))
+    if not bookings and after is None:
         raise HTTPException(status_code=404, detail='No booking information found. Try using data/load root first.')
-    return {"All bookings": bookings}
+
+    if limit is None:
+        return ORJSONResponse({"All bookings": bookings})
+
+    next_cursor = bookings[-1]['id'] if len(bookings) == limit else None
+    return ORJSONResponse({"All bookings": bookings, "Next cursor": next_cursor})
+
+async def stream_bookings(after: Optional[int]):
+    """
+    Yields NDJSON lines for every booking after the cursor, in batches from a server-side cursor.
+    """
+    statement = (
+        select(*BOOKING_COLUMNS)
+        .order_by(Booking.id)
+        .execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
+    if after is not None:
+        statement = statement.where(Booking.id > after)
+
+    async with async_session() as session:
+        result = await session.stream(statement)
+        async for batch in result.partitions():
+            yield b''.join(orjson.dumps(booking) + b'\n' for booking in booking_dicts(batch))
+
+@router.get('/stream')
+async def stream_all_bookings(
+    after: Optional[int] = Query(None, description='Cursor: only return bookings with an id greater than this'),
+    ) -> StreamingResponse:
+    """
+    Streams all bookings as NDJSON.
+
+    This endpoint returns one JSON object per line, ordered by id. Rows are read from the
+    database and sent in batches, so memory use stays constant however many bookings exist.
+
+    Parameters:
+        - after (int, optional): Only return bookings with an id greater than this.
+
+    Returns:
+        StreamingResponse: An 'application/x-ndjson' body with one booking per line.
+
+    Example:
+        ```
+        GET api/bookings/stream
+        ```
+    """
+    return StreamingResponse(stream_bookings(after), media_type='application/x-ndjson')
     
 @router.post('/make')
 async def make_new_booking(
@@ -33,18 +151,26 @@ async def make_new_booking(
     id_client: int = Form(..., description='Client Id'),
     start: str = Form(..., description='Booking start time (YYYY-MM-DDTHH:MMZ - Where "T" and "Z" remain unchanged)'),
     end: str = Form(..., description='Booking end time (YYYY-MM-DDTHH:MMZ - Where "T" and "Z" remain unchanged)'),
-    session: Session = Depends(get_db_session)
-    )-> dict:
+    headcount: Optional[int] = Form(None, ge=1, description='Seats to book; leave empty to book the whole room'),
+    session: AsyncSession = Depends(get_db_session)
+    )-> Dict[str, BookingOut]:
     """
     Posts a new booking.
 
     This endpoint allows you to create a new booking with the specified room, client, and time slot.
+    The booking must fall inside the room's opening hours on one day, and the room must have
+    'headcount' seats free throughout it. Bookings without a headcount take the whole room,
+    and so do occurrences of recurring bookings. The client, the room and overlaps are
+    checked with one query; only when something overlaps are the seats taken counted, with
+    a sweep over the overlapping bookings. The insert returns the new row, all in one
+    'BEGIN IMMEDIATE' transaction, so concurrent requests cannot both take the same seats.
 
     Parameters:
         - id_room (int): The ID of the room for the booking.
         - id_client (int): The ID of the client making the booking.
         - start (str): The start time of the booking in the format YYYY-MM-DDTHH:MMZ.
         - end (str): The end time of the booking in the format YYYY-MM-DDTHH:MMZ.
+        - headcount (int, optional): The number of seats to book. Defaults to the whole room.
 
     Returns:
         dict: A dictionary containing the confirmed booking details.
@@ -52,8 +178,12 @@ async def make_new_booking(
     Raises:
         HTTPException (status_code=400):
             - If the 'start' or 'end' time is not in the correct format (YYYY-MM-DDTHH:MMZ).
+            - If 'end' is not after 'start', or the booking falls outside the room's opening hours.
+            - If 'headcount' is more than the room's capacity.
         HTTPException (status_code=404):
             - If the specified 'id_client' or 'id_room' is not found in the database.
+        HTTPException (status_code=409):
+            - If the room does not have enough seats free, counting bookings and occurrences of recurring bookings.
 
     Example:
         To make a booking for Room 3 by Client 3 from 2023-09-25T15:30Z to 2023-09-25T16:30Z:
@@ -66,37 +196,323 @@ async def make_new_booking(
         - end: 2023-09-25T16:30Z
         ```
     """
-    pattern = r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}Z$'
-    if not re.match(pattern, start):
-        raise HTTPException(status_code=400, detail='Incorrect date format for start time')
-    
-    if not re.match(pattern, end):
-        raise HTTPException(status_code=400, detail='Incorrect date format for end time')
+    start_minutes = parse_booking_time(start, 'start')
+    end_minutes = parse_booking_time(end, 'end')
+
+    if end_minutes <= start_minutes:
+        raise HTTPException(status_code=400, detail='End time must be after start time')
 
-    if not session.query(Client).filter(Client.client_id == id_client).first():
+    await session.connection(execution_options={'sqlite_begin': 'IMMEDIATE'})
+
+    known_client, opening, closing, capacity, conflict, recurring_conflict = (await session.execute(
+        booking_checks(id_room, id_client, start_minutes, end_minutes)
+    )).one()
+    if known_client is None:
         raise HTTPException(status_code=404, detail=f'Client {id_client} not found.')
-    
-    if not session.query(Room).filter(Room.room_id == id_room).first():
+    if opening is None:
         raise HTTPException(status_code=404, detail=f'Room {id_room} not found.')
+    if not within_opening_hours(opening, closing, start_minutes, end_minutes):
+        raise HTTPException(status_code=400, detail=f'Room {id_room} is closed at the requested time.')
+    seats = capacity if headcount is None else headcount
+    if seats > capacity:
+        raise HTTPException(status_code=400, detail=f'Room {id_room} only has {capacity} seats.')
+    if conflict is not None or recurring_conflict is not None:
+        if seats == capacity or await booked_seats(session, id_room, capacity, start_minutes, end_minutes) + seats > capacity:
+            if conflict is not None:
+                raise HTTPException(status_code=409, detail=f'Room {id_room} is already booked at the requested time (booking {conflict}).')
+            raise HTTPException(status_code=409, detail=f'Room {id_room} is already booked at the requested time (recurring booking {recurring_conflict}).')
 
-    new_booking = Booking(
-        id_room=id_room,
-        id_client=id_client,
-        start=start, end=end
-        )
-    
-    session.add(new_booking)
-    session.commit()
-    added_booking = session.query(Booking).filter(Booking.id == new_booking.id).first()
+    new_booking = await session.scalar(
+        insert(Booking).returning(Booking),
+        {'id_room': id_room, 'id_client': id_client, 'start': start_minutes, 'end': end_minutes, 'headcount': headcount}
+    )
+    await session.execute(add_usage(), usage_increments([(id_room, start_minutes, end_minutes)]))
+    await session.commit()
+    booking_index.add(id_room, start_minutes, end_minutes, seats)
+    table_existence.invalidate()
+    response_cache.invalidate()
     
-    return {'Booking confirmed': added_booking}
+    return {'Booking confirmed': new_booking}
+
+async def find_bulk_conflicts(session: AsyncSession, rows: list) -> dict:
+    """
+    Returns {row number: 'booking <id>' or 'recurring booking <id>'} for the rows overlapping a stored booking or occurrence
+
+    Each room's bookings and occurrences over [earliest row start, latest row end) are read
+    once and swept against the room's rows sorted by start, instead of querying per row.
+
+    Args:
+        rows (list): (row number, row) pairs, with 'start' and 'end' in epoch minutes.
+    """
+    rows_by_room = {}
+    for number, row in rows:
+        rows_by_room.setdefault(row['id_room'], []).append((row['start'], row['end'], number))
+
+    conflicts = {}
+    for id_room, intervals in rows_by_room.items():
+        intervals.sort()
+        first_start = intervals[0][0]
+        last_end = max(end for _, end, _ in intervals)
+        room_bookings = await session.execute(
+            select(minutes(Booking.start), minutes(Booking.end), Booking.id)
+            .where(
+                Booking.id_room == id_room,
+                Booking.start > first_start - MINUTES_PER_DAY,
+                Booking.start < last_end,
+                Booking.end > first_start,
+            )
+            .order_by(Booking.start)
+        )
+        stored = merge(
+            ((start, end, f'booking {booking_id}') for start, end, booking_id in room_bookings),
+            ((occurrence.start, occurrence.end, f'recurring booking {occurrence.recurring_id}')
+             for occurrence in await load_occurrences(session, first_start, last_end, [id_room])),
+            key=itemgetter(0),
+        )
+        for (_, _, number), (_, _, conflict) in find_overlaps(intervals, stored).items():
+            conflicts[number] = conflict
+    return conflicts
+
+@router.post('/bulk')
+async def make_bulk_bookings(request: Request, session: AsyncSession = Depends(get_db_session)) -> dict:
+    """
+    Posts many bookings at once.
+
+    This endpoint imports a batch of bookings sent as a JSON array of objects or as CSV
+    ('Content-Type: text/csv') with a header line. Every row needs 'id_room', 'id_client',
+    'start' and 'end'. All formats are checked in one pass, rooms and clients are looked up
+    with one query each, stored bookings and occurrences are read once per room and swept
+    against the rows, and the valid rows are inserted in a single transaction. Imported
+    bookings take the whole room, so rows are held to the rules 'make' applies to bookings
+    without a headcount: inside the room's opening hours and free of overlaps, with
+    existing bookings, with occurrences of recurring bookings and with other rows of the import. Invalid rows are skipped and reported by their position (0-based, excluding the CSV header).
+
+    Returns:
+        dict: The number of bookings added and the errors of the rejected rows.
+
+    Raises:
+        HTTPException (status_code=400):
+            - If the body is not a JSON array of objects or a readable CSV document.
+
+    Example:
+        ```
+        POST api/bookings/bulk
+        Content-Type: text/csv
+
+        id_room,id_client,start,end
+        1,2,2023-09-25T15:30Z,2023-09-25T16:30Z
+        3,1,2023-09-25T09:00Z,2023-09-25T10:00Z
+        ```
+    """
+    try:
+        rows = read_booking_rows(await request.body(), request.headers.get('content-type', ''))
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=f'Could not read bookings: {error}')
+
+    valid, errors = validate_booking_rows(rows)
+
+    await session.connection(execution_options={'sqlite_begin': 'IMMEDIATE'})
+
+    room_ids = {row['id_room'] for row in valid.values()}
+    client_ids = {row['id_client'] for row in valid.values()}
+    opening_hours = {
+        room_id: (opening, closing)
+        for room_id, opening, closing in await session.execute(
+            select(Room.room_id, minutes(Room.opening), minutes(Room.closing)).where(Room.room_id.in_(room_ids))
+        )
+    }
+    known_clients = set((await session.scalars(select(Client.client_id).where(Client.client_id.in_(client_ids)))).all())
+    conflicts = await find_bulk_conflicts(session, [(number, row) for number, row in valid.items() if row['id_room'] in opening_hours])
+
+    new_bookings = []
+    batch_ends = {}
+    for number, row in sorted(valid.items(), key=lambda item: (item[1]['id_room'], item[1]['start'])):
+        id_room = row['id_room']
+        if row['id_client'] not in known_clients:
+            errors.append({'row': number, 'detail': f"Client {row['id_client']} not found."})
+        elif id_room not in opening_hours:
+            errors.append({'row': number, 'detail': f'Room {id_room} not found.'})
+        elif row['end'] <= row['start']:
+            errors.append({'row': number, 'detail': 'End time must be after start time'})
+        elif not within_opening_hours(*opening_hours[id_room], row['start'], row['end']):
+            errors.append({'row': number, 'detail': f'Room {id_room} is closed at the requested time.'})
+        elif row['start'] < batch_ends.get(id_room, row['start']):
+            errors.append({'row': number, 'detail': f'Room {id_room} is booked by an earlier row at the requested time.'})
+        elif number in conflicts:
+            errors.append({'row': number, 'detail': f'Room {id_room} is already booked at the requested time ({conflicts[number]}).'})
+        else:
+            batch_ends[id_room] = max(batch_ends.get(id_room, row['end']), row['end'])
+            new_bookings.append(row)
+
+    if new_bookings:
+        await session.execute(insert(Booking), new_bookings)
+        await session.execute(add_usage(), usage_increments((row['id_room'], row['start'], row['end']) for row in new_bookings))
+        await session.commit()
+        booking_index.invalidate()
+        table_existence.invalidate()
+        response_cache.invalidate()
+
+    errors.sort(key=lambda error: error['row'])
+    return {'Bookings added': len(new_bookings), 'Errors': errors}
+
+@router.post('/recurring')
+async def make_recurring_booking(
+    id_room: int = Form(..., description='Room Id'),
+    id_client: int = Form(..., description='Client Id'),
+    start: str = Form(..., description='First occurrence start time (YYYY-MM-DDTHH:MMZ - Where "T" and "Z" remain unchanged)'),
+    end: str = Form(..., description='First occurrence end time (YYYY-MM-DDTHH:MMZ - Where "T" and "Z" remain unchanged)'),
+    frequency: str = Form('WEEKLY', description='How often the booking repeats: DAILY or WEEKLY'),
+    interval: int = Form(1, ge=1, description='Repeat every this many days or weeks'),
+    until: str = Form(..., description='Occurrences start before this time (YYYY-MM-DDTHH:MMZ)'),
+    session: AsyncSession = Depends(get_db_session)
+    )-> Dict[str, RecurringBookingOut]:
+    """
+    Posts a new recurring booking.
+
+    This endpoint books a room on a repeating schedule, such as a desk every Monday morning.
+    The rule is stored once, not one row per occurrence; availability, overlap, free slot
+    and usage reports expand only the occurrences inside the window they look at. Every
+    occurrence is held to the same rules as 'make': inside the room's opening hours and free
+    of overlaps with bookings and with other recurring bookings. The checks run in the same
+    'BEGIN IMMEDIATE' transaction as the insert.
+
+    Parameters:
+        - id_room (int): The ID of the room for the booking.
+        - id_client (int): The ID of the client making the booking.
+        - start (str): The start time of the first occurrence in the format YYYY-MM-DDTHH:MMZ.
+        - end (str): The end time of the first occurrence in the format YYYY-MM-DDTHH:MMZ.
+        - frequency (str, optional): DAILY or WEEKLY. Defaults to WEEKLY.
+        - interval (int, optional): Repeat every 'interval' days or weeks. Defaults to 1.
+        - until (str): Occurrences start before this time, in the format YYYY-MM-DDTHH:MMZ.
+
+    Returns:
+        dict: A dictionary containing the confirmed recurring booking.
+
+    Raises:
+        HTTPException (status_code=400):
+            - If a time is not in the correct format (YYYY-MM-DDTHH:MMZ) or 'frequency' is not DAILY or WEEKLY.
+            - If 'end' is not after 'start', 'until' is not after 'start', or the rule has more than 1000 occurrences.
+            - If the booking falls outside the room's opening hours.
+        HTTPException (status_code=404):
+            - If the specified 'id_client' or 'id_room' is not found in the database.
+        HTTPException (status_code=409):
+            - If an occurrence overlaps a booking or an occurrence of another recurring booking.
+
+    Example:
+        To book Room 2 for Client 1 every Monday from 09:00 to 10:00 until the end of 2023:
+        ```
+        POST api/bookings/recurring
+        Form Data:
+        - id_room: 2
+        - id_client: 1
+        - start: 2023-10-02T09:00Z
+        - end: 2023-10-02T10:00Z
+        - frequency: WEEKLY
+        - until: 2024-01-01T00:00Z
+        ```
+    """
+    start_minutes = parse_booking_time(start, 'start')
+    end_minutes = parse_booking_time(end, 'end')
+    until_minutes = parse_booking_time(until, 'until')
+
+    if end_minutes <= start_minutes:
+        raise HTTPException(status_code=400, detail='End time must be after start time')
+    if until_minutes <= start_minutes:
+        raise HTTPException(status_code=400, detail='Until time must be after start time')
+    frequency = frequency.upper()
+    if frequency not in FREQUENCIES:
+        raise HTTPException(status_code=400, detail='Frequency must be DAILY or WEEKLY.')
+    period = rule_period(frequency, interval)
+    if (until_minutes - start_minutes - 1) // period + 1 > RECURRENCE_LIMIT:
+        raise HTTPException(status_code=400, detail=f'A recurring booking can have at most {RECURRENCE_LIMIT} occurrences.')
+
+    await session.connection(execution_options={'sqlite_begin': 'IMMEDIATE'})
+
+    known_client, opening, closing, _, _, _ = (await session.execute(
+        booking_checks(id_room, id_client, start_minutes, end_minutes)
+    )).one()
+    if known_client is None:
+        raise HTTPException(status_code=404, detail=f'Client {id_client} not found.')
+    if opening is None:
+        raise HTTPException(status_code=404, detail=f'Room {id_room} not found.')
+    if not within_opening_hours(opening, closing, start_minutes, end_minutes):
+        raise HTTPException(status_code=400, detail=f'Room {id_room} is closed at the requested time.')
+
+    new_occurrences = list(occurrences(start_minutes, end_minutes, period, until_minutes))
+    last_end = new_occurrences[-1][1]
+    room_bookings = await session.execute(
+        select(minutes(Booking.start), minutes(Booking.end), Booking.id)
+        .where(Booking.id_room == id_room, Booking.start < last_end, Booking.end > start_minutes)
+        .order_by(Booking.start)
+    )
+    conflict = first_overlap(new_occurrences, room_bookings)
+    if conflict is not None:
+        raise HTTPException(status_code=409, detail=f'Room {id_room} is already booked at the requested time (booking {conflict[2]}).')
+    room_occurrences = await load_occurrences(session, start_minutes, last_end, [id_room])
+    conflict = first_overlap(new_occurrences, ((occurrence.start, occurrence.end, occurrence.recurring_id) for occurrence in room_occurrences))
+    if conflict is not None:
+        raise HTTPException(status_code=409, detail=f'Room {id_room} is already booked at the requested time (recurring booking {conflict[2]}).')
+
+    new_rule = await session.scalar(
+        insert(RecurringBooking).returning(RecurringBooking),
+        {
+            'id_room': id_room, 'id_client': id_client, 'start': start_minutes, 'end': end_minutes,
+            'frequency': frequency, 'interval': interval, 'until': until_minutes,
+        }
+    )
+    await session.commit()
+    table_existence.invalidate()
+    response_cache.invalidate()
+
+    return {'Recurring booking confirmed': new_rule}
+
+@router.get('/occurrences')
+async def get_occurrences(
+    start: str = Query(..., alias='from', description='Start of the window (YYYY-MM-DDTHH:MMZ)'),
+    end: str = Query(..., alias='to', description='End of the window (YYYY-MM-DDTHH:MMZ)'),
+    room_id: Optional[List[int]] = Query(None, description='Only list these rooms'),
+    session: AsyncSession = Depends(get_db_session)
+    )-> Dict[str, List[OccurrenceOut]]:
+    """
+    Gets the occurrences of recurring bookings in a time window.
+
+    This endpoint expands the recurring bookings that reach into the window and returns
+    each occurrence overlapping it, earliest first. Only the occurrences inside the window
+    are generated, however long the rules run.
+
+    Parameters:
+        - from (str): Window start in the format YYYY-MM-DDTHH:MMZ (inclusive).
+        - to (str): Window end in the format YYYY-MM-DDTHH:MMZ (exclusive).
+        - room_id (int, optional, repeatable): Rooms to list.
+
+    Returns:
+        dict: A dictionary containing the list of occurrences.
+
+    Raises:
+        HTTPException (status_code=400):
+            - If 'from' or 'to' is not in the correct format, or 'to' is not after 'from'.
+
+    Example:
+        To list the recurring bookings of Room 2 in October 2023:
+        ```
+        GET api/bookings/occurrences?from=2023-10-01T00:00Z&to=2023-11-01T00:00Z&room_id=2
+        ```
+    """
+    start, end = check_time_window(start, end)
+
+    occurrence_list = [
+        with_wire_times(occurrence)._asdict()
+        for occurrence in await load_occurrences(session, start, end, room_id)
+    ]
+
+    return {'Occurrences': occurrence_list}
 
-@router.get('/filter')
+@router.get('/filter', response_model=List[BookingOut])
 async def get_bookings_by_filter(
     client_id: Optional[int] = Query(None, description='Filter by client ID'),
     room_id: Optional[int] = Query(None, description='Filter by room ID'),
-    session: Session = Depends(get_db_session)
-    )-> dict:
+    session: AsyncSession = Depends(get_db_session)
+    )-> ORJSONResponse:
     """
     Gets bookings with optional filters.
 
@@ -108,7 +524,7 @@ async def get_bookings_by_filter(
         - room_id (int, optional): Filter bookings by room ID.
 
     Returns:
-        dict: A list of bookings matching the specified filters.
+        list: A list of bookings matching the specified filters.
 
     Raises:
         HTTPException (status_code=404):
@@ -130,18 +546,17 @@ async def get_bookings_by_filter(
         GET api/bookings/filter?client_id=3&room_id=3
         ```
     """
-    query = session.query(Booking)
+    query = select(*BOOKING_COLUMNS)
     
     if client_id is not None:
-        query = query.filter(Booking.id_client == client_id)
+        query = query.where(Booking.id_client == client_id)
     if room_id is not None:
-        query = query.filter(Booking.id_room == room_id)
+        query = query.where(Booking.id_room == room_id)
             
-    bookings = query.all()
+    booking_list = booking_dicts(await session.execute(query))
     
-    if not bookings:
+    if not booking_list:
         raise HTTPException(status_code=404, detail='ID not found')
     
-    booking_list = [{'id_room': booking.id_room, 'id_client': booking.id_client, 'start': booking.start, 'end': booking.end} for booking in bookings]
-    return booking_list
+    return ORJSONResponse(booking_list)
         
\ No newline at end of file
@@ -1,37 +1,132 @@
-from fastapi import APIRouter, HTTPException, Depends
+from typing import Dict, Optional
 
-from database.db import Session, get_db_session
-from database.models import Booking
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-router = APIRouter()
+from database.db import get_db_session
+from database.models import Booking, Client
+
+from routers.room_routes import check_time_window
+from utils.cache import CachedRoute, cached
+from utils.client_usage import add_occurrence_counts, client_rooms_query, client_summary_query, count_bookings_per_client
+from utils.datetime import from_epoch_minutes
+from utils.existence import table_existence
+from utils.recurrence import load_occurrences_starting
+
+router = APIRouter(route_class=CachedRoute)
 
 
 @router.get('/bookings')
-async def get_bookings_by_all_clients(session: Session = Depends(get_db_session)) -> dict:
+@cached
+async def get_bookings_by_all_clients(
+    start: Optional[str] = Query(None, alias='from', description='Only count bookings starting at or after this time (YYYY-MM-DDTHH:MMZ)'),
+    end: Optional[str] = Query(None, alias='to', description='Only count bookings starting before this time (YYYY-MM-DDTHH:MMZ)'),
+    top: Optional[int] = Query(None, ge=1, description='Only return this many clients, those with the most bookings first'),
+    session: AsyncSession = Depends(get_db_session)
+    ) -> Dict[str, Dict]:
     """
     Returns all bookings made by all clients.
 
-    This endpoint retrieves and returns all bookings made by each client in the database.
+    This endpoint retrieves and returns the number of bookings made by each client in the
+    database, counted with one GROUP BY query, plus one per occurrence of their recurring
+    bookings. The count can be limited to bookings starting inside a time window, and to
+    the clients with the most bookings.
+
+    Parameters:
+        - from (str, optional): Window start in the format YYYY-MM-DDTHH:MMZ (inclusive).
+        - to (str, optional): Window end in the format YYYY-MM-DDTHH:MMZ (exclusive).
+        - top (int, optional): Number of clients to return, busiest first.
 
     Returns:
         dict: A dictionary containing the count of bookings made by each client.
 
     Raises:
+        HTTPException (status_code=400):
+            - If 'from' or 'to' is not in the correct format, or 'to' is not after 'from'.
         HTTPException (status_code=404):
             - If no booking information is found in the database. Try using the 'data/load' endpoint first.
+
+    Example:
+        To get the 10 clients with the most bookings in July 2023:
+        ```
+        GET /api/clients/bookings?from=2023-07-01T00:00Z&to=2023-08-01T00:00Z&top=10
+        ```
     """
-    bookings = session.query(Booking)
-    if not bookings:
+    start, end = check_time_window(start, end)
+
+    occurrences = await load_occurrences_starting(session, start, end)
+    if occurrences:
+        client_count = dict((await session.execute(count_bookings_per_client(start, end))).all())
+        client_count = add_occurrence_counts(client_count, occurrences, top)
+    else:
+        client_count = dict((await session.execute(count_bookings_per_client(start, end, top))).all())
+    if not client_count and not await table_existence.any_rows(session, Booking):
         raise HTTPException(status_code=404, detail='No information found. Try using data/load route first.')
-    
-    client_ids = []
-    client_count = {}
-    for booking in bookings:
-        client_ids.append(booking.id_client)
-        
-    for client_id in client_ids:
-        if client_id in client_count:
-            client_count[client_id] += 1
-        else:
-            client_count[client_id] = 1
+
     return {'Bookings per client': client_count}
+
+
+@router.get('/{client_id}/summary')
+@cached
+async def get_client_summary(
+    client_id: int,
+    start: Optional[str] = Query(None, alias='from', description='Only count bookings starting at or after this time (YYYY-MM-DDTHH:MMZ)'),
+    end: Optional[str] = Query(None, alias='to', description='Only count bookings starting before this time (YYYY-MM-DDTHH:MMZ)'),
+    session: AsyncSession = Depends(get_db_session)
+    ) -> Dict[str, Dict]:
+    """
+    Returns a summary of the bookings made by one client.
+
+    This endpoint returns the number of bookings, the total booked minutes, the number of
+    distinct rooms and the start of the latest booking of a client, from the same grouped
+    query as the bookings count. Occurrences of the client's recurring bookings count as
+    bookings.
+
+    Parameters:
+        - client_id (int): The ID of the client.
+        - from (str, optional): Window start in the format YYYY-MM-DDTHH:MMZ (inclusive).
+        - to (str, optional): Window end in the format YYYY-MM-DDTHH:MMZ (exclusive).
+
+    Returns:
+        dict: A dictionary containing the client's booking summary.
+
+    Raises:
+        HTTPException (status_code=400):
+            - If 'from' or 'to' is not in the correct format, or 'to' is not after 'from'.
+        HTTPException (status_code=404):
+            - If the specified 'client_id' is not found in the database.
+
+    Example:
+        To get the summary of Client 3:
+        ```
+        GET /api/clients/3/summary
+        ```
+    """
+    start, end = check_time_window(start, end)
+
+    client = (await session.execute(select(Client.name).where(Client.client_id == client_id))).first()
+    if client is None:
+        raise HTTPException(status_code=404, detail=f'Client {client_id} not found.')
+
+    row = (await session.execute(client_summary_query(client_id, start, end))).first()
+    _, bookings, total_minutes, distinct_rooms, last_start = row or (client_id, 0, 0, 0, None)
+    occurrences = [
+        occurrence for occurrence in await load_occurrences_starting(session, start, end)
+        if occurrence.id_client == client_id
+    ]
+    if occurrences:
+        bookings += len(occurrences)
+        total_minutes += sum(occurrence.end - occurrence.start for occurrence in occurrences)
+        last_start = occurrences[-1].start if last_start is None else max(last_start, occurrences[-1].start)
+        booked_rooms = set(await session.scalars(client_rooms_query(client_id, start, end)))
+        distinct_rooms = len(booked_rooms | {occurrence.id_room for occurrence in occurrences})
+
+    return {'Client summary': {
+        'client_id': client_id,
+        'name': client.name,
+        'bookings': bookings,
+        'total_minutes': total_minutes,
+        'distinct_rooms': distinct_rooms,
+        'last_booking': None if last_start is None else from_epoch_minutes(last_start),
+    }}
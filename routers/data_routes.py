@@ -1,47 +1,39 @@
 from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database.db import Session, get_db_session
-from database.models import Booking, Client, Room
+from database.db import get_db_session
+from database.seed import iter_data, load_records
 
 from original_data.original_data import data
 
+from utils.cache import response_cache
+from utils.existence import table_existence
+from utils.interval_index import booking_index
+
 router = APIRouter()
 
         
 @router.post('/load')
-async def load_initial_data(session: Session = Depends(get_db_session))-> dict:
+async def load_initial_data(session: AsyncSession = Depends(get_db_session))-> dict:
     """
     Populates the database with initial data if it is empty.
 
-    This endpoint checks if the database is empty and, if so, populates it with initial data.
-    The data includes rooms, clients, and bookings. If the database already contains data,
-    it returns a message indicating that the database is already populated.
+    This endpoint checks if the database is empty (one EXISTS query per table, stopping at the
+    first table with rows) and, if so, populates it with initial data.
+    The data includes rooms, clients, and bookings, written in batches by the seed loader
+    (database/seed.py), which also streams large seed files from disk. If the database
+    already contains data, it returns a message indicating that the database is already populated.
 
     Returns:
         dict: A message indicating the result of the data population process.
     """
-    if (
-        session.query(Room).count() == 0 and
-        session.query(Client).count() == 0 and
-        session.query(Booking).count() == 0
-    ):
-        for room_data in data.get('rooms', []):
-            room_data['room_id'] = room_data.pop('id')
-            room_data['opening'] = room_data['opening']
-            room_data['closing'] = room_data['closing']
-            room = Room(**room_data)
-            session.add(room)
-
-        for client_data in data.get('clients', []):
-            client_data['client_id'] = client_data.pop('id')
-            client = Client(**client_data)
-            session.add(client)
-
-        for booking_data in data.get('bookings', []):
-            booking = Booking(**booking_data)
-            session.add(booking)
-
-        session.commit()
+    if await table_existence.is_empty(session):
+        try:
+            await load_records(session, iter_data(data))
+        finally:
+            booking_index.invalidate()
+            table_existence.invalidate()
+            response_cache.invalidate()
         return {'message': 'Data added to the database successfully.'}
     else:
-        return {'message': 'Database is already populated.'}
\ No newline at end of file
+        return {'message': 'Database is already populated.'}
@@ -0,0 +1,26 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from utils.metrics import metrics
+
+router = APIRouter()
+
+
+@router.get('/metrics', response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    """
+    Gets the request and SQL metrics in the Prometheus text format.
+
+    This endpoint is only mounted when COWORKING_METRICS=1. It reports, per route, the
+    number of requests by status, latency histograms, and histograms of the number and
+    duration of the SQL statements each request sent.
+
+    Returns:
+        PlainTextResponse: The metrics in the Prometheus text exposition format (version 0.0.4).
+
+    Example:
+        ```
+        GET /metrics
+        ```
+    """
+    return PlainTextResponse(metrics.render(), media_type='text/plain; version=0.0.4')
@@ -1,20 +1,99 @@
 import re
-from typing import Dict, List
+from heapq import merge
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, HTTPException, Depends, Form 
+from fastapi import APIRouter, HTTPException, Depends, Form, Query
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Bundle
 
 from database.models import Room, Booking
-from database.db import Session, get_db_session
+from database.db import get_db_session
+from database.schemas import RoomOut
+from database.types import minutes
 
-from utils.datetime import convert_time
+from utils.analytics import BookingColumns, add_occurrence_columns, booking_columns, daily_occupancy, hourly_load, length_histogram, window
+from utils.availability import headcounts_at, time_grid
+from utils.cache import CachedRoute, cached, response_cache
+from utils.datetime import convert_time, from_epoch_minutes, to_clock_minutes, to_epoch_minutes
+from utils.existence import table_existence
+from utils.interval_index import booking_index
+from utils.occupancy import clip, headcount_timeline
 from utils.overlap import check_overlap
+from utils.recurrence import MINUTES_PER_DAY, load_occurrences, load_occurrences_starting, with_wire_times
+from utils.slots import find_free_slots
 from utils.usage import calculate_percentage_per_room
 
-router = APIRouter()
+router = APIRouter(route_class=CachedRoute)
+
+TIMESTAMP_PATTERN = r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}Z$'
+MAX_AVAILABILITY_TIMES = 10_000
+
+
+def parse_timestamp(value: str, detail: str) -> int:
+    """
+    Converts a YYYY-MM-DDTHH:MMZ string to epoch minutes.
+
+    Raises:
+        HTTPException (status_code=400):
+            - With the given 'detail', if the value does not match the format or is not a real time (e.g. 2023-02-30T10:00Z).
+    """
+    if not re.match(TIMESTAMP_PATTERN, value):
+        raise HTTPException(status_code=400, detail=detail)
+    try:
+        return to_epoch_minutes(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=detail)
+
+
+def check_time_window(start: Optional[str], end: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Validates optional 'from'/'to' report bounds and converts them to epoch minutes.
+
+    Returns:
+        tuple: The (from, to) bounds in epoch minutes, None where a bound is not given.
+
+    Raises:
+        HTTPException (status_code=400):
+            - If either bound is not a valid time in the format YYYY-MM-DDTHH:MMZ, or 'to' is not after 'from'.
+    """
+    bounds = []
+    for name, value in (('from', start), ('to', end)):
+        if value is None:
+            bounds.append(None)
+            continue
+        bounds.append(parse_timestamp(value, f"Incorrect time format for '{name}'."))
+
+    start_minutes, end_minutes = bounds
+    if start_minutes is not None and end_minutes is not None and end_minutes <= start_minutes:
+        raise HTTPException(status_code=400, detail="'to' must be later than 'from'.")
+    return start_minutes, end_minutes
+
+
+async def load_report_data(session: AsyncSession, start: Optional[int], end: Optional[int]) -> Tuple[List, BookingColumns]:
+    """
+    Returns (room_id, open minutes per day) for every room, and the booking columns starting in the window.
+
+    Occurrences of recurring bookings starting in the window are added to the columns.
+
+    Raises:
+        HTTPException (status_code=404):
+            - If no booking information is found in the database.
+    """
+    columns = await booking_columns.columns(session)
+    if not len(columns.start):
+        raise HTTPException(status_code=404, detail='No booking information found. Try using data/load root first.')
+    rooms = (await session.execute(
+        select(Room.room_id, minutes(Room.closing) - minutes(Room.opening)).order_by(Room.room_id)
+    )).all()
+    occurrences = await load_occurrences_starting(session, start, end)
+    return rooms, add_occurrence_columns(window(columns, start, end), occurrences)
 
         
 @router.get('/all')
-async def get_all_rooms(session: Session = Depends(get_db_session)) -> Dict[str, List]:
+@cached
+async def get_all_rooms(session: AsyncSession = Depends(get_db_session)) -> Dict[str, List]:
     """
     Get information on all rooms.
 
@@ -29,7 +108,7 @@ async def get_all_rooms(session: Session = Depends(get_db_session)) -> Dict[str,
         /api/rooms/all
         ```
     """
-    rooms = session.query(Room).all()
+    rooms = (await session.scalars(select(Room))).all()
     
     if not rooms:
         raise HTTPException(status_code=404, detail='No room information found. Try using data/load root first.')
@@ -43,8 +122,8 @@ async def add_new_room(
     opening: str = Form(..., description='Opening time of new room (HH:MM)'),
     closing: str = Form(..., description='Closing time of new room (HH:MM)'),
     capacity: int = Form(..., description='Capacity of new room'),
-    session: Session = Depends(get_db_session)
-    )-> Dict[str, Dict]:
+    session: AsyncSession = Depends(get_db_session)
+    )-> Dict[str, RoomOut]:
     """
     Post a new room.
 
@@ -55,15 +134,16 @@ async def add_new_room(
         - opening (str): The opening time of the new room in the format HH:MM.
         - closing (str): The closing time of the new room in the format HH:MM.
         - capacity (int): The capacity of the new room.
-        - session (Session): An active database session obtained from the 'get_db_session' dependency.
+        - session (AsyncSession): An active database session obtained from the 'get_db_session' dependency.
 
     Returns:
         dict: A dictionary containing information about the newly added room.
 
     Raises:
         HTTPException (status_code=400):
-            - If the 'opening' or 'closing' time is not in the correct format (HH:MM).
-            - If the 'capacity' is provided as '0', as rooms with 0 capacity cannot be added.
+            - If the 'opening' or 'closing' time is not a time of day in the format HH:MM.
+            - If the 'closing' time is not after the 'opening' time.
+            - If the 'capacity' is 0 or less, as rooms with no capacity cannot be added.
 
     Example:
         To add a new room with opening time at 08:00, closing time at 18:00, and a capacity of 30:
@@ -75,120 +155,553 @@ async def add_new_room(
         - capacity: 30
         ```
     """
-    pattern = r'^\d{2}:\d{2}$'
-    if not re.match(pattern, opening):
+    try:
+        opening_minutes = to_clock_minutes(opening)
+    except ValueError:
         raise HTTPException(status_code=400, detail='Incorrect time format for opening time.')
-    
-    if not re.match(pattern, closing):
+
+    try:
+        closing_minutes = to_clock_minutes(closing)
+    except ValueError:
         raise HTTPException(status_code=400, detail='Incorrect time format for closing time.')
-    
-    if capacity == '0':
+
+    if closing_minutes <= opening_minutes:
+        raise HTTPException(status_code=400, detail='Closing time must be after opening time.')
+
+    if capacity <= 0:
         raise HTTPException(status_code=400, detail='Room with 0 capacity cannot be added.')
     
-    new_room = Room(opening=opening, closing=closing, capacity=capacity)
-    session.add(new_room)
-    session.commit()
-    
-    added_room = session.query(Room).filter(Room.room_id == new_room.room_id).first()
+    new_room = await session.scalar(
+        insert(Room).returning(Room),
+        {'opening': opening_minutes, 'closing': closing_minutes, 'capacity': capacity}
+    )
+    await session.commit()
+    table_existence.invalidate()
+    response_cache.invalidate()
     
-    return {'Room added': added_room}
+    return {'Room added': new_room}
 
 
 
 @router.get('/usage')
-async def get_rooms_usage(session: Session = Depends(get_db_session)) -> Dict[str, Dict]:
+@cached
+async def get_rooms_usage(
+    start: Optional[str] = Query(None, alias='from', description='Only count bookings starting at or after this time (YYYY-MM-DDTHH:MMZ)'),
+    end: Optional[str] = Query(None, alias='to', description='Only count bookings starting before this time (YYYY-MM-DDTHH:MMZ)'),
+    room_id: Optional[List[int]] = Query(None, description='Only report these rooms'),
+    session: AsyncSession = Depends(get_db_session)
+    ) -> Dict[str, Dict]:
     """
     Gets the percentage each room has been used in the time available.
 
     This endpoint calculates and returns the percentage of time each room has been used
-    in the time available based on bookings in the database.
+    in the time available based on bookings in the database, including the occurrences of
+    recurring bookings that start in the window. The report can be limited
+    to bookings starting inside a time window and to a set of rooms. Windows that start
+    and end on midnight are answered from the room_daily_usage rollup, other windows from
+    the bookings themselves; both filters run inside the database on indexed columns.
+
+    Parameters:
+        - from (str, optional): Window start in the format YYYY-MM-DDTHH:MMZ (inclusive).
+        - to (str, optional): Window end in the format YYYY-MM-DDTHH:MMZ (exclusive).
+        - room_id (int, optional, repeatable): Rooms to report on.
 
     Returns:
         dict: A dictionary containing the usage percentage for each room.
 
     Raises:
+        HTTPException (status_code=400):
+            - If 'from' or 'to' is not in the correct format, or 'to' is not after 'from'.
         HTTPException (status_code=404):
             - If no booking information is found in the database. Try using the 'data/load' endpoint first.
+
+    Example:
+        To get usage of Rooms 1 and 2 for one week:
+        ```
+        GET /api/rooms/usage?from=2023-07-17T00:00Z&to=2023-07-24T00:00Z&room_id=1&room_id=2
+        ```
     """
-    bookings = session.query(Booking).all()
-    
-    if not bookings:
+    start, end = check_time_window(start, end)
+
+    if not await table_existence.any_rows(session, Booking):
         raise HTTPException(status_code=404, detail='No booking information found. Try using data/load root first.')
-    
-    result = calculate_percentage_per_room(session)
+
+    result = await session.run_sync(calculate_percentage_per_room, start=start, end=end, room_ids=room_id)
 
     return {'Usage percentage by room': result}
+
+
+@router.get('/stats/daily')
+@cached
+async def get_daily_occupancy(
+    start: Optional[str] = Query(None, alias='from', description='Only count bookings starting at or after this time (YYYY-MM-DDTHH:MMZ)'),
+    end: Optional[str] = Query(None, alias='to', description='Only count bookings starting before this time (YYYY-MM-DDTHH:MMZ)'),
+    room_id: Optional[List[int]] = Query(None, description='Only count these rooms'),
+    session: AsyncSession = Depends(get_db_session)
+    ) -> Dict[str, Dict]:
+    """
+    Gets the occupancy of the rooms per day.
+
+    This endpoint returns, for every day on which a booking starts, the booked minutes
+    as a percentage of the minutes the rooms are open that day. Occurrences of recurring
+    bookings count as bookings.
+
+    Parameters:
+        - from (str, optional): Window start in the format YYYY-MM-DDTHH:MMZ (inclusive).
+        - to (str, optional): Window end in the format YYYY-MM-DDTHH:MMZ (exclusive).
+        - room_id (int, optional, repeatable): Rooms to count.
+
+    Returns:
+        dict: A dictionary containing the occupancy percentage for each day.
+
+    Raises:
+        HTTPException (status_code=400):
+            - If 'from' or 'to' is not in the correct format, or 'to' is not after 'from'.
+        HTTPException (status_code=404):
+            - If no booking information is found in the database. Try using the 'data/load' endpoint first.
+
+    Example:
+        To get the daily occupancy of Room 1 for one week:
+        ```
+        GET /api/rooms/stats/daily?from=2023-07-17T00:00Z&to=2023-07-24T00:00Z&room_id=1
+        ```
+    """
+    start, end = check_time_window(start, end)
+    rooms, columns = await load_report_data(session, start, end)
+    open_minutes = sum(room_open for room, room_open in rooms if not room_id or room in room_id)
+
+    return {'Occupancy percentage by day': daily_occupancy(window(columns, room_ids=room_id), open_minutes)}
+
+
+@router.get('/stats/hourly')
+@cached
+async def get_hourly_load(
+    start: Optional[str] = Query(None, alias='from', description='Only count bookings starting at or after this time (YYYY-MM-DDTHH:MMZ)'),
+    end: Optional[str] = Query(None, alias='to', description='Only count bookings starting before this time (YYYY-MM-DDTHH:MMZ)'),
+    room_id: Optional[List[int]] = Query(None, description='Only count these rooms'),
+    session: AsyncSession = Depends(get_db_session)
+    ) -> Dict:
+    """
+    Gets the average load of the rooms per hour of the day, and the peak hours.
+
+    This endpoint returns the average number of bookings in progress during each hour
+    of the day, over the days on which a booking starts, and the three busiest hours.
+    Occurrences of recurring bookings count as bookings.
+
+    Parameters:
+        - from (str, optional): Window start in the format YYYY-MM-DDTHH:MMZ (inclusive).
+        - to (str, optional): Window end in the format YYYY-MM-DDTHH:MMZ (exclusive).
+        - room_id (int, optional, repeatable): Rooms to count.
+
+    Returns:
+        dict: A dictionary containing the average load for each hour and the peak hours.
+
+    Raises:
+        HTTPException (status_code=400):
+            - If 'from' or 'to' is not in the correct format, or 'to' is not after 'from'.
+        HTTPException (status_code=404):
+            - If no booking information is found in the database. Try using the 'data/load' endpoint first.
+
+    Example:
+        To get the hourly load of all rooms in July 2023:
+        ```
+        GET /api/rooms/stats/hourly?from=2023-07-01T00:00Z&to=2023-08-01T00:00Z
+        ```
+    """
+    start, end = check_time_window(start, end)
+    _, columns = await load_report_data(session, start, end)
+    load = hourly_load(window(columns, room_ids=room_id))
+    peak_hours = sorted(load, key=load.get, reverse=True)[:3]
+
+    return {'Average bookings in progress by hour': load, 'Peak hours': peak_hours}
+
+
+@router.get('/stats/lengths')
+@cached
+async def get_booking_lengths(
+    start: Optional[str] = Query(None, alias='from', description='Only count bookings starting at or after this time (YYYY-MM-DDTHH:MMZ)'),
+    end: Optional[str] = Query(None, alias='to', description='Only count bookings starting before this time (YYYY-MM-DDTHH:MMZ)'),
+    room_id: Optional[List[int]] = Query(None, description='Only count these rooms'),
+    bin_minutes: int = Query(30, ge=1, description='Width of each histogram bin, in minutes'),
+    session: AsyncSession = Depends(get_db_session)
+    ) -> Dict[str, Dict]:
+    """
+    Gets a histogram of booking lengths.
+
+    This endpoint counts bookings by length, in bins of 'bin_minutes' minutes labelled
+    'low-high'. Empty bins are left out. Occurrences of recurring bookings count as bookings.
+
+    Parameters:
+        - from (str, optional): Window start in the format YYYY-MM-DDTHH:MMZ (inclusive).
+        - to (str, optional): Window end in the format YYYY-MM-DDTHH:MMZ (exclusive).
+        - room_id (int, optional, repeatable): Rooms to count.
+        - bin_minutes (int, optional): Width of each bin in minutes. Defaults to 30.
+
+    Returns:
+        dict: A dictionary containing the number of bookings in each length bin.
+
+    Raises:
+        HTTPException (status_code=400):
+            - If 'from' or 'to' is not in the correct format, or 'to' is not after 'from'.
+        HTTPException (status_code=404):
+            - If no booking information is found in the database. Try using the 'data/load' endpoint first.
+
+    Example:
+        To count bookings by hour of length:
+        ```
+        GET /api/rooms/stats/lengths?bin_minutes=60
+        ```
+    """
+    start, end = check_time_window(start, end)
+    _, columns = await load_report_data(session, start, end)
+
+    return {'Bookings by length in minutes': length_histogram(window(columns, room_ids=room_id), bin_minutes)}
     
 
 @router.get('/availability/{room_id}/{timestamp}')
 async def check_room_availability(
     room_id: int,
     timestamp: str,
-    session: Session = Depends(get_db_session)
-    ) -> Dict[str, str]:
+    seats: int = Query(1, ge=1, description='Number of seats needed'),
+    session: AsyncSession = Depends(get_db_session)
+    ) -> dict:
     """
     Gets queried room availability at the queried timestamp.
 
     This endpoint allows you to check the availability of a specific room at a given timestamp.
+    A room is available when its capacity, less the seats taken by the bookings running at
+    that moment, covers the seats requested. Bookings without a headcount and occurrences of
+    recurring bookings take the whole room.
     
     Parameters:
         - room_id (int): The ID of the room you want to check availability for.
         - timestamp (str): The timestamp for which you want to check availability (in YYYY-MM-DDTHH:MMZ format - Where "T" and "Z" remain unchanged).
+        - seats (int, optional): The number of seats needed. Defaults to 1.
 
     Returns:
-        dict: A dictionary indicating whether the room is available or busy at the requested timestamp.
+        dict: A dictionary indicating whether the room is available or busy at the requested timestamp, and the seats free.
 
     Raises:
         HTTPException (status_code=400):
-            - If the 'timestamp' is not in the correct format (YYYY-MM-DDTHH:MMZ).
+            - If the 'timestamp' is not a valid time in the format YYYY-MM-DDTHH:MMZ.
         HTTPException (status_code=404):
             - If the specified 'room_id' is not found in the database.
 
     Example:
-        To check the availability of Room 3 at timestamp 2023-09-25T15:30Z:
+        To check whether Room 3 has 2 seats free at timestamp 2023-09-25T15:30Z:
         ```
-        GET /api/rooms/availability/3/2023-09-25T15:30Z
+        GET /api/rooms/availability/3/2023-09-25T15:30Z?seats=2
         ```
     """
-    pattern = r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}Z$'
-    if not re.match(pattern, timestamp):
-        raise HTTPException(status_code=400, detail='Incorrect time format.')
-    
-    bookings = session.query(Booking).filter(Booking.id_room == room_id).all()
-    if not bookings:
+    moment = parse_timestamp(timestamp, 'Incorrect time format.')
+
+    room_bookings = await booking_index.room(session, room_id)
+    if room_bookings.capacity is None:
         raise HTTPException(status_code=404, detail=f'Room {room_id} not found.')
     
     query = convert_time(timestamp)
+
+    # A booking counts as running at its end minute: occurrences overlapping [moment - 1, moment + 1)
+    occurrences = await load_occurrences(session, moment - 1, moment + 1, [room_id])
+    headcount = room_bookings.headcount_at(moment) + room_bookings.capacity * sum(1 for _ in occurrences)
+    free_seats = max(room_bookings.capacity - headcount, 0)
     
-    for booking in bookings:
-        start = booking.start
-        end = booking.end
-        start_date_time = convert_time(start)
-        end_date_time = convert_time(end)
-        
-        if start_date_time <= query <= end_date_time:
-            return {f'Room {room_id}': f'Busy at requested time({query})'}
+    if free_seats < seats:
+        return {f'Room {room_id}': f'Busy at requested time({query})', 'Seats free': free_seats}
         
-    return {f'Room {room_id}': f'Available at requested time({query})'}
+    return {f'Room {room_id}': f'Available at requested time({query})', 'Seats free': free_seats}
         
 
+@router.get('/availability')
+@cached
+async def check_rooms_availability(
+    room_id: Optional[List[int]] = Query(None, description='Rooms to check; all rooms if not given'),
+    timestamp: Optional[List[str]] = Query(None, description='Times to check (YYYY-MM-DDTHH:MMZ); repeatable'),
+    start: Optional[str] = Query(None, alias='from', description='Start of a time grid to check (YYYY-MM-DDTHH:MMZ), instead of timestamps'),
+    end: Optional[str] = Query(None, alias='to', description='End of the time grid (YYYY-MM-DDTHH:MMZ, exclusive)'),
+    step: int = Query(15, ge=1, description='Minutes between grid times'),
+    seats: int = Query(1, ge=1, description='Number of seats needed'),
+    session: AsyncSession = Depends(get_db_session)
+    ) -> Dict:
+    """
+    Gets the availability of many rooms at many times in one call.
+
+    This endpoint answers the question of 'availability/{room_id}/{timestamp}' for every
+    requested room at every requested time, given either as repeated 'timestamp' values
+    or as a grid from 'from' to 'to' every 'step' minutes. The bookings of all the rooms
+    are read with one query and merged against the sorted times room by room, instead of
+    looking up each pair.
+
+    Parameters:
+        - room_id (int, optional, repeatable): Rooms to check. Defaults to every room.
+        - timestamp (str, optional, repeatable): Times to check, in the format YYYY-MM-DDTHH:MMZ.
+        - from (str, optional): Grid start in the format YYYY-MM-DDTHH:MMZ (inclusive).
+        - to (str, optional): Grid end in the format YYYY-MM-DDTHH:MMZ (exclusive).
+        - step (int, optional): Minutes between grid times. Defaults to 15.
+        - seats (int, optional): The number of seats needed. Defaults to 1.
+
+    Returns:
+        dict: The times checked, and for each room whether it is available and the seats free at each time.
+
+    Raises:
+        HTTPException (status_code=400):
+            - If a time is not in the correct format, or neither 'timestamp' nor both 'from' and 'to' are given.
+            - If more than 10000 times are requested.
+        HTTPException (status_code=404):
+            - If a requested 'room_id' is not found in the database.
+
+    Example:
+        To check Rooms 1 and 2 every 15 minutes of one day:
+        ```
+        GET /api/rooms/availability?room_id=1&room_id=2&from=2023-07-18T00:00Z&to=2023-07-19T00:00Z&step=15
+        ```
+    """
+    if timestamp:
+        moments = []
+        for value in timestamp:
+            moments.append(parse_timestamp(value, f'Incorrect time format for {value}.'))
+    else:
+        start, end = check_time_window(start, end)
+        if start is None or end is None:
+            raise HTTPException(status_code=400, detail="Give 'timestamp' values, or both 'from' and 'to'.")
+        if (end - start - 1) // step + 1 > MAX_AVAILABILITY_TIMES:
+            raise HTTPException(status_code=400, detail=f'At most {MAX_AVAILABILITY_TIMES} times can be checked at once.')
+        moments = time_grid(start, end, step)
+    if len(moments) > MAX_AVAILABILITY_TIMES:
+        raise HTTPException(status_code=400, detail=f'At most {MAX_AVAILABILITY_TIMES} times can be checked at once.')
+
+    rooms = select(Room.room_id, Room.capacity).order_by(Room.room_id)
+    if room_id:
+        rooms = rooms.where(Room.room_id.in_(room_id))
+    capacities = dict((await session.execute(rooms)).all())
+    for requested in room_id or ():
+        if requested not in capacities:
+            raise HTTPException(status_code=404, detail=f'Room {requested} not found.')
+
+    sorted_moments = sorted(set(moments))
+    first, last = sorted_moments[0], sorted_moments[-1]
+    bookings = (
+        select(Booking.id_room, minutes(Booking.start), minutes(Booking.end), Booking.headcount)
+        .where(Booking.start > first - MINUTES_PER_DAY, Booking.start <= last, Booking.end >= first)
+        .order_by(Booking.id_room, Booking.start)
+    )
+    if room_id:
+        bookings = bookings.where(Booking.id_room.in_(room_id))
+    room_intervals = {room: [] for room in capacities}
+    for id_room, booking_start, booking_end, headcount in await session.execute(bookings):
+        if id_room in capacities:
+            room_intervals[id_room].append((booking_start, booking_end, capacities[id_room] if headcount is None else headcount))
+    # Like bookings, occurrences count at their end minute: load those overlapping [first - 1, last + 1)
+    room_occurrences = {}
+    for occurrence in await load_occurrences(session, first - 1, last + 1, room_id):
+        if occurrence.id_room in capacities:
+            room_occurrences.setdefault(occurrence.id_room, []).append((occurrence.start, occurrence.end, capacities[occurrence.id_room]))
+
+    available, seats_free = {}, {}
+    for room, intervals in room_intervals.items():
+        if room in room_occurrences:
+            intervals = list(merge(intervals, room_occurrences[room]))
+        free_at = {
+            moment: max(capacities[room] - headcount, 0)
+            for moment, headcount in zip(sorted_moments, headcounts_at(intervals, sorted_moments))
+        }
+        seats_free[room] = [free_at[moment] for moment in moments]
+        available[room] = [free >= seats for free in seats_free[room]]
+
+    return {
+        'Timestamps': [from_epoch_minutes(moment) for moment in moments],
+        'Available': available,
+        'Seats free': seats_free,
+    }
+
+
+@router.get('/slots')
+async def search_free_slots(
+    start: str = Query(..., alias='from', description='Start of the search window (YYYY-MM-DDTHH:MMZ)'),
+    end: str = Query(..., alias='to', description='End of the search window (YYYY-MM-DDTHH:MMZ)'),
+    min_duration: int = Query(60, ge=1, description='Shortest free slot to return, in minutes'),
+    min_capacity: int = Query(0, ge=0, description='Only search rooms with at least this capacity'),
+    limit: Optional[int] = Query(None, ge=1, description='Maximum number of slots to return'),
+    seats: int = Query(1, ge=1, description='Number of seats needed'),
+    session: AsyncSession = Depends(get_db_session)
+    ) -> Dict[str, List]:
+    """
+    Searches for free slots across rooms.
+
+    This endpoint returns the intervals inside a time window in which a room is open and
+    has at least the requested number of seats free, across every room with the requested
+    capacity. Bookings take their headcount, while bookings without one and occurrences of
+    recurring bookings inside the window take the whole room. Each room's bookings are
+    merged against its daily opening hours in one pass. Slots are returned earliest first,
+    so 'limit' gives the next N available slots.
+
+    Parameters:
+        - from (str): Window start in the format YYYY-MM-DDTHH:MMZ (inclusive).
+        - to (str): Window end in the format YYYY-MM-DDTHH:MMZ (exclusive).
+        - min_duration (int, optional): Shortest slot to return, in minutes. Defaults to 60.
+        - min_capacity (int, optional): Minimum room capacity. Defaults to 0.
+        - limit (int, optional): Maximum number of slots to return.
+        - seats (int, optional): Seats needed. Defaults to 1.
+
+    Returns:
+        dict: A dictionary containing the list of free slots.
+
+    Raises:
+        HTTPException (status_code=400):
+            - If 'from' or 'to' is not in the correct format, or 'to' is not after 'from'.
+
+    Example:
+        To find the next 5 slots of at least 2 hours in rooms for 6 or more people:
+        ```
+        GET /api/rooms/slots?from=2023-07-17T00:00Z&to=2023-08-17T00:00Z&min_duration=120&min_capacity=6&limit=5
+        ```
+    """
+    start, end = check_time_window(start, end)
+
+    slots = await find_free_slots(session, start, end, min_duration, min_capacity=min_capacity, limit=limit, seats=seats)
+    slot_list = [
+        {'room_id': room_id, 'start': from_epoch_minutes(slot_start), 'end': from_epoch_minutes(slot_end), 'minutes': slot_end - slot_start}
+        for room_id, slot_start, slot_end in slots
+    ]
+
+    return {'Free slots': slot_list}
+
+
 @router.get('/overlap')
-async def get_overlapping_bookings(session: Session = Depends(get_db_session)) -> Dict[str, List]:
+@cached
+async def get_overlapping_bookings(
+    start: Optional[str] = Query(None, alias='from', description='Only check bookings running at or after this time (YYYY-MM-DDTHH:MMZ)'),
+    end: Optional[str] = Query(None, alias='to', description='Only check bookings running before this time (YYYY-MM-DDTHH:MMZ)'),
+    room_id: Optional[List[int]] = Query(None, description='Only check these rooms'),
+    offset: int = Query(0, ge=0, description='Number of overlapping pairs to skip'),
+    limit: Optional[int] = Query(None, ge=1, description='Maximum number of overlapping pairs to return'),
+    session: AsyncSession = Depends(get_db_session)
+    ) -> dict:
     """
     Gets all overlapping bookings.
 
-    This endpoint retrieves all overlapping booking pairs from the database.
+    This endpoint retrieves the overlapping booking pairs that overfill their room, including
+    occurrences of recurring bookings, which are listed by 'recurring_id'. Rooms seat several
+    bookings up to their capacity: when a booking starts and the seats taken, its own
+    included, exceed the capacity, it is paired with every booking running at that moment.
+    Bookings without a headcount, and occurrences, take the whole room. It can be
+    limited to bookings that run inside a time window and to a set of rooms; both filters
+    run inside the database on indexed columns, and only the occurrences inside the window
+    are expanded. The pairs can be paged with 'offset' and
+    'limit', while the count in the response stays the total number of pairs.
+
+    Parameters:
+        - from (str, optional): Window start in the format YYYY-MM-DDTHH:MMZ (inclusive).
+        - to (str, optional): Window end in the format YYYY-MM-DDTHH:MMZ (exclusive).
+        - room_id (int, optional, repeatable): Rooms to check.
+        - offset (int, optional): Number of pairs to skip.
+        - limit (int, optional): Maximum number of pairs to return.
 
     Returns:
         dict: A dictionary containing information about overlapping bookings.
 
     Raises:
+        HTTPException (status_code=400):
+            - If 'from' or 'to' is not in the correct format, or 'to' is not after 'from'.
         HTTPException (status_code=404):
             - If no booking information is found in the database. Try using the 'data/load' endpoint first.
+
+    Example:
+        To get overlapping bookings in Room 1 for one week:
+        ```
+        GET /api/rooms/overlap?from=2023-07-17T00:00Z&to=2023-07-24T00:00Z&room_id=1
+        ```
     """
-    bookings = session.query(Booking).all()
+    start, end = check_time_window(start, end)
+
+    capacities = dict((await session.execute(select(Room.room_id, Room.capacity))).all())
+    booking = Bundle('booking', Booking.id, Booking.id_room, Booking.id_client, Booking.start, Booking.end, Booking.headcount)
+    query = select(booking, minutes(Booking.start).label('start_minutes'), minutes(Booking.end).label('end_minutes'))
+    if start is not None:
+        # Bookings last less than a day, so the start range is bounded on both sides
+        query = query.where(Booking.end > start, Booking.start > start - MINUTES_PER_DAY)
+    if end is not None:
+        query = query.where(Booking.start < end)
+    if room_id:
+        query = query.where(Booking.id_room.in_(room_id))
+    intervals = [
+        (booking, booking_start, booking_end, capacities.get(booking.id_room, 1) if booking.headcount is None else booking.headcount)
+        for booking, booking_start, booking_end in await session.execute(query)
+    ]
+    intervals += [
+        (with_wire_times(occurrence), occurrence.start, occurrence.end, capacities.get(occurrence.id_room, 1))
+        for occurrence in await load_occurrences(session, start, end, room_id)
+    ]
     
-    if not bookings:
+    if not intervals and not await table_existence.any_rows(session, Booking):
         raise HTTPException(status_code=404, detail='No booking information found. Try using data/load root first.')
 
-    return check_overlap(bookings)
\ No newline at end of file
+    return check_overlap(intervals, capacities, offset=offset, limit=limit)
+
+
+@router.get('/occupancy')
+@cached
+async def get_occupancy_timeline(
+    start: str = Query(..., alias='from', description='Start of the window (YYYY-MM-DDTHH:MMZ)'),
+    end: str = Query(..., alias='to', description='End of the window (YYYY-MM-DDTHH:MMZ)'),
+    room_id: Optional[List[int]] = Query(None, description='Only report these rooms'),
+    session: AsyncSession = Depends(get_db_session)
+    ) -> Dict[str, Dict]:
+    """
+    Gets the seats taken in each room over a time window, and the peak.
+
+    This endpoint returns, for each room, every change in the number of seats taken inside
+    the window, with the room's capacity and the highest headcount reached. Bookings without
+    a headcount and occurrences of recurring bookings take the whole room. Each room's
+    timeline is one sweep over the sorted start and end events of its bookings.
+
+    Parameters:
+        - from (str): Window start in the format YYYY-MM-DDTHH:MMZ (inclusive).
+        - to (str): Window end in the format YYYY-MM-DDTHH:MMZ (exclusive).
+        - room_id (int, optional, repeatable): Rooms to report on.
+
+    Returns:
+        dict: A dictionary containing the capacity, peak headcount and timeline of each room.
+
+    Raises:
+        HTTPException (status_code=400):
+            - If 'from' or 'to' is not in the correct format, or 'to' is not after 'from'.
+
+    Example:
+        To get the occupancy of Room 2 on one day:
+        ```
+        GET /api/rooms/occupancy?from=2023-07-18T00:00Z&to=2023-07-19T00:00Z&room_id=2
+        ```
+    """
+    start, end = check_time_window(start, end)
+
+    rooms = select(Room.room_id, Room.capacity).order_by(Room.room_id)
+    bookings = (
+        select(Booking.id_room, minutes(Booking.start), minutes(Booking.end), Booking.headcount)
+        .where(Booking.start > start - MINUTES_PER_DAY, Booking.start < end, Booking.end > start)
+    )
+    if room_id:
+        rooms = rooms.where(Room.room_id.in_(room_id))
+        bookings = bookings.where(Booking.id_room.in_(room_id))
+    capacities = dict((await session.execute(rooms)).all())
+
+    room_intervals = {room: [] for room in capacities}
+    for id_room, booking_start, booking_end, headcount in await session.execute(bookings):
+        if id_room in capacities:
+            room_intervals[id_room].append((booking_start, booking_end, capacities[id_room] if headcount is None else headcount))
+    for occurrence in await load_occurrences(session, start, end, room_id):
+        if occurrence.id_room in capacities:
+            room_intervals[occurrence.id_room].append((occurrence.start, occurrence.end, capacities[occurrence.id_room]))
+
+    occupancy = {}
+    for room, intervals in room_intervals.items():
+        timeline = list(headcount_timeline(clip(intervals, start, end)))
+        peak_at, peak = max(timeline, key=itemgetter(1), default=(None, 0))
+        occupancy[room] = {
+            'Capacity': capacities[room],
+            'Peak headcount': peak,
+            'Peak at': None if peak_at is None else from_epoch_minutes(peak_at),
+            'Timeline': [{'time': from_epoch_minutes(moment), 'headcount': headcount} for moment, headcount in timeline],
+        }
+
+    return {'Occupancy by room': occupancy}
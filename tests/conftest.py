@@ -0,0 +1,21 @@
+import os
+import tempfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+database_directory = tempfile.TemporaryDirectory()
+os.environ.setdefault('COWORKING_DB_PATH', os.path.join(database_directory.name, 'test.db'))
+
+from main import app
+
+
+@pytest.fixture(scope='session', autouse=True)
+def app_lifespan():
+    """
+    Runs the app's startup and shutdown once around the test session, against a fresh
+    database holding the initial data unless COWORKING_DB_PATH points elsewhere.
+    """
+    with TestClient(app) as client:
+        client.post('/api/data/load')
+        yield
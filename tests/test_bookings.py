@@ -1,3 +1,7 @@
+import asyncio
+from datetime import date, timedelta
+
+import httpx
 from fastapi.testclient import TestClient
 from main import app
 
@@ -47,3 +51,175 @@ def test_get_bookings_by_filter_response_type():
     response = client.get('/api/bookings/filter', params=params)
     response_data = response.json()
     assert isinstance(response_data, list)
+
+def test_get_all_bookings_pagination():
+    first_page = client.get('/api/bookings', params={'limit': 2}).json()
+    assert len(first_page['All bookings']) == 2
+    second_page = client.get('/api/bookings', params={'limit': 2, 'after': first_page['Next cursor']}).json()
+    assert second_page['All bookings'][0]['id'] > first_page['All bookings'][-1]['id']
+
+def test_stream_all_bookings_response_type():
+    response = client.get('/api/bookings/stream')
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    lines = response.text.splitlines()
+    assert len(lines) == len(client.get('/api/bookings').json()['All bookings'])
+
+def test_make_bulk_bookings_reports_row_errors():
+    data = [
+        {'id_room': 0, 'id_client': 1, 'start': '2023-09-24T12:00Z', 'end': '2023-09-24T14:00Z'},
+        {'id_room': 1, 'id_client': 1, 'start': '2023-02-30T12:00Z', 'end': '2023-09-24T14:00Z'},
+    ]
+    response = client.post('/api/bookings/bulk', json=data)
+    assert response.status_code == 200
+    assert response.json()['Bookings added'] == 0
+    assert [error['row'] for error in response.json()['Errors']] == [0, 1]
+
+def test_make_bulk_bookings_checks_stored_bookings():
+    single = {'id_room': 3, 'id_client': 1, 'start': '2500-03-01T10:00Z', 'end': '2500-03-01T11:00Z'}
+    weekly = {'id_room': 3, 'id_client': 1, 'start': '2500-03-08T11:00Z', 'end': '2500-03-08T12:00Z', 'frequency': 'WEEKLY', 'until': '2500-03-30T00:00Z'}
+    booking_id = client.post('/api/bookings/make', data=single).json()['Booking confirmed']['id']
+    rule_id = client.post('/api/bookings/recurring', data=weekly).json()['Recurring booking confirmed']['id']
+    data = [
+        {**single, 'start': '2500-03-01T10:30Z', 'end': '2500-03-01T11:30Z'},
+        {**single, 'start': '2500-03-15T11:30Z', 'end': '2500-03-15T12:30Z'},
+        {**single, 'start': '2500-03-01T11:00Z', 'end': '2500-03-01T12:00Z'},
+        {**single, 'start': '2500-03-01T11:30Z', 'end': '2500-03-01T12:00Z'},
+    ]
+    response = client.post('/api/bookings/bulk', json=data).json()
+    assert response['Bookings added'] == 1
+    assert [(error['row'], error['detail']) for error in response['Errors']] == [
+        (0, f'Room 3 is already booked at the requested time (booking {booking_id}).'),
+        (1, f'Room 3 is already booked at the requested time (recurring booking {rule_id}).'),
+        (3, 'Room 3 is booked by an earlier row at the requested time.'),
+    ]
+
+def test_make_bulk_bookings_error_status_code():
+    response = client.post('/api/bookings/bulk', content='not json', headers={'content-type': 'application/json'})
+    assert response.status_code == 400
+
+def test_make_new_booking_conflict_status_code():
+    day = '2100-01-04'
+    data = {'id_room': 1, 'id_client': 1, 'start': f'{day}T10:00Z', 'end': f'{day}T11:00Z'}
+    assert client.post('/api/bookings/make', data=data).status_code == 200
+    overlapping = {**data, 'start': f'{day}T10:30Z', 'end': f'{day}T11:30Z'}
+    assert client.post('/api/bookings/make', data=overlapping).status_code == 409
+    closed = {**data, 'start': f'{day}T06:00Z', 'end': f'{day}T07:00Z'}
+    assert client.post('/api/bookings/make', data=closed).status_code == 400
+
+def test_make_new_booking_response():
+    day = '2110-02-08'
+    data = {'id_room': 3, 'id_client': 2, 'start': f'{day}T12:00Z', 'end': f'{day}T13:30Z'}
+    booking = client.post('/api/bookings/make', data=data).json()['Booking confirmed']
+    assert booking == {'id': booking['id'], **data, 'headcount': None}
+    assert client.post('/api/bookings/make', data={**data, 'id_client': 999999}).status_code == 404
+    assert client.post('/api/bookings/make', data={**data, 'id_room': 999999}).status_code == 404
+
+def test_make_new_booking_concurrent_writers():
+    day = '2120-03-15'
+    attempts = [
+        {'id_room': 1, 'id_client': 1, 'start': f'{day}T{hour:02d}:00Z', 'end': f'{day}T{hour + 2:02d}:00Z'}
+        for hour in [10, 11, 12] * 5
+    ]
+
+    async def make_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as async_client:
+            return await asyncio.gather(*(async_client.post('/api/bookings/make', data=data) for data in attempts))
+
+    responses = asyncio.run(make_all())
+    assert {response.status_code for response in responses} <= {200, 409}
+
+    bookings = client.get('/api/bookings').json()['All bookings']
+    same_day = sorted(
+        (booking['start'], booking['end']) for booking in bookings
+        if booking['id_room'] == 1 and booking['start'].startswith(day)
+    )
+    assert len(same_day) == sum(response.status_code == 200 for response in responses) >= 1
+    for (_, previous_end), (next_start, _) in zip(same_day, same_day[1:]):
+        assert previous_end <= next_start
+
+def make_weekly_booking(first: date):
+    weeks = [(first + timedelta(weeks=number)).isoformat() for number in range(4)]
+    data = {
+        'id_room': 2, 'id_client': 1, 'start': f'{weeks[0]}T09:00Z', 'end': f'{weeks[0]}T10:00Z',
+        'frequency': 'WEEKLY', 'until': f'{weeks[3]}T00:00Z',
+    }
+    response = client.post('/api/bookings/recurring', data=data)
+    assert response.status_code == 200
+    return data, weeks, response.json()['Recurring booking confirmed']
+
+def test_make_recurring_booking_blocks_occurrences():
+    data, weeks, rule = make_weekly_booking(date(3100, 4, 5))
+    assert rule == {'id': rule['id'], **data, 'interval': 1}
+    single = {'id_room': 2, 'id_client': 2, 'start': f'{weeks[2]}T09:30Z', 'end': f'{weeks[2]}T11:00Z'}
+    assert client.post('/api/bookings/make', data=single).status_code == 409
+    assert client.post('/api/bookings/make', data={**single, 'start': f'{weeks[2]}T10:00Z'}).status_code == 200
+    day_after = (date.fromisoformat(weeks[1]) + timedelta(days=1)).isoformat()
+    for start, end in [('T09:30Z', 'T10:30Z'), ('T10:30Z', 'T11:30Z')]:
+        daily = {**data, 'frequency': 'DAILY', 'start': day_after + start, 'end': day_after + end}
+        assert client.post('/api/bookings/recurring', data=daily).status_code == 409
+    assert client.post('/api/bookings/recurring', data={**data, 'frequency': 'MONTHLY'}).status_code == 400
+
+def test_recurring_booking_occurrences_in_reports():
+    _, weeks, rule = make_weekly_booking(date(3200, 8, 2))
+    params = {'from': f'{weeks[1]}T00:00Z', 'to': f'{weeks[3]}T00:00Z', 'room_id': 2}
+    occurrences = client.get('/api/bookings/occurrences', params=params).json()['Occurrences']
+    assert [(occurrence['recurring_id'], occurrence['start']) for occurrence in occurrences] == [
+        (rule['id'], f'{weeks[1]}T09:00Z'), (rule['id'], f'{weeks[2]}T09:00Z'),
+    ]
+    assert 'Busy' in client.get(f'/api/rooms/availability/2/{weeks[1]}T09:30Z').json()['Room 2']
+    slots = client.get('/api/rooms/slots', params={'from': f'{weeks[1]}T00:00Z', 'to': f'{weeks[1]}T23:00Z', 'min_capacity': 10}).json()
+    assert [(slot['start'], slot['end']) for slot in slots['Free slots']] == [
+        (f'{weeks[1]}T08:00Z', f'{weeks[1]}T09:00Z'), (f'{weeks[1]}T10:00Z', f'{weeks[1]}T14:00Z'),
+    ]
+    for start, end in [('T00:00Z', 'T00:00Z'), ('T08:00Z', 'T20:00Z')]:
+        next_day = (date.fromisoformat(weeks[1]) + timedelta(days=1)).isoformat()
+        usage = client.get('/api/rooms/usage', params={'from': weeks[1] + start, 'to': (next_day if end == 'T00:00Z' else weeks[1]) + end}).json()
+        assert usage['Usage percentage by room']['2'] == '17.0%'
+
+def test_make_new_booking_counts_seats():
+    day = '4100-09-12'
+    data = {'id_room': 2, 'id_client': 1, 'start': f'{day}T09:00Z', 'end': f'{day}T11:00Z', 'headcount': 6}
+    assert client.post('/api/bookings/make', data=data).status_code == 200
+    assert client.post('/api/bookings/make', data={**data, 'start': f'{day}T10:00Z', 'end': f'{day}T12:00Z', 'headcount': 4}).status_code == 200
+    assert client.post('/api/bookings/make', data={**data, 'start': f'{day}T10:30Z', 'headcount': 1}).status_code == 409
+    whole_room = {key: value for key, value in data.items() if key != 'headcount'}
+    assert client.post('/api/bookings/make', data={**whole_room, 'start': f'{day}T11:30Z', 'end': f'{day}T12:30Z'}).status_code == 409
+    assert client.post('/api/bookings/make', data={**data, 'start': f'{day}T12:00Z', 'end': f'{day}T13:00Z', 'headcount': 11}).status_code == 400
+
+    busy = client.get(f'/api/rooms/availability/2/{day}T10:30Z').json()
+    assert busy['Room 2'].startswith('Busy') and busy['Seats free'] == 0
+    assert client.get(f'/api/rooms/availability/2/{day}T09:30Z', params={'seats': 4}).json()['Room 2'].startswith('Available')
+    assert client.get(f'/api/rooms/availability/2/{day}T09:30Z', params={'seats': 5}).json()['Room 2'].startswith('Busy')
+
+    window = {'from': f'{day}T00:00Z', 'to': f'{day}T23:00Z', 'room_id': 2}
+    occupancy = client.get('/api/rooms/occupancy', params=window).json()['Occupancy by room']['2']
+    assert (occupancy['Capacity'], occupancy['Peak headcount'], occupancy['Peak at']) == (10, 10, f'{day}T10:00Z')
+    assert [step['headcount'] for step in occupancy['Timeline']] == [6, 10, 4, 0]
+    assert client.get('/api/rooms/overlap', params=window).json() == {'message': 'No overlapping bookings'}
+
+def test_free_slots_count_seats():
+    day = '2600-05-03'
+    booking = {'id_room': 2, 'id_client': 1, 'start': f'{day}T09:00Z', 'end': f'{day}T11:00Z', 'headcount': 1}
+    assert client.post('/api/bookings/make', data=booking).status_code == 200
+    params = {'from': f'{day}T00:00Z', 'to': f'{day}T23:00Z', 'min_capacity': 10}
+    for seats, expected in [(9, [('T08:00Z', 'T14:00Z')]), (10, [('T08:00Z', 'T09:00Z'), ('T11:00Z', 'T14:00Z')])]:
+        slots = client.get('/api/rooms/slots', params={**params, 'seats': seats}).json()['Free slots']
+        assert [(slot['start'], slot['end']) for slot in slots if slot['room_id'] == 2] == [(day + start, day + end) for start, end in expected]
+    assert client.get(f'/api/rooms/availability/2/{day}T10:00Z', params={'seats': 9}).json()['Seats free'] == 9
+
+def test_recurring_booking_occurrences_in_statistics():
+    weekly = {'id_room': 2, 'id_client': 7, 'start': '2700-06-07T09:00Z', 'end': '2700-06-07T11:00Z', 'frequency': 'WEEKLY', 'until': '2700-06-28T00:00Z'}
+    assert client.post('/api/bookings/recurring', data=weekly).status_code == 200
+    params = {'from': '2700-06-01T00:00Z', 'to': '2700-07-01T00:00Z', 'room_id': 2}
+    daily = client.get('/api/rooms/stats/daily', params=params).json()['Occupancy percentage by day']
+    assert daily == {'2700-06-07': 33.3, '2700-06-14': 33.3, '2700-06-21': 33.3}
+    hourly = client.get('/api/rooms/stats/hourly', params=params).json()
+    assert hourly['Peak hours'][:2] == ['09:00', '10:00'] and hourly['Average bookings in progress by hour']['09:00'] == 1.0
+    lengths = client.get('/api/rooms/stats/lengths', params={**params, 'bin_minutes': 60}).json()
+    assert lengths == {'Bookings by length in minutes': {'120-180': 3}}
+    window = {'from': params['from'], 'to': params['to']}
+    assert client.get('/api/clients/bookings', params=window).json()['Bookings per client'] == {'7': 3}
+    summary = client.get('/api/clients/7/summary', params=window).json()['Client summary']
+    assert (summary['bookings'], summary['total_minutes'], summary['last_booking']) == (3, 360, '2700-06-21T09:00Z')
@@ -16,3 +16,39 @@ def tst_clients_bookings_response_type():
     data = response.json()
     assert isinstance(data, dict)
         
+
+def test_clients_bookings_top_and_window():
+    counts = client.get('/api/clients/bookings').json()['Bookings per client']
+    top = client.get('/api/clients/bookings', params={'top': 2}).json()['Bookings per client']
+    assert len(top) == 2
+    assert list(top.values()) == sorted(counts.values(), reverse=True)[:2]
+    params = {'from': '2023-07-18T00:00Z', 'to': '2023-07-19T00:00Z'}
+    window = client.get('/api/clients/bookings', params=params).json()['Bookings per client']
+    assert sum(window.values()) < sum(counts.values())
+
+def test_client_summary():
+    counts = client.get('/api/clients/bookings').json()['Bookings per client']
+    client_id, bookings = next(iter(counts.items()))
+    data = client.get(f'/api/clients/{client_id}/summary').json()['Client summary']
+    assert data['bookings'] == bookings
+    assert data['total_minutes'] > 0
+    assert data['last_booking'] is not None
+
+def test_client_summary_error_status_code():
+    response = client.get('/api/clients/999999/summary')
+    assert response.status_code == 404
+
+def test_clients_bookings_etag_not_modified():
+    response = client.get('/api/clients/bookings')
+    etag = response.headers['ETag']
+    response = client.get('/api/clients/bookings', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.content == b''
+
+def test_clients_bookings_cache_invalidated_by_write():
+    before = client.get('/api/clients/bookings')
+    booking = {'id_room': 2, 'id_client': 1, 'start': '3001-01-02T09:00Z', 'end': '3001-01-02T10:00Z'}
+    assert client.post('/api/bookings/make', data=booking).status_code == 200
+    after = client.get('/api/clients/bookings', headers={'If-None-Match': before.headers['ETag']})
+    assert after.status_code == 200
+    assert after.json()['Bookings per client']['1'] == before.json()['Bookings per client']['1'] + 1
@@ -0,0 +1,51 @@
+import asyncio
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from database.models import Base, Booking, Room
+from utils.existence import TableExistence
+from utils.interval_index import booking_index
+
+
+def test_answers_are_cached_until_invalidated():
+    engine = create_async_engine('sqlite+aiosqlite://')
+    existence = TableExistence()
+
+    async def check():
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        async with async_sessionmaker(engine)() as session:
+            answers = [await existence.is_empty(session)]
+            await session.execute(insert(Room), {'opening': '08:00', 'closing': '18:00', 'capacity': 4})
+            await session.commit()
+            answers.append(await existence.any_rows(session, Room))
+            existence.invalidate()
+            answers += [await existence.any_rows(session, Room), await existence.any_rows(session, Booking)]
+            answers.append(await existence.is_empty(session))
+        await engine.dispose()
+        return answers
+
+    assert asyncio.run(check()) == [True, False, True, False, False]
+
+def test_refreshes_the_booking_index_once_per_session(monkeypatch):
+    engine = create_async_engine('sqlite+aiosqlite://')
+    existence = TableExistence()
+    refreshes = []
+
+    async def refresh(session):
+        refreshes.append(session)
+
+    monkeypatch.setattr(booking_index, 'refresh', refresh)
+
+    async def check():
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        for _ in range(2):
+            async with async_sessionmaker(engine)() as session:
+                await existence.is_empty(session)
+                await existence.any_rows(session, Room)
+        await engine.dispose()
+
+    asyncio.run(check())
+    assert len(refreshes) == 2
@@ -0,0 +1,37 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from database.db import async_sqlite_engine
+from routers import metrics_routes, room_routes
+from utils.metrics import MetricsMiddleware, instrument_engine
+
+app = FastAPI()
+app.add_middleware(MetricsMiddleware)
+app.include_router(room_routes.router, prefix='/api/rooms')
+app.include_router(metrics_routes.router)
+instrument_engine(async_sqlite_engine.sync_engine)
+
+client = TestClient(app)
+
+
+def sample(text: str, name: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(name + ' '):
+            return float(line.rsplit(' ', 1)[1])
+    raise AssertionError(f'{name} not found')
+
+def test_metrics_record_latency_and_sql_per_route():
+    assert client.get('/api/rooms/availability/1/2023-07-18T11:00Z').status_code == 200
+    client.get('/api/rooms/missing/route')
+    response = client.get('/metrics')
+    assert response.headers['content-type'].startswith('text/plain; version=0.0.4')
+    labels = '{method="GET",route="/api/rooms/availability/{room_id}/{timestamp}"}'
+    assert sample(response.text, f'coworking_request_duration_seconds_count{labels}') >= 1
+    assert sample(response.text, f'coworking_request_sql_statements_sum{labels}') >= 1
+    assert sample(response.text, 'coworking_requests_total{method="GET",route="unmatched",status="404"}') >= 1
+
+def test_profile_header_returns_profile():
+    response = client.get('/api/rooms/availability/1/2023-07-18T11:00Z', headers={'X-Profile': 'tottime'})
+    assert response.status_code == 200
+    assert response.headers['x-profiled-status'] == '200'
+    assert 'Ordered by: internal time' in response.text
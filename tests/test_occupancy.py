@@ -0,0 +1,50 @@
+import random
+from collections import namedtuple
+
+from utils.availability import headcounts_at
+from utils.occupancy import clip, crowded_stretches, headcount_timeline, peak_headcount
+from utils.overlap import find_overlapping_pairs
+
+Booking = namedtuple('Booking', ['id', 'id_room'])
+
+
+def random_intervals(count: int) -> list:
+    intervals = []
+    for _ in range(count):
+        start = random.randint(0, 200)
+        intervals.append((start, start + random.randint(1, 50), random.randint(1, 4)))
+    return intervals
+
+def test_headcount_timeline_matches_brute_force():
+    for _ in range(100):
+        intervals = random_intervals(20)
+        taken = {moment: headcount for moment, headcount in headcount_timeline(intervals)}
+        current = 0
+        for moment in range(260):
+            current = taken.get(moment, current)
+            assert current == sum(seats for start, end, seats in intervals if start <= moment < end)
+        assert peak_headcount(clip(intervals, 50, 100))[0] == max(
+            [sum(seats for start, end, seats in intervals if start <= moment < end) for moment in range(50, 100)]
+        )
+
+def test_find_overlapping_pairs_respects_capacity():
+    bookings = [(Booking(1, 1), 0, 10, 3), (Booking(2, 1), 5, 15, 3), (Booking(3, 1), 8, 12, 3), (Booking(4, 1), 15, 20, 6)]
+    pairs = find_overlapping_pairs(bookings, {1: 7})
+    assert {(first.id, second.id) for first, second in pairs} == {(1, 3), (2, 3)}
+    assert len(find_overlapping_pairs(bookings)) == 3
+
+def test_headcounts_at_matches_brute_force():
+    for _ in range(100):
+        intervals = sorted(random_intervals(20))
+        moments = sorted(random.sample(range(-10, 260), 40))
+        expected = [sum(seats for start, end, seats in intervals if start <= moment <= end) for moment in moments]
+        assert headcounts_at(intervals, moments) == expected
+
+def test_crowded_stretches_matches_brute_force():
+    for _ in range(100):
+        intervals = sorted(random_intervals(20))
+        limit = random.randint(0, 6)
+        stretches = list(crowded_stretches(intervals, limit))
+        for moment in range(300):
+            headcount = sum(seats for start, end, seats in intervals if start <= moment < end)
+            assert (headcount > limit) == any(start <= moment < end for start, end in stretches)
@@ -0,0 +1,49 @@
+import random
+
+from utils.recurrence import expand, find_overlaps, first_overlap, occurrences, rule_period
+
+DAY = 24 * 60
+WEEK = 7 * DAY
+
+
+class Rule:
+    def __init__(self, id, id_room, start, end, frequency, interval, until):
+        self.id, self.id_room, self.id_client = id, id_room, 1
+        self.start, self.end, self.frequency, self.interval, self.until = start, end, frequency, interval, until
+
+
+def test_occurrences_only_inside_window():
+    every = list(occurrences(9 * 60, 10 * 60, WEEK, 10 * WEEK))
+    assert len(every) == 10
+    for _ in range(200):
+        window_start = random.randint(-WEEK, 11 * WEEK)
+        window_end = window_start + random.randint(1, 3 * WEEK)
+        expected = [(start, end) for start, end in every if start < window_end and end > window_start]
+        assert list(occurrences(9 * 60, 10 * 60, WEEK, 10 * WEEK, window_start, window_end)) == expected
+
+def test_expand_merges_rules_by_start():
+    rules = [Rule(1, 1, 9 * 60, 10 * 60, 'WEEKLY', 1, 4 * WEEK), Rule(2, 2, 11 * 60, 12 * 60, 'DAILY', 2, 4 * WEEK)]
+    expanded = list(expand(rules, WEEK, 2 * WEEK))
+    assert [occurrence.start for occurrence in expanded] == sorted(occurrence.start for occurrence in expanded)
+    assert [occurrence.recurring_id for occurrence in expanded].count(1) == 1
+    assert all(occurrence.end - occurrence.start == 60 for occurrence in expanded)
+    assert rule_period('DAILY', 2) == 2 * DAY
+
+def test_first_overlap_matches_brute_force():
+    for _ in range(200):
+        intervals = sorted((start, start + random.randint(1, 30)) for start in random.sample(range(500), 8))
+        others = sorted((start, start + random.randint(1, 30), number) for number, start in enumerate(random.sample(range(500), 8)))
+        overlapping = [other for other in others if any(start < other[1] and end > other[0] for start, end in intervals)]
+        found = first_overlap(intervals, others)
+        assert (found is None) == (not overlapping)
+        assert found is None or found in overlapping
+
+def test_find_overlaps_matches_brute_force():
+    for _ in range(200):
+        intervals = sorted((start, start + random.randint(1, 30), number) for number, start in enumerate(random.sample(range(500), 8)))
+        others = sorted((start, start + random.randint(1, 30), number) for number, start in enumerate(random.sample(range(500), 8)))
+        found = find_overlaps(intervals, others)
+        for interval in intervals:
+            overlapping = [other for other in others if interval[0] < other[1] and interval[1] > other[0]]
+            assert (interval in found) == bool(overlapping)
+            assert interval not in found or found[interval] in overlapping
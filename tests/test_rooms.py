@@ -1,4 +1,9 @@
 from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from database import rollups
+from database.db import sqlite_engine
+from database.models import RoomDailyUsage
 from main import app
 
 client = TestClient(app)
@@ -17,12 +22,20 @@ def test_add_new_room_response_error_code():
     data = [
         {'opening': 't8:00', 'closing': '17:00', 'capacity': '10'},
         {'opening': '08:00', 'closing': '17:00', 'capacity': '0'},
-        {'opening': '08:00', 'closing': '17-00', 'capacity': '10'}
+        {'opening': '08:00', 'closing': '17-00', 'capacity': '10'},
+        {'opening': '08:00', 'closing': '25:99', 'capacity': '10'},
+        {'opening': '08:60', 'closing': '17:00', 'capacity': '10'},
+        {'opening': '17:00', 'closing': '08:00', 'capacity': '10'},
         ]
     for test_item in data:
         response = client.post('/api/rooms/add', data=test_item)
         assert response.status_code == 400
     
+def test_add_new_room_response():
+    data = {'opening': '09:00', 'closing': '17:30', 'capacity': '12'}
+    room = client.post('/api/rooms/add', data=data).json()['Room added']
+    assert room == {'room_id': room['room_id'], 'opening': '09:00', 'closing': '17:30', 'capacity': 12}
+
 def test_get_rooms_usage_status_code():
     response = client.get('/api/rooms/usage')
     assert response.status_code == 200
@@ -41,6 +54,10 @@ def test_check_room_availablility_response_type():
     data = response.json()
     assert isinstance(data, dict)
 
+def test_check_room_availability_error_status_code():
+    for timestamp in ['2023-09-01T10:00', '2023-02-30T10:00Z', '2023-07-18T24:00Z']:
+        assert client.get(f'/api/rooms/availability/1/{timestamp}').status_code == 400
+
 def test_get_overlapping_bookings_status_code():
     response = client.get('/api/rooms/overlap')
     assert response.status_code == 200
@@ -49,3 +66,105 @@ def test_get_overlapping_bookings_response_type():
     response = client.get('/api/rooms/overlap')
     data = response.json()
     assert isinstance(data, dict)
+
+def test_get_overlapping_bookings_reports_each_pair_once():
+    response = client.get('/api/rooms/overlap')
+    data = response.json()
+    for pairs in data.values():
+        if isinstance(pairs, list):
+            pair_ids = [frozenset((pair['booking1']['id'], pair['booking2']['id'])) for pair in pairs]
+            assert len(pair_ids) == len(set(pair_ids))
+
+def test_check_room_availability_busy_during_booking():
+    response = client.get('/api/rooms/availability/1/2023-07-18T11:00Z')
+    data = response.json()
+    assert data['Room 1'].startswith('Busy')
+
+def test_get_rooms_usage_with_window_status_code():
+    params = {'from': '2023-07-18T00:00Z', 'to': '2023-07-19T00:00Z', 'room_id': [1, 2]}
+    response = client.get('/api/rooms/usage', params=params)
+    assert response.status_code == 200
+
+def test_get_rooms_usage_window_error_status_code():
+    params = {'from': '2023-07-19T00:00Z', 'to': '2023-07-18T00:00Z'}
+    response = client.get('/api/rooms/usage', params=params)
+    assert response.status_code == 400
+
+def test_get_overlapping_bookings_with_window_status_code():
+    params = {'from': '2023-07-18T00:00Z', 'to': '2023-07-19T00:00Z', 'room_id': 1, 'limit': 1}
+    response = client.get('/api/rooms/overlap', params=params)
+    assert response.status_code == 200
+
+def test_report_window_invalid_date_error_status_code():
+    for params in [{'from': '2023-02-30T00:00Z'}, {'to': '2023-13-01T00:00Z'}, {'from': '2023-07-18T25:00Z'}]:
+        assert client.get('/api/rooms/usage', params=params).status_code == 400
+        assert client.get('/api/rooms/overlap', params=params).status_code == 400
+
+def test_report_window_filters_results():
+    params = {'from': '2023-07-18T00:00Z', 'to': '2023-07-19T00:00Z'}
+    all_overlaps = client.get('/api/rooms/overlap').json()
+    window_overlaps = client.get('/api/rooms/overlap', params=params).json()
+    assert list(window_overlaps) != list(all_overlaps)
+    all_usage = client.get('/api/rooms/usage').json()
+    window_usage = client.get('/api/rooms/usage', params=params).json()
+    assert window_usage != all_usage
+
+def test_search_free_slots_skips_bookings():
+    params = {'from': '2023-07-18T00:00Z', 'to': '2023-07-19T00:00Z', 'min_duration': 30}
+    response = client.get('/api/rooms/slots', params=params)
+    assert response.status_code == 200
+    room_1_slots = [slot for slot in response.json()['Free slots'] if slot['room_id'] == 1]
+    assert room_1_slots == [{'room_id': 1, 'start': '2023-07-18T08:00Z', 'end': '2023-07-18T10:00Z', 'minutes': 120}]
+
+def test_search_free_slots_filters_capacity_and_limit():
+    params = {'from': '2023-07-17T00:00Z', 'to': '2023-08-17T00:00Z', 'min_capacity': 6, 'limit': 5}
+    slots = client.get('/api/rooms/slots', params=params).json()['Free slots']
+    assert len(slots) == 5
+    assert all(slot['room_id'] != 1 for slot in slots)
+    assert [slot['start'] for slot in slots] == sorted(slot['start'] for slot in slots)
+
+def test_search_free_slots_window_error_status_code():
+    params = {'from': '2023-07-19T00:00Z', 'to': '2023-07-18T00:00Z'}
+    response = client.get('/api/rooms/slots', params=params)
+    assert response.status_code == 400
+
+def test_room_stats_status_code():
+    params = {'from': '2023-07-18T00:00Z', 'to': '2023-07-19T00:00Z'}
+    for path in ['daily', 'hourly', 'lengths']:
+        response = client.get(f'/api/rooms/stats/{path}', params=params)
+        assert response.status_code == 200
+
+def test_room_stats_daily_window():
+    params = {'from': '2023-07-18T00:00Z', 'to': '2023-07-19T00:00Z'}
+    data = client.get('/api/rooms/stats/daily', params=params).json()
+    assert list(data['Occupancy percentage by day']) == ['2023-07-18']
+
+def test_room_stats_hourly_peak_hours():
+    data = client.get('/api/rooms/stats/hourly').json()
+    load = data['Average bookings in progress by hour']
+    assert len(load) == 24
+    assert load[data['Peak hours'][0]] == max(load.values())
+
+def test_room_daily_usage_rollup_matches_rebuild():
+    query = select(RoomDailyUsage.id_room, RoomDailyUsage.day, RoomDailyUsage.booked_minutes, RoomDailyUsage.booking_count).order_by(RoomDailyUsage.id_room, RoomDailyUsage.day)
+    with sqlite_engine.connect() as connection:
+        with connection.begin() as transaction:
+            stored = connection.execute(query).all()
+            rollups.rebuild(connection)
+            assert connection.execute(query).all() == stored
+            transaction.rollback()
+
+def test_check_rooms_availability_matches_single_lookups():
+    params = {'room_id': [1, 2, 3], 'from': '2023-07-18T08:00Z', 'to': '2023-07-18T20:00Z', 'step': 45}
+    data = client.get('/api/rooms/availability', params=params).json()
+    assert len(data['Timestamps']) == 16
+    for room in ['1', '2', '3']:
+        for timestamp, available, seats_free in zip(data['Timestamps'], data['Available'][room], data['Seats free'][room]):
+            single = client.get(f'/api/rooms/availability/{room}/{timestamp}').json()
+            assert single[f'Room {room}'].startswith('Available') == available
+            assert single['Seats free'] == seats_free
+
+def test_check_rooms_availability_error_status_code():
+    assert client.get('/api/rooms/availability', params={'room_id': 1}).status_code == 400
+    assert client.get('/api/rooms/availability', params={'timestamp': '2023-07-18T10:00'}).status_code == 400
+    assert client.get('/api/rooms/availability', params={'room_id': 999999, 'timestamp': '2023-07-18T10:00Z'}).status_code == 404
@@ -0,0 +1,45 @@
+import asyncio
+import copy
+import io
+import json
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from database import seed
+from database.models import Base, Booking, Room, RoomDailyUsage
+from original_data.original_data import data
+
+
+def test_iter_json_streams_across_reads(monkeypatch):
+    monkeypatch.setattr(seed, 'READ_SIZE', 7)
+    text = json.dumps(data, indent=1)
+    assert list(seed.iter_json(io.StringIO(text))) == list(seed.iter_data(data))
+
+def test_iter_csv_converts_integers_and_empty_fields():
+    file = io.StringIO('id_room,id_client,start,end,headcount\n1,2,2023-07-18T10:00Z,2023-07-18T11:00Z,\n')
+    assert list(seed.iter_csv(file, 'bookings')) == [
+        ('bookings', {'id_room': 1, 'id_client': 2, 'start': '2023-07-18T10:00Z', 'end': '2023-07-18T11:00Z', 'headcount': None}),
+    ]
+
+def test_load_records_batches_and_leaves_data_untouched():
+    original = copy.deepcopy(data)
+    engine = create_async_engine('sqlite+aiosqlite://')
+    progress = []
+
+    async def load():
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        async with async_sessionmaker(engine)() as session:
+            loaded = await seed.load_records(session, seed.iter_data(data), batch_size=4, progress=progress.append)
+            counts = [await session.scalar(select(func.count()).select_from(model)) for model in (Room, Booking)]
+            booked = await session.scalar(select(func.sum(RoomDailyUsage.booking_count)))
+        await engine.dispose()
+        return loaded, counts, booked
+
+    loaded, counts, booked = asyncio.run(load())
+    bookings = len(data['bookings'])
+    assert loaded == {'rooms': 3, 'clients': 7, 'bookings': bookings}
+    assert counts == [3, bookings] and booked == bookings
+    assert len(progress) == 1 + 2 + -(-bookings // 4)
+    assert data == original
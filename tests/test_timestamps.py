@@ -0,0 +1,26 @@
+import pytest
+
+from utils.timestamps import format_minutes, np, parse_many, parse_minutes
+
+VALID = ['1970-01-01T00:00Z', '2023-07-18T10:30Z', '2024-02-29T23:59Z', '1969-12-31T23:59Z']
+INVALID = ['2023-02-29T00:00Z', '2023-13-01T00:00Z', '2023-07-18T24:00Z', '2023-7-18T10:00Z', '2023-07-18 10:00Z', '2023-07-18T10:00Z ']
+
+
+def test_parse_minutes_round_trip():
+    assert parse_minutes('1970-01-02T01:01Z') == 24 * 60 + 61
+    for value in VALID:
+        assert format_minutes(parse_minutes(value)) == value
+
+def test_parse_minutes_rejects_invalid_timestamps():
+    for value in INVALID:
+        with pytest.raises(ValueError):
+            parse_minutes(value)
+
+def test_parse_many_matches_parse_minutes():
+    expected = [parse_minutes(value) for value in VALID]
+    assert list(parse_many(VALID)) == expected
+    if np is not None:
+        assert parse_many(VALID, numpy=True).tolist() == expected
+        for value in INVALID:
+            with pytest.raises(ValueError):
+                parse_many(VALID + [value], numpy=True)
@@ -0,0 +1,147 @@
+from collections import namedtuple
+from itertools import chain
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from database.models import Booking
+from database.types import minutes
+from utils.interval_index import booking_index
+from utils.timestamps import format_minutes
+
+MINUTES_PER_DAY = 24 * 60
+
+BookingColumns = namedtuple('BookingColumns', ['id_room', 'start', 'end'])
+
+def load_columns(session: Session) -> BookingColumns:
+    """
+    Reads every booking's (id_room, start, end) into int64 arrays sorted by start
+
+    The query runs through exec_driver_sql so rows go straight from the driver into
+    NumPy without SQLAlchemy's per-row result processing.
+    """
+    query = select(Booking.id_room, minutes(Booking.start), minutes(Booking.end)).where(Booking.id_room.is_not(None))
+    rows = session.connection().exec_driver_sql(str(query.compile(dialect=session.get_bind().dialect)))
+    table = np.fromiter(chain.from_iterable(rows), dtype=np.int64).reshape(-1, 3)
+    table = table[np.argsort(table[:, 1], kind='stable')]
+    return BookingColumns(*(np.ascontiguousarray(table[:, column]) for column in range(3)))
+
+def add_occurrence_columns(columns: BookingColumns, occurrences) -> BookingColumns:
+    """
+    Returns the columns with the (id_room, start, end) of recurring booking occurrences added, still sorted by start
+    """
+    extra = np.array([(occurrence.id_room, occurrence.start, occurrence.end) for occurrence in occurrences], dtype=np.int64)
+    if not len(extra):
+        return columns
+    table = np.concatenate([np.column_stack(columns), extra])
+    table = table[np.argsort(table[:, 1], kind='stable')]
+    return BookingColumns(*(np.ascontiguousarray(table[:, column]) for column in range(3)))
+
+def window(columns: BookingColumns, start: int = None, end: int = None, room_ids: list = None) -> BookingColumns:
+    """
+    Returns the bookings starting in [start, end), optionally only in the given rooms
+
+    The time bounds are two binary searches over the sorted starts.
+    """
+    low = 0 if start is None else np.searchsorted(columns.start, start, side='left')
+    high = len(columns.start) if end is None else np.searchsorted(columns.start, end, side='left')
+    columns = BookingColumns(*(column[low:high] for column in columns))
+    if room_ids:
+        mask = np.isin(columns.id_room, room_ids)
+        columns = BookingColumns(*(column[mask] for column in columns))
+    return columns
+
+def count_days(columns: BookingColumns) -> int:
+    """
+    Returns the number of distinct days on which any booking starts
+    """
+    days = columns.start // MINUTES_PER_DAY
+    return int(np.count_nonzero(np.diff(days))) + 1 if len(days) else 0
+
+def daily_occupancy(columns: BookingColumns, open_minutes: int) -> dict:
+    """
+    Returns the booked share of open time per day, as a percentage
+
+    Bookings are sorted by start, so each day is a contiguous run and the booked minutes
+    of every day come from one np.add.reduceat.
+
+    Args:
+        columns (BookingColumns): The bookings to count, keyed by the day they start.
+        open_minutes (int): Open minutes per day across the rooms reported.
+    """
+    if not len(columns.start) or not open_minutes:
+        return {}
+    days = columns.start // MINUTES_PER_DAY
+    first_rows = np.flatnonzero(np.r_[True, np.diff(days) != 0])
+    booked = np.add.reduceat(columns.end - columns.start, first_rows)
+    return {
+        format_minutes(int(day) * MINUTES_PER_DAY)[:10]: round(float(minutes) / open_minutes * 100, 1)
+        for day, minutes in zip(days[first_rows], booked)
+    }
+
+def hourly_load(columns: BookingColumns) -> dict:
+    """
+    Returns the average number of bookings in progress in each hour of the day
+
+    The minutes a booking spends in hour h of any day is F(end) - F(start), where F(t) counts
+    the minutes before t that fall in hour h; this stays exact for bookings that cross
+    midnight. F summed over all bookings takes two bincounts per column. The total is
+    averaged over the days on which any booking starts.
+    """
+    days_in_range = count_days(columns)
+    if not days_in_range:
+        return {}
+    whole_days = int((columns.end // MINUTES_PER_DAY - columns.start // MINUTES_PER_DAY).sum())
+    booked = whole_days * 60 + _hour_profile(columns.end) - _hour_profile(columns.start)
+    return {f'{hour:02d}:00': round(float(minutes) / (60 * days_in_range), 2) for hour, minutes in enumerate(booked)}
+
+def _hour_profile(moments):
+    # Per hour h, the minutes of the moments' own day that fall in h before each moment
+    minute_of_day = moments % MINUTES_PER_DAY
+    hours = minute_of_day // 60
+    counts = np.bincount(hours, minlength=24)
+    later = counts[::-1].cumsum()[::-1] - counts
+    return 60 * later + np.bincount(hours, weights=minute_of_day % 60, minlength=24)
+
+def length_histogram(columns: BookingColumns, bin_minutes: int = 30) -> dict:
+    """
+    Counts bookings by length, in bins of 'bin_minutes' labelled 'low-high' in minutes
+    """
+    lengths = np.maximum(columns.end - columns.start, 0)
+    counts = np.bincount(lengths // bin_minutes) if len(lengths) else []
+    return {
+        f'{number * bin_minutes}-{(number + 1) * bin_minutes}': int(count)
+        for number, count in enumerate(counts) if count
+    }
+
+
+class ColumnCache:
+    """
+    The booking columns, loaded once and kept until the bookings change.
+
+    Shares the booking index's change tracking: its generation counter is bumped by every
+    write made through the API, and 'PRAGMA data_version' catches commits made elsewhere.
+    """
+
+    def __init__(self):
+        self._columns = None
+        self._generation = None
+
+    async def columns(self, session: AsyncSession) -> BookingColumns:
+        """
+        Returns the booking columns, loading them from the database if needed.
+        """
+        await booking_index.refresh(session)
+        generation = booking_index.generation
+        if self._columns is not None and self._generation == generation:
+            return self._columns
+
+        columns = await session.run_sync(load_columns)
+        if generation == booking_index.generation:
+            self._columns, self._generation = columns, generation
+        return columns
+
+
+booking_columns = ColumnCache()
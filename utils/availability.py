@@ -0,0 +1,35 @@
+from heapq import heappop, heappush
+
+def time_grid(start: int, end: int, step: int) -> list:
+    """
+    Returns the moments start, start + step, ... before end, in epoch minutes
+    """
+    return list(range(start, end, step))
+
+def headcounts_at(intervals, moments) -> list:
+    """
+    Returns the seats taken at each of the sorted 'moments'
+
+    The (start, end, seats) intervals, sorted by start, are merged against the moments in
+    one pass: intervals are pushed on a heap by end as their start is reached and popped
+    once they have ended, so the cost is O((n + m) log n) rather than n × m. As for a
+    single lookup, an interval counts at its start and end minute.
+
+    Args:
+        intervals (iterable): (start, end, seats) tuples in epoch minutes, sorted by start.
+        moments (iterable): Epoch minutes, sorted.
+    """
+    intervals = iter(intervals)
+    upcoming = next(intervals, None)
+    running = []
+    headcount = 0
+    headcounts = []
+    for moment in moments:
+        while upcoming is not None and upcoming[0] <= moment:
+            heappush(running, (upcoming[1], upcoming[2]))
+            headcount += upcoming[2]
+            upcoming = next(intervals, None)
+        while running and running[0][0] < moment:
+            headcount -= heappop(running)[1]
+        headcounts.append(headcount)
+    return headcounts
@@ -0,0 +1,63 @@
+import csv
+import io
+import json
+
+from utils.timestamps import parse_minutes_cached
+
+BOOKING_FIELDS = ('id_room', 'id_client', 'start', 'end')
+
+def read_booking_rows(body: bytes, content_type: str) -> list:
+    """
+    Reads booking rows from a JSON array or a CSV document with a header line
+
+    Args:
+        body (bytes): The request body.
+        content_type (str): The request content type; 'text/csv' selects CSV, anything else JSON.
+
+    Returns:
+        list: One dict per row.
+
+    Raises:
+        ValueError: If the body cannot be parsed.
+    """
+    text = body.decode('utf-8-sig')
+    if content_type.split(';')[0].strip() == 'text/csv':
+        return list(csv.DictReader(io.StringIO(text)))
+
+    rows = json.loads(text)
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise ValueError('Expected a JSON array of booking objects.')
+    return rows
+
+def validate_booking_rows(rows: list):
+    """
+    Checks the format of every row in one pass
+
+    Returns:
+        tuple: (valid rows with int ids and epoch-minute times, keyed by row number,
+                errors as a list of {'row', 'detail'} dicts)
+    """
+    valid = {}
+    errors = []
+    for number, row in enumerate(rows):
+        missing = [field for field in BOOKING_FIELDS if row.get(field) in (None, '')]
+        if missing:
+            errors.append({'row': number, 'detail': f'Missing {", ".join(missing)}'})
+            continue
+        try:
+            id_room = int(row['id_room'])
+            id_client = int(row['id_client'])
+        except (TypeError, ValueError):
+            errors.append({'row': number, 'detail': 'id_room and id_client must be integers'})
+            continue
+
+        times = {}
+        for field in ('start', 'end'):
+            try:
+                times[field] = parse_minutes_cached(str(row[field]))
+            except ValueError:
+                errors.append({'row': number, 'detail': f'Incorrect date format for {field} time'})
+                break
+        else:
+            valid[number] = {'id_room': id_room, 'id_client': id_client, **times}
+    return valid, errors
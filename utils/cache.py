@@ -0,0 +1,140 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from database.db import async_session
+from utils.interval_index import booking_index
+
+cache_size = int(os.environ.get('COWORKING_CACHE_SIZE', '1024'))
+cache_ttl = float(os.environ.get('COWORKING_CACHE_TTL', '300'))
+
+
+class CacheBackend:
+    """
+    Storage for cached responses.
+
+    'LRUCache' keeps them in process; a shared store such as Redis can be plugged in by
+    implementing the same three methods (e.g. GET, SET with EX, and FLUSHDB).
+    """
+
+    def get(self, key: str):
+        raise NotImplementedError
+
+    def set(self, key: str, value, ttl: float):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class LRUCache(CacheBackend):
+    """
+    In-process cache holding at most 'max_entries' values, each for at most its TTL in seconds.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+class ResponseCache:
+    """
+    Caches whole GET responses by route and query parameters.
+
+    Keys carry a generation counter that write paths bump with 'invalidate', plus the booking
+    index's generation, which also moves when another process commits to the database. Stale
+    entries are never read again and age out of the backend.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self._generation = 0
+
+    def invalidate(self):
+        """
+        Makes every cached response stale; called after each write.
+        """
+        self._generation += 1
+
+    async def key(self, request: Request) -> str:
+        """
+        Returns the cache key of a request, checking first for commits from other processes.
+        """
+        async with async_session() as session:
+            await booking_index.refresh(session)
+        query = '&'.join(sorted(f'{name}={value}' for name, value in request.query_params.multi_items()))
+        return f'{self._generation}.{booking_index.generation}:{request.url.path}?{query}'
+
+
+response_cache = ResponseCache(LRUCache(cache_size), cache_ttl)
+
+
+def cached(endpoint: Callable) -> Callable:
+    """
+    Marks a GET endpoint of a router using CachedRoute as cacheable.
+    """
+    endpoint.cache_response = True
+    return endpoint
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    return any(tag.strip() in (etag, f'W/{etag}', '*') for tag in if_none_match.split(','))
+
+
+class CachedRoute(APIRoute):
+    """
+    Route class serving endpoints marked with 'cached' from the response cache.
+
+    Every response carries an ETag of its body; a request whose If-None-Match matches it
+    gets an empty 304 instead of the payload.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        if not getattr(self.endpoint, 'cache_response', False):
+            return handler
+
+        async def cached_handler(request: Request) -> Response:
+            key = await response_cache.key(request)
+            entry = response_cache.backend.get(key)
+            if entry is None:
+                response = await handler(request)
+                if response.status_code != 200:
+                    return response
+                etag = f'"{hashlib.blake2b(response.body, digest_size=16).hexdigest()}"'
+                entry = (response.body, response.media_type, etag)
+                response_cache.backend.set(key, entry, response_cache.ttl)
+
+            body, media_type, etag = entry
+            headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+            if etag_matches(request.headers.get('if-none-match', ''), etag):
+                return Response(status_code=304, headers=headers)
+            return Response(content=body, media_type=media_type, headers=headers)
+
+        return cached_handler
@@ -0,0 +1,64 @@
+from sqlalchemy import func, select
+
+from database.models import Booking
+from database.types import minutes
+
+def client_bookings_query(start: int = None, end: int = None):
+    """
+    Builds 'SELECT id_client ... GROUP BY id_client' over bookings starting in [start, end)
+
+    Callers add the aggregates they need with add_columns; on ix_bookings_client_start a
+    count alone never reads the bookings table.
+    """
+    query = select(Booking.id_client).group_by(Booking.id_client)
+    if start is not None:
+        query = query.where(Booking.start >= start)
+    if end is not None:
+        query = query.where(Booking.start < end)
+    return query
+
+def count_bookings_per_client(start: int = None, end: int = None, top: int = None):
+    """
+    Builds the (id_client, bookings) query, busiest clients first when 'top' is given
+    """
+    booking_count = func.count()
+    query = client_bookings_query(start, end).add_columns(booking_count)
+    if top is None:
+        return query.order_by(Booking.id_client)
+    return query.order_by(booking_count.desc(), Booking.id_client).limit(top)
+
+def add_occurrence_counts(client_count: dict, occurrences, top: int = None) -> dict:
+    """
+    Adds one booking per recurring booking occurrence to the {id_client: bookings} counts
+
+    'client_count' must hold every client's count, not only the 'top' ones, since the
+    occurrences can change which clients are the busiest.
+    """
+    client_count = dict(client_count)
+    for occurrence in occurrences:
+        client_count[occurrence.id_client] = client_count.get(occurrence.id_client, 0) + 1
+    if top is None:
+        return dict(sorted(client_count.items()))
+    return dict(sorted(client_count.items(), key=lambda item: (-item[1], item[0]))[:top])
+
+def client_summary_query(client_id: int, start: int = None, end: int = None):
+    """
+    Builds the (id_client, bookings, total minutes, distinct rooms, last start) query of one client
+    """
+    return client_bookings_query(start, end).add_columns(
+        func.count(),
+        func.sum(minutes(Booking.end) - minutes(Booking.start)),
+        func.count(func.distinct(Booking.id_room)),
+        func.max(minutes(Booking.start)),
+    ).where(Booking.id_client == client_id)
+
+def client_rooms_query(client_id: int, start: int = None, end: int = None):
+    """
+    Builds the query of the distinct rooms one client booked, for bookings starting in [start, end)
+    """
+    query = select(Booking.id_room).distinct().where(Booking.id_client == client_id)
+    if start is not None:
+        query = query.where(Booking.start >= start)
+    if end is not None:
+        query = query.where(Booking.start < end)
+    return query
@@ -0,0 +1,116 @@
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import Booking, Client, RecurringBooking, Room
+from database.types import minutes
+from utils.occupancy import clip, peak_headcount
+from utils.recurrence import period_expression
+
+MINUTES_PER_DAY = 24 * 60
+
+def within_opening_hours(opening: int, closing: int, start: int, end: int) -> bool:
+    """
+    Checks a booking lies inside one day's opening hours
+
+    Args:
+        opening (int): Room opening time, in minutes since midnight.
+        closing (int): Room closing time, in minutes since midnight.
+        start (int): Booking start, in epoch minutes.
+        end (int): Booking end, in epoch minutes.
+    """
+    midnight = start - start % MINUTES_PER_DAY
+    return opening <= start - midnight and end - midnight <= closing
+
+def booking_checks(id_room: int, id_client: int, start: int, end: int):
+    """
+    Builds one query returning everything a new booking is checked against
+
+    Returns a single row: (client id or None, room opening or None, room closing, room
+    capacity, id of an overlapping booking or None, id of a recurring booking with an
+    overlapping occurrence or None), so a write needs one round trip before the insert.
+    """
+    return select(
+        select(Client.client_id).where(Client.client_id == id_client).scalar_subquery(),
+        select(minutes(Room.opening)).where(Room.room_id == id_room).scalar_subquery(),
+        select(minutes(Room.closing)).where(Room.room_id == id_room).scalar_subquery(),
+        select(Room.capacity).where(Room.room_id == id_room).scalar_subquery(),
+        conflict_query(id_room, start, end).scalar_subquery(),
+        recurring_conflict_query(id_room, start, end).scalar_subquery(),
+    )
+
+def overlap_filter(id_room: int, start: int, end: int):
+    """
+    Returns the WHERE clause of the room's bookings overlapping [start, end), bounded to a day before 'start'
+    """
+    return and_(
+        Booking.id_room == id_room,
+        Booking.start > start - MINUTES_PER_DAY,
+        Booking.start < end,
+        Booking.end > start,
+    )
+
+def conflict_query(id_room: int, start: int, end: int):
+    """
+    Selects the id of a booking in the room overlapping [start, end)
+
+    Runs one range query on ix_bookings_room_start_end. Bookings lie inside one day's
+    opening hours, so only those starting less than a day before 'start' are searched
+    rather than the room's whole history. Bookings that only touch (one ends when the
+    other starts) do not conflict.
+    """
+    return (
+        select(Booking.id)
+        .where(overlap_filter(id_room, start, end))
+        .limit(1)
+    )
+
+async def find_conflict(session: AsyncSession, id_room: int, start: int, end: int):
+    """
+    Returns the id of a booking in the room overlapping [start, end), or None
+    """
+    return await session.scalar(conflict_query(id_room, start, end))
+
+def recurring_overlap_query(id_room: int, start: int, end: int):
+    """
+    Selects (recurring booking id, occurrence start, occurrence end) for each rule of the room with an occurrence overlapping [start, end)
+
+    Both the booking and the occurrences lie inside one day's opening hours, so only the last
+    occurrence starting before 'end' can overlap; its start is found with integer division,
+    without expanding the rule.
+    """
+    period = period_expression()
+    rule_start = minutes(RecurringBooking.start)
+    candidate = rule_start + (end - 1 - rule_start) // period * period
+    candidate_end = candidate + minutes(RecurringBooking.end) - rule_start
+    return (
+        select(RecurringBooking.id, candidate, candidate_end)
+        .where(
+            RecurringBooking.id_room == id_room,
+            RecurringBooking.start < end,
+            RecurringBooking.until > start - MINUTES_PER_DAY,
+            candidate < minutes(RecurringBooking.until),
+            candidate_end > start,
+        )
+    )
+
+def recurring_conflict_query(id_room: int, start: int, end: int):
+    """
+    Selects the id of a recurring booking in the room with an occurrence overlapping [start, end)
+    """
+    return recurring_overlap_query(id_room, start, end).with_only_columns(RecurringBooking.id).limit(1)
+
+async def booked_seats(session: AsyncSession, id_room: int, capacity: int, start: int, end: int) -> int:
+    """
+    Returns the most seats of the room taken at any moment in [start, end)
+
+    Reads the bookings and recurring occurrences overlapping the window and sweeps their
+    start/end events; bookings without a headcount and occurrences take 'capacity' seats.
+    """
+    bookings = await session.execute(
+        select(minutes(Booking.start), minutes(Booking.end), Booking.headcount)
+        .where(overlap_filter(id_room, start, end))
+    )
+    intervals = [(booking_start, booking_end, capacity if headcount is None else headcount) for booking_start, booking_end, headcount in bookings]
+    occurrences = await session.execute(recurring_overlap_query(id_room, start, end))
+    intervals += [(occurrence_start, occurrence_end, capacity) for _, occurrence_start, occurrence_end in occurrences]
+    return peak_headcount(clip(intervals, start, end))[0]
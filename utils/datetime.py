@@ -1,6 +1,10 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+
+from utils.timestamps import format_minutes_cached, parse_minutes
 
 DATE_FORMAT = '%Y-%m-%d %H:%M'
+WIRE_FORMAT = '%Y-%m-%dT%H:%MZ'
+EPOCH = datetime(1970, 1, 1)
 
 def convert_time(time: str):
     """
@@ -13,5 +17,48 @@ def convert_time(time: str):
         datetime: A Datetime object   
     """
     
-    return datetime.strptime(time.split('T')[0] + ' ' + time.split('T')[1][:-1], DATE_FORMAT)
-    
\ No newline at end of file
+    return EPOCH + timedelta(minutes=parse_minutes(time))
+
+def to_epoch_minutes(time: str) -> int:
+    """
+    Returns the number of minutes between 1970-01-01T00:00Z and the given time
+
+    Args:
+        time (str): The time in YYYY-MM-DDTHH:MMZ format.
+
+    Returns:
+        int: Whole minutes since the epoch.
+    """
+    return parse_minutes(time)
+
+def from_epoch_minutes(minutes: int) -> str:
+    """
+    Returns the YYYY-MM-DDTHH:MMZ string for a number of minutes since the epoch
+
+    Args:
+        minutes (int): Whole minutes since 1970-01-01T00:00Z.
+
+    Returns:
+        str: The time in YYYY-MM-DDTHH:MMZ format.
+    """
+    return format_minutes_cached(minutes)
+
+def to_clock_minutes(time: str) -> int:
+    """
+    Returns the number of minutes since midnight of a time of day
+
+    Args:
+        time (str): The time in HH:MM format, from 00:00 to 23:59.
+
+    Returns:
+        int: Whole minutes since midnight.
+
+    Raises:
+        ValueError: If the time is not in HH:MM format or out of range.
+    """
+    hours, separator, minutes = time.partition(':')
+    if separator != ':' or len(hours) != 2 or len(minutes) != 2 or not (hours + minutes).isdigit():
+        raise ValueError(f'Not an HH:MM time: {time!r}')
+    if int(hours) > 23 or int(minutes) > 59:
+        raise ValueError(f'Not a time of day: {time!r}')
+    return int(hours) * 60 + int(minutes)
@@ -0,0 +1,58 @@
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import Booking, Client, Room
+from utils.interval_index import booking_index
+
+
+class TableExistence:
+    """
+    Cached answers to "does this table have any rows?", shared by the routes' emptiness checks.
+
+    Each answer is one 'SELECT EXISTS (SELECT 1 FROM table LIMIT 1)', which stops at the
+    first row, and is kept until the next write: routes call invalidate() after committing,
+    and commits from other connections or processes are caught through booking_index,
+    whose generation the answers are tied to. The index is refreshed once per session,
+    i.e. once per request, however many tables the request checks.
+    """
+
+    def __init__(self):
+        self._answers = {}
+        self._generation = 0
+
+    async def any_rows(self, session: AsyncSession, model) -> bool:
+        """
+        Returns True if the model's table holds at least one row.
+        """
+        if not session.info.get('table_existence_refreshed'):
+            await booking_index.refresh(session)
+            session.info['table_existence_refreshed'] = True
+        generation = (self._generation, booking_index.generation)
+        answer = self._answers.get(model)
+        if answer is not None and answer[0] == generation:
+            return answer[1]
+
+        primary_key = model.__table__.primary_key.columns.values()[0]
+        has_rows = await session.scalar(select(exists(select(primary_key).limit(1))))
+        if generation == (self._generation, booking_index.generation):
+            self._answers[model] = (generation, has_rows)
+        return has_rows
+
+    async def is_empty(self, session: AsyncSession) -> bool:
+        """
+        Returns True if there are no rooms, clients or bookings, i.e. no data has been loaded.
+        """
+        for model in (Room, Client, Booking):
+            if await self.any_rows(session, model):
+                return False
+        return True
+
+    def invalidate(self):
+        """
+        Forgets every answer; called after each write.
+        """
+        self._generation += 1
+        self._answers.clear()
+
+
+table_existence = TableExistence()
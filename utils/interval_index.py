@@ -0,0 +1,138 @@
+from bisect import bisect_right
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import Booking, Room
+from database.types import minutes
+
+
+class RoomIntervals:
+    """
+    Booking intervals of a single room, sorted by start time, with the seats each takes.
+
+    Alongside the sorted starts, a running maximum of the end times is kept so
+    "what is running at T?" is a bisect followed by a walk back over the bookings that
+    can still be running.
+    """
+
+    def __init__(self, intervals=(), capacity: int = None):
+        triples = sorted(intervals)
+        self.capacity = capacity
+        self.starts = [start for start, _, _ in triples]
+        self.ends = [end for _, end, _ in triples]
+        self.seats = [seats for _, _, seats in triples]
+        self.max_ends = []
+        self._refresh_max_ends(0)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _refresh_max_ends(self, position: int):
+        del self.max_ends[position:]
+        running = self.max_ends[-1] if self.max_ends else None
+        for end in self.ends[position:]:
+            running = end if running is None or end > running else running
+            self.max_ends.append(running)
+
+    def add(self, start: int, end: int, seats: int):
+        """
+        Inserts one interval, keeping the arrays sorted.
+        """
+        position = bisect_right(self.starts, start)
+        self.starts.insert(position, start)
+        self.ends.insert(position, end)
+        self.seats.insert(position, seats)
+        self._refresh_max_ends(position)
+
+    def headcount_at(self, moment: int) -> int:
+        """
+        Returns the seats taken by intervals with start <= moment <= end.
+        """
+        headcount = 0
+        position = bisect_right(self.starts, moment) - 1
+        while position >= 0 and self.max_ends[position] >= moment:
+            if self.ends[position] >= moment:
+                headcount += self.seats[position]
+            position -= 1
+        return headcount
+
+
+class BookingIndex:
+    """
+    In-process cache of per-room booking intervals, in epoch minutes, and room capacities.
+
+    Rooms are loaded lazily on first lookup. Writes made through the API update the
+    index directly; commits from any other connection or process are detected with
+    SQLite's 'PRAGMA data_version', which drops every cached room. A generation counter,
+    bumped by every write, stops a load that raced with a write from being cached.
+    """
+
+    def __init__(self):
+        self._rooms = {}
+        self._generation = 0
+
+    async def _changed_elsewhere(self, session: AsyncSession) -> bool:
+        connection = await session.connection()
+        version = (await connection.exec_driver_sql('PRAGMA data_version')).scalar()
+        info = (await connection.get_raw_connection()).info
+        last_seen = info.get('booking_index_data_version')
+        info['booking_index_data_version'] = version
+        return last_seen != version
+
+    @property
+    def generation(self) -> int:
+        """
+        Bumped by every write; caches built from the bookings compare it to know they are stale.
+        """
+        return self._generation
+
+    async def refresh(self, session: AsyncSession):
+        """
+        Drops every cached room if another connection has committed since this one last looked.
+        """
+        if await self._changed_elsewhere(session):
+            self.invalidate()
+
+    async def room(self, session: AsyncSession, room_id: int) -> RoomIntervals:
+        """
+        Returns the intervals of a room, loading them from the database if needed.
+
+        A room that does not exist comes back empty with a capacity of None, and is not cached.
+        Bookings without a headcount take the room's capacity.
+        """
+        await self.refresh(session)
+        if room_id in self._rooms:
+            return self._rooms[room_id]
+
+        generation = self._generation
+        capacity = await session.scalar(select(Room.capacity).where(Room.room_id == room_id))
+        if capacity is None:
+            return RoomIntervals()
+        rows = await session.execute(
+            select(minutes(Booking.start), minutes(Booking.end), Booking.headcount).where(Booking.id_room == room_id)
+        )
+        room_intervals = RoomIntervals(
+            ((start, end, capacity if headcount is None else headcount) for start, end, headcount in rows), capacity
+        )
+        if generation == self._generation:
+            self._rooms[room_id] = room_intervals
+        return room_intervals
+
+    def add(self, room_id: int, start: int, end: int, seats: int):
+        """
+        Records a booking of 'seats' seats that has just been committed.
+        """
+        self._generation += 1
+        if room_id in self._rooms:
+            self._rooms[room_id].add(start, end, seats)
+
+    def invalidate(self):
+        """
+        Drops every cached room, e.g. after a bulk write.
+        """
+        self._generation += 1
+        self._rooms.clear()
+
+
+booking_index = BookingIndex()
@@ -0,0 +1,228 @@
+"""
+Opt-in request metrics and profiling.
+
+Set COWORKING_METRICS=1 to record, per route, request latency and the number and duration
+of the SQL statements each request sends, and to serve them at /metrics in the Prometheus
+text format. With metrics on, a request sent with an 'X-Profile' header runs under cProfile
+and gets the profile back as text instead of its response body; the header's value may
+name a pstats sort key ('cumulative' by default, or 'tottime', 'calls', ...).
+"""
+import cProfile
+import io
+import os
+import pstats
+from bisect import bisect_left
+from contextvars import ContextVar
+from time import perf_counter
+
+from sqlalchemy import event
+from starlette.responses import PlainTextResponse
+
+metrics_enabled = os.environ.get('COWORKING_METRICS', '0') == '1'
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100, 250)
+PROFILE_HEADER = b'x-profile'
+PROFILE_SORT_KEYS = ('cumulative', 'tottime', 'calls', 'ncalls', 'time', 'filename', 'name')
+PROFILE_LINES = 50
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names: tuple, values: tuple, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    """
+    A Prometheus counter family: one running total per combination of label values.
+    """
+
+    def __init__(self, name: str, documentation: str, label_names: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.values = {}
+
+    def inc(self, label_values: tuple = (), amount: float = 1):
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def render(self) -> list:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        for label_values, value in sorted(self.values.items()):
+            lines.append(f'{self.name}{_labels(self.label_names, label_values)} {value}')
+        return lines
+
+
+class Histogram:
+    """
+    A Prometheus histogram family: bucket counts, sum and count per combination of label values.
+    """
+
+    def __init__(self, name: str, documentation: str, buckets: tuple, label_names: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.label_names = label_names
+        self.values = {}
+
+    def observe(self, value: float, label_values: tuple = ()):
+        counts, total, count = self.values.get(label_values) or ([0] * (len(self.buckets) + 1), 0, 0)
+        counts[bisect_left(self.buckets, value)] += 1
+        self.values[label_values] = (counts, total + value, count + 1)
+
+    def render(self) -> list:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for label_values, (counts, total, count) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += bucket_count
+                bucket_labels = _labels(self.label_names, label_values, f'le="{bound}"')
+                lines.append(f'{self.name}_bucket{bucket_labels} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.label_names, label_values)} {total}')
+            lines.append(f'{self.name}_count{_labels(self.label_names, label_values)} {count}')
+        return lines
+
+
+class Metrics:
+    """
+    The metrics served at /metrics.
+    """
+
+    def __init__(self):
+        request_labels = ('method', 'route')
+        self.requests = Counter('coworking_requests_total', 'Requests handled, by route and status.', request_labels + ('status',))
+        self.latency = Histogram('coworking_request_duration_seconds', 'Request latency, by route.', LATENCY_BUCKETS, request_labels)
+        self.statements = Histogram('coworking_request_sql_statements', 'SQL statements sent per request, by route.', STATEMENT_BUCKETS, request_labels)
+        self.sql_time = Histogram('coworking_request_sql_duration_seconds', 'Time spent in SQL per request, by route.', LATENCY_BUCKETS, request_labels)
+        self.all_statements = Counter('coworking_sql_statements_total', 'SQL statements sent, inside requests or not.')
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, usage: 'SqlUsage'):
+        labels = (method, route)
+        self.requests.inc(labels + (status,))
+        self.latency.observe(seconds, labels)
+        self.statements.observe(usage.statements, labels)
+        self.sql_time.observe(usage.seconds, labels)
+
+    def render(self) -> str:
+        families = (self.requests, self.latency, self.statements, self.sql_time, self.all_statements)
+        return '\n'.join(line for family in families for line in family.render()) + '\n'
+
+
+metrics = Metrics()
+
+
+class SqlUsage:
+    """
+    SQL statements sent, and seconds spent running them, on behalf of one request.
+    """
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+
+
+current_sql_usage = ContextVar('current_sql_usage', default=None)
+
+
+def _before_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+    connection.info.setdefault('metrics_started', []).append(perf_counter())
+
+
+def _after_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+    seconds = perf_counter() - connection.info['metrics_started'].pop()
+    metrics.all_statements.inc()
+    usage = current_sql_usage.get()
+    if usage is not None:
+        usage.statements += 1
+        usage.seconds += seconds
+
+
+def instrument_engine(engine):
+    """
+    Counts and times the statements of a (sync) engine; pass 'async_engine.sync_engine' for async ones.
+    """
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording each request's latency, status and SQL usage under its route template.
+
+    Requests that match no route are recorded as 'unmatched', so raw paths never become labels.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._profiling = False
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        sort_key = self._profile_sort_key(scope)
+        if sort_key is not None and not self._profiling:
+            await self._profile(scope, receive, send, sort_key)
+            return
+
+        status = 500
+        usage = SqlUsage()
+        token = current_sql_usage.set(usage)
+
+        async def send_and_record_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        started = perf_counter()
+        try:
+            await self.app(scope, receive, send_and_record_status)
+        finally:
+            current_sql_usage.reset(token)
+            route = scope.get('route')
+            route_path = getattr(route, 'path', 'unmatched')
+            metrics.observe_request(scope['method'], route_path, status, perf_counter() - started, usage)
+
+    @staticmethod
+    def _profile_sort_key(scope):
+        for name, value in scope['headers']:
+            if name == PROFILE_HEADER:
+                value = value.decode('latin-1').strip().lower()
+                return value if value in PROFILE_SORT_KEYS else 'cumulative'
+        return None
+
+    async def _profile(self, scope, receive, send, sort_key: str):
+        """
+        Runs the request under cProfile and answers with the profile instead of its body.
+
+        The profiler sees the whole thread, so other requests running at the same time show up
+        too; only one request is profiled at a time, and profiled requests are not recorded.
+        """
+        messages = []
+
+        async def capture(message):
+            messages.append(message)
+
+        profiler = cProfile.Profile()
+        self._profiling = True
+        profiler.enable()
+        try:
+            await self.app(scope, receive, capture)
+        finally:
+            profiler.disable()
+            self._profiling = False
+
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats(sort_key).print_stats(PROFILE_LINES)
+        status = next((message['status'] for message in messages if message['type'] == 'http.response.start'), 500)
+        response = PlainTextResponse(output.getvalue(), headers={'X-Profiled-Status': str(status)})
+        await response(scope, receive, send)
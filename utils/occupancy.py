@@ -0,0 +1,75 @@
+from heapq import heappop, heappush
+from itertools import chain, groupby
+from operator import itemgetter
+
+def clip(intervals, start: int = None, end: int = None) -> list:
+    """
+    Cuts (start, end, seats) intervals to [start, end), dropping those left empty
+    """
+    clipped = []
+    for interval_start, interval_end, seats in intervals:
+        if start is not None:
+            interval_start = max(interval_start, start)
+        if end is not None:
+            interval_end = min(interval_end, end)
+        if interval_start < interval_end:
+            clipped.append((interval_start, interval_end, seats))
+    return clipped
+
+def headcount_timeline(intervals):
+    """
+    Yields (moment, headcount) every time the seats taken by (start, end, seats) intervals change
+
+    The start and end events are sorted once, so the sweep is O(n log n). At equal moments
+    ends are applied before starts: bookings that only touch never count together.
+    """
+    events = sorted(chain(
+        ((start, seats) for start, _, seats in intervals),
+        ((end, -seats) for _, end, seats in intervals),
+    ))
+    headcount = 0
+    for moment, changes in groupby(events, key=itemgetter(0)):
+        change = sum(seats for _, seats in changes)
+        if change:
+            headcount += change
+            yield moment, headcount
+
+def peak_headcount(intervals):
+    """
+    Returns (highest headcount, moment it is first reached) of (start, end, seats) intervals, or (0, None)
+    """
+    peak, peak_at = 0, None
+    for moment, headcount in headcount_timeline(intervals):
+        if headcount > peak:
+            peak, peak_at = headcount, moment
+    return peak, peak_at
+
+def crowded_stretches(intervals, limit: int):
+    """
+    Yields the (start, end) stretches in which (start, end, seats) intervals take more than 'limit' seats
+
+    The intervals must be sorted by start. They are swept lazily with a heap of running ends,
+    so callers merging the stretches against something else read the intervals only once.
+    Ends are applied before starts at the same moment, as in headcount_timeline.
+    """
+    running = []
+    headcount = 0
+    crowded_from = None
+
+    def release(until):
+        nonlocal headcount, crowded_from
+        while running and (until is None or running[0][0] <= until):
+            moment = running[0][0]
+            while running and running[0][0] == moment:
+                headcount -= heappop(running)[1]
+            if crowded_from is not None and headcount <= limit:
+                yield crowded_from, moment
+                crowded_from = None
+
+    for start, end, seats in intervals:
+        yield from release(start)
+        heappush(running, (end, seats))
+        headcount += seats
+        if crowded_from is None and headcount > limit:
+            crowded_from = start
+    yield from release(None)
@@ -1,36 +1,59 @@
-from utils.datetime import convert_time
+from heapq import heappop, heappush
+from operator import itemgetter
 
-def overlap(booking1, booking2):
-    if booking1.id_room != booking2.id_room:
-        return False
-    else:
-        start1 = booking1.start
-        end1 = booking1.end
-        start2 = booking2.start
-        end2 = booking2.end
-        start1_date_time = convert_time(start1)
-        end1_date_time = convert_time(end1)
-        start2_date_time = convert_time(start2)
-        end2_date_time = convert_time(end2)
-        return start1_date_time < end2_date_time and start2_date_time < end1_date_time
+def find_overlapping_pairs(intervals, capacities: dict = None):
+    """
+    Returns every pair of overlapping bookings in the same room that together overfill it, each pair once.
+
+    Bookings are grouped by room, sorted once by start and swept with a heap of the
+    bookings still running and their total seats, so the cost is O(n log n + k) for k
+    reported pairs. When a booking starts and the seats taken, its own included, exceed
+    the room's capacity, it is paired with every booking running at that moment. Rooms
+    missing from 'capacities' hold one booking at a time, so every overlap is reported.
+
+    Args:
+        intervals (iterable): (booking, start, end, seats) tuples, with start and end in epoch minutes;
+            bookings are rows or namedtuples with an id_room field.
+        capacities (dict, optional): Seats per room id.
+
+    Returns:
+        list: (earlier booking, later booking) tuples.
+    """
+    capacities = capacities or {}
+    rooms = {}
+    for booking, start, end, seats in intervals:
+        rooms.setdefault(booking.id_room, []).append((start, end, seats, booking))
 
-def check_overlap(bookings):
-    overlapping_bookings = []
+    overlapping_pairs = []
+    for id_room, room_intervals in rooms.items():
+        capacity = capacities.get(id_room)
+        room_intervals.sort(key=itemgetter(0, 1))
+        active = []
+        headcount = 0
+        for position, (start, end, seats, booking) in enumerate(room_intervals):
+            while active and active[0][0] <= start:
+                headcount -= heappop(active)[3]
+            if capacity is None or headcount + seats > capacity:
+                for _, _, active_start, _, active_booking in active:
+                    if active_start < end:
+                        overlapping_pairs.append((active_booking, booking))
+            heappush(active, (end, position, start, seats, booking))
+            headcount += seats
+    return overlapping_pairs
 
-    for i, booking1 in enumerate(bookings):
-        for j, booking2 in enumerate(bookings):
-            if i != j and overlap(booking1, booking2):
-                overlapping_bookings.append((booking1, booking2))
+def check_overlap(intervals, capacities: dict = None, offset: int = 0, limit: int = None):
+    overlapping_bookings = find_overlapping_pairs(intervals, capacities)
     
     if len(overlapping_bookings) == 0:
         return {'message': 'No overlapping bookings'}
     else:
+        page_end = None if limit is None else offset + limit
         overlapping_list = []
-        for booking_pair in overlapping_bookings:
+        for booking_pair in overlapping_bookings[offset:page_end]:
             overlapping_dict = {
-                'booking1': booking_pair[0],
-                'booking2': booking_pair[1]
+                'booking1': booking_pair[0]._asdict(),
+                'booking2': booking_pair[1]._asdict()
             }
             overlapping_list.append(overlapping_dict)
         
-        return {f'{len(overlapping_list)} Overlapping bookings found':  overlapping_list}
\ No newline at end of file
+        return {f'{len(overlapping_bookings)} Overlapping bookings found':  overlapping_list}
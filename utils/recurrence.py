@@ -0,0 +1,167 @@
+from collections import namedtuple
+from heapq import heappop, heappush, merge
+from operator import attrgetter
+
+from sqlalchemy import case, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import RecurringBooking
+from database.types import minutes
+from utils.datetime import from_epoch_minutes
+
+MINUTES_PER_DAY = 24 * 60
+FREQUENCIES = {'DAILY': MINUTES_PER_DAY, 'WEEKLY': 7 * MINUTES_PER_DAY}
+
+Occurrence = namedtuple('Occurrence', ['recurring_id', 'id_room', 'id_client', 'start', 'end'])
+
+def rule_period(frequency: str, interval: int) -> int:
+    """
+    Returns the minutes between two occurrences of a rule
+    """
+    return FREQUENCIES[frequency] * interval
+
+def period_expression():
+    """
+    Returns the SQL expression of rule_period for a recurring_bookings row
+    """
+    return case(FREQUENCIES, value=RecurringBooking.frequency, else_=MINUTES_PER_DAY) * RecurringBooking.interval
+
+def occurrences(start: int, end: int, period: int, until: int, window_start: int = None, window_end: int = None):
+    """
+    Yields the (start, end) occurrences of a rule that overlap [window_start, window_end)
+
+    The first occurrence ending after 'window_start' is found arithmetically, so the cost
+    is the number of occurrences inside the window, not since the rule began.
+
+    Args:
+        start (int): First occurrence start, in epoch minutes.
+        end (int): First occurrence end, in epoch minutes.
+        period (int): Minutes between occurrences, longer than one occurrence.
+        until (int): Occurrences start before this, in epoch minutes.
+        window_start (int, optional): Window start, in epoch minutes.
+        window_end (int, optional): Window end, in epoch minutes.
+    """
+    number = 0 if window_start is None or window_start < end else (window_start - end) // period + 1
+    occurrence_start = start + number * period
+    last_start = until if window_end is None else min(until, window_end)
+    while occurrence_start < last_start:
+        yield occurrence_start, occurrence_start + end - start
+        occurrence_start += period
+
+def expand(rules, window_start: int = None, window_end: int = None):
+    """
+    Yields an Occurrence for every occurrence of the rules overlapping [window_start, window_end), earliest first
+
+    Each rule is expanded lazily and the rules are merged by start, so callers can stop early.
+
+    Args:
+        rules (iterable): Rows of rules_query.
+    """
+    def rule_occurrences(rule):
+        period = rule_period(rule.frequency, rule.interval)
+        for start, end in occurrences(rule.start, rule.end, period, rule.until, window_start, window_end):
+            yield Occurrence(rule.id, rule.id_room, rule.id_client, start, end)
+
+    return merge(*(rule_occurrences(rule) for rule in rules), key=attrgetter('start'))
+
+def with_wire_times(occurrence: Occurrence) -> Occurrence:
+    """
+    Returns the occurrence with its times as YYYY-MM-DDTHH:MMZ strings
+    """
+    return occurrence._replace(start=from_epoch_minutes(occurrence.start), end=from_epoch_minutes(occurrence.end))
+
+def rules_query(start: int = None, end: int = None, room_ids: list = None):
+    """
+    Selects the rules that may have an occurrence overlapping [start, end), with times in epoch minutes
+
+    Occurrences lie inside one day's opening hours, so a rule whose 'until' is more than a day
+    before 'start' cannot reach the window. Both bounds run on ix_recurring_bookings_room_start_until.
+    """
+    query = select(
+        RecurringBooking.id,
+        RecurringBooking.id_room,
+        RecurringBooking.id_client,
+        minutes(RecurringBooking.start).label('start'),
+        minutes(RecurringBooking.end).label('end'),
+        RecurringBooking.frequency,
+        RecurringBooking.interval,
+        minutes(RecurringBooking.until).label('until'),
+    ).order_by(RecurringBooking.id)
+    if start is not None:
+        query = query.where(RecurringBooking.until > start - MINUTES_PER_DAY)
+    if end is not None:
+        query = query.where(RecurringBooking.start < end)
+    if room_ids:
+        query = query.where(RecurringBooking.id_room.in_(room_ids))
+    return query
+
+async def load_occurrences(session: AsyncSession, start: int = None, end: int = None, room_ids: list = None):
+    """
+    Returns a generator of the occurrences overlapping [start, end), earliest first
+    """
+    rules = (await session.execute(rules_query(start, end, room_ids))).all()
+    return expand(rules, start, end)
+
+async def load_occurrences_starting(session: AsyncSession, start: int = None, end: int = None, room_ids: list = None) -> list:
+    """
+    Returns the occurrences starting in [start, end), earliest first, as the reports counting bookings by start need
+    """
+    return [
+        occurrence for occurrence in await load_occurrences(session, start, end, room_ids)
+        if start is None or occurrence.start >= start
+    ]
+
+def first_overlap(intervals, others):
+    """
+    Returns the first item of 'others' overlapping one of 'intervals', or None
+
+    Both are iterables of (start, end, ...) tuples sorted by start, and intervals on the same
+    side may overlap each other. They are swept together once, keeping the latest end seen
+    on each side. Intervals that only touch do not overlap.
+    """
+    latest = [None, None]
+    sides = merge(
+        ((interval[0], 0, interval) for interval in intervals),
+        ((other[0], 1, other) for other in others),
+        key=lambda entry: entry[:2],
+    )
+    for start, side, item in sides:
+        running = latest[1 - side]
+        if running is not None and start < running[1]:
+            return item if side == 1 else running
+        if latest[side] is None or item[1] > latest[side][1]:
+            latest[side] = item
+    return None
+
+def find_overlaps(intervals, others) -> dict:
+    """
+    Returns {interval: an item of 'others' overlapping it} for every interval that overlaps one
+
+    Takes the same inputs as first_overlap and sweeps them together once, but runs to the
+    end: an interval starting while an other is still running is matched when it starts,
+    and the intervals still running when an other starts are matched then. Intervals must
+    be distinct, e.g. by carrying a row number. Intervals that only touch do not overlap.
+    """
+    found = {}
+    latest = None
+    running = []
+    sides = merge(
+        ((interval[0], 0, position, interval) for position, interval in enumerate(intervals)),
+        ((other[0], 1, position, other) for position, other in enumerate(others)),
+        key=lambda entry: entry[:2],
+    )
+    for start, side, position, item in sides:
+        if side == 0:
+            if latest is not None and start < latest[1]:
+                found[item] = latest
+            else:
+                heappush(running, (item[1], position, item))
+            continue
+        while running and running[0][0] <= start:
+            heappop(running)
+        for _, _, interval in running:
+            found[interval] = item
+        running.clear()
+        if latest is None or item[1] > latest[1]:
+            latest = item
+    return found
@@ -0,0 +1,101 @@
+from heapq import merge
+from itertools import islice
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import Room, Booking
+from database.types import minutes
+from utils.occupancy import crowded_stretches
+from utils.recurrence import load_occurrences
+
+MINUTES_PER_DAY = 24 * 60
+
+def room_free_slots(opening: int, closing: int, busy, start: int, end: int, min_duration: int):
+    """
+    Yields the free (start, end) intervals of one room inside [start, end)
+
+    Walks the room's opening hours day by day and subtracts the booked intervals in a
+    single merge pass, so the bookings must be sorted by start. Overlapping bookings are
+    fine; a booking running past closing time is carried over to the next day.
+
+    Args:
+        opening (int): Room opening time, in minutes since midnight.
+        closing (int): Room closing time, in minutes since midnight.
+        busy (iterable): (start, end) bookings in epoch minutes, sorted by start.
+        start (int): Window start, in epoch minutes.
+        end (int): Window end, in epoch minutes.
+        min_duration (int): Shortest slot to report, in minutes.
+    """
+    busy = iter(busy)
+    current = next(busy, None)
+    day = start - start % MINUTES_PER_DAY
+
+    while day < end:
+        cursor = max(day + opening, start)
+        day_end = min(day + closing, end)
+        while current is not None and current[0] < day_end:
+            busy_start, busy_end = current
+            if busy_start - cursor >= min_duration:
+                yield cursor, busy_start
+            cursor = max(cursor, busy_end)
+            if busy_end > day_end:
+                break
+            current = next(busy, None)
+        if day_end - cursor >= min_duration:
+            yield cursor, day_end
+        day += MINUTES_PER_DAY
+
+async def find_free_slots(session: AsyncSession, start: int, end: int, min_duration: int, min_capacity: int = 0, limit: int = None, seats: int = 1):
+    """
+    Returns slots with at least 'seats' seats free across every room with at least 'min_capacity' seats
+
+    Runs three queries: the matching rooms, their bookings in the window ordered by room
+    and start (bookings last less than a day, so only those starting up to a day before the
+    window are read, as a range on start), and the recurring bookings reaching into the
+    window, whose occurrences there are merged into each room's bookings. A room is busy
+    while its bookings leave fewer than 'seats' seats free: bookings without a headcount and
+    occurrences take the whole room, and the headcounts are swept by crowded_stretches as
+    the slots are walked. The per-room slot generators are merged lazily by start time, so
+    a 'limit' stops the walk early.
+
+    Returns:
+        list: (room_id, slot start, slot end) tuples in epoch minutes, earliest first.
+    """
+    min_capacity = max(min_capacity, seats)
+    rooms = (await session.execute(
+        select(Room.room_id, minutes(Room.opening), minutes(Room.closing), Room.capacity)
+        .where(Room.capacity >= min_capacity)
+        .order_by(Room.room_id)
+    )).all()
+    if not rooms:
+        return []
+    capacities = {room_id: capacity for room_id, _, _, capacity in rooms}
+
+    query = (
+        select(Booking.id_room, minutes(Booking.start), minutes(Booking.end), Booking.headcount)
+        .where(Booking.start > start - MINUTES_PER_DAY, Booking.start < end, Booking.end > start)
+        .order_by(Booking.id_room, Booking.start)
+    )
+    room_ids = None
+    if await session.scalar(select(Room.room_id).where(Room.capacity < min_capacity).limit(1)) is not None:
+        room_ids = list(capacities)
+        query = query.where(Booking.id_room.in_(room_ids))
+
+    busy_by_room = {}
+    for id_room, busy_start, busy_end, headcount in await session.execute(query):
+        busy_by_room.setdefault(id_room, []).append((busy_start, busy_end, capacities.get(id_room, 0) if headcount is None else headcount))
+
+    room_occurrences = {}
+    for occurrence in await load_occurrences(session, start, end, room_ids):
+        room_occurrences.setdefault(occurrence.id_room, []).append((occurrence.start, occurrence.end, capacities.get(occurrence.id_room, 0)))
+    for id_room, occurrence_intervals in room_occurrences.items():
+        busy_by_room[id_room] = list(merge(busy_by_room.get(id_room, ()), occurrence_intervals))
+
+    def room_slots(room_id, opening, closing, capacity):
+        busy = crowded_stretches(busy_by_room.get(room_id, ()), capacity - seats)
+        for slot_start, slot_end in room_free_slots(opening, closing, busy, start, end, min_duration):
+            yield room_id, slot_start, slot_end
+
+    slots = merge(*(room_slots(*room) for room in rooms), key=lambda slot: (slot[1], slot[0]))
+    return list(islice(slots, limit))
@@ -0,0 +1,122 @@
+from array import array
+from datetime import date
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+MINUTES_PER_DAY = 24 * 60
+PARSE_CACHE_SIZE = 65536
+
+# Character offsets of the separators in 'YYYY-MM-DDTHH:MMZ'
+SEPARATORS = ((4, '-'), (7, '-'), (10, 'T'), (13, ':'), (16, 'Z'))
+TIMESTAMP_LENGTH = 17
+
+def parse_minutes(value: str) -> int:
+    """
+    Returns the epoch minutes of a 'YYYY-MM-DDTHH:MMZ' timestamp
+
+    Reads each field at its fixed offset instead of going through strptime.
+
+    Args:
+        value (str): The time in YYYY-MM-DDTHH:MMZ format.
+
+    Returns:
+        int: Whole minutes since 1970-01-01T00:00Z.
+
+    Raises:
+        ValueError: If the value does not follow the layout or is not a real date and time.
+    """
+    if (len(value) != TIMESTAMP_LENGTH or value[4] != '-' or value[7] != '-' or value[10] != 'T'
+            or value[13] != ':' or value[16] != 'Z' or not value.isascii()):
+        raise ValueError(f'Invalid timestamp {value!r}, expected YYYY-MM-DDTHH:MMZ.')
+    year, month, day, hour, minute = value[0:4], value[5:7], value[8:10], value[11:13], value[14:16]
+    if not (year + month + day + hour + minute).isdigit():
+        raise ValueError(f'Invalid timestamp {value!r}, expected YYYY-MM-DDTHH:MMZ.')
+    hour, minute = int(hour), int(minute)
+    if hour > 23 or minute > 59:
+        raise ValueError(f'Invalid timestamp {value!r}, time out of range.')
+    return (date(int(year), int(month), int(day)).toordinal() - EPOCH_ORDINAL) * MINUTES_PER_DAY + hour * 60 + minute
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_minutes_cached(value: str) -> int:
+    """
+    parse_minutes behind a bounded LRU cache, for inputs that repeat the same timestamps
+    """
+    return parse_minutes(value)
+
+def format_minutes(minutes: int) -> str:
+    """
+    Returns the 'YYYY-MM-DDTHH:MMZ' timestamp of a number of epoch minutes
+    """
+    days, minute_of_day = divmod(minutes, MINUTES_PER_DAY)
+    return f'{date.fromordinal(days + EPOCH_ORDINAL).isoformat()}T{minute_of_day // 60:02d}:{minute_of_day % 60:02d}Z'
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def format_minutes_cached(minutes: int) -> str:
+    """
+    format_minutes behind a bounded LRU cache, for result columns that repeat the same times
+    """
+    return format_minutes(minutes)
+
+def parse_many(values, numpy: bool = False):
+    """
+    Parses a column of 'YYYY-MM-DDTHH:MMZ' timestamps into epoch minutes
+
+    Args:
+        values (iterable): The timestamps.
+        numpy (bool, optional): Return a NumPy int64 array, parsed with vectorized
+            arithmetic over the raw bytes. Requires NumPy. Defaults to False.
+
+    Returns:
+        array('q') or numpy.ndarray: The epoch minutes, in input order.
+
+    Raises:
+        ValueError: If any value is not a valid timestamp.
+    """
+    if not numpy:
+        return array('q', map(parse_minutes_cached, values))
+    if np is None:
+        raise ImportError('parse_many(numpy=True) requires NumPy.')
+    return _parse_many_numpy(values)
+
+def _parse_many_numpy(values):
+    try:
+        # One spare byte per row: longer values leave it non-zero, shorter ones misplace a separator
+        raw = np.asarray(values, dtype=f'S{TIMESTAMP_LENGTH + 1}')
+    except UnicodeEncodeError:
+        raise ValueError('Invalid timestamp, expected YYYY-MM-DDTHH:MMZ.')
+    raw = raw.reshape(-1).view(np.uint8).reshape(-1, TIMESTAMP_LENGTH + 1)
+
+    valid = raw[:, TIMESTAMP_LENGTH] == 0
+    for offset, separator in SEPARATORS:
+        valid &= raw[:, offset] == ord(separator)
+    digits = raw[:, [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15]].astype(np.int64) - ord('0')
+    valid &= ((digits >= 0) & (digits <= 9)).all(axis=1)
+
+    year = digits[:, 0] * 1000 + digits[:, 1] * 100 + digits[:, 2] * 10 + digits[:, 3]
+    month = digits[:, 4] * 10 + digits[:, 5]
+    day = digits[:, 6] * 10 + digits[:, 7]
+    hour = digits[:, 8] * 10 + digits[:, 9]
+    minute = digits[:, 10] * 10 + digits[:, 11]
+
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    month_days = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])[np.clip(month, 1, 12) - 1]
+    month_days += leap & (month == 2)
+    valid &= (year >= 1) & (month >= 1) & (month <= 12) & (day >= 1) & (day <= month_days)
+    valid &= (hour <= 23) & (minute <= 59)
+    if not valid.all():
+        bad = raw[np.argmin(valid)].tobytes().rstrip(b'\0').decode('ascii', 'replace')
+        raise ValueError(f'Invalid timestamp {bad!r}, expected YYYY-MM-DDTHH:MMZ.')
+
+    # Days from the civil calendar, counting years from March so leap days fall last
+    shifted_year = year - (month <= 2)
+    era = shifted_year // 400
+    year_of_era = shifted_year - era * 400
+    day_of_year = (153 * (month + np.where(month > 2, -3, 9)) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    days = era * 146097 + day_of_era - 719468
+    return days * MINUTES_PER_DAY + hour * 60 + minute
@@ -1,80 +1,147 @@
-from datetime import datetime, timedelta
+from sqlalchemy import and_, func, select
 
-from database.models import Room, Booking
+from database.models import Room, Booking, RoomDailyUsage
 from database.db import Session
+from database.types import minutes
+from utils.recurrence import expand, rules_query
 
-from utils.datetime import convert_time
+MINUTES_PER_DAY = 24 * 60
 
-def room_open_hours(session: Session):
+def room_usage_query(start: int = None, end: int = None, room_ids: list = None):
     """
-    Calculates how long each room is open in a day
+    Builds the grouped usage query
+
+    Returns one row per room: (room_id, open minutes per day, booked minutes, days in range),
+    where days in range is the number of distinct days on which any booking starts.
+    'start'/'end' (epoch minutes) limit the bookings counted to those starting in [start, end), and
+    'room_ids' limits the rooms reported; days in range always covers every room.
     """
-    rooms = session.query(Room).all()
-    rooms_open_hours = {}
-    for room in rooms:
-        open_time = datetime.strptime(room.opening, '%H:%M')
-        close_time = datetime.strptime(room.closing, '%H:%M')
-        rooms_open_hours[room.room_id] = (close_time - open_time).total_seconds() / 3600
-    return rooms_open_hours
-
-def total_days_in_range(session: Session):
+    booking_filters = []
+    if start is not None:
+        booking_filters.append(Booking.start >= start)
+    if end is not None:
+        booking_filters.append(Booking.start < end)
+
+    open_minutes = minutes(Room.closing) - minutes(Room.opening)
+    booked_minutes = func.coalesce(func.sum(minutes(Booking.end) - minutes(Booking.start)), 0)
+    days_in_range = select(
+        func.count(func.distinct(minutes(Booking.start) // MINUTES_PER_DAY))
+    ).where(*booking_filters).scalar_subquery()
+
+    query = (
+        select(Room.room_id, open_minutes, booked_minutes, days_in_range)
+        .outerjoin(Booking, and_(Booking.id_room == Room.room_id, *booking_filters))
+        .group_by(Room.room_id)
+    )
+    if room_ids:
+        query = query.where(Room.room_id.in_(room_ids))
+    return query
+
+def rollup_usage_query(first_day: int = None, end_day: int = None, room_ids: list = None):
     """
-    Calculates the number of days in the range of bookings
+    Builds the same grouped usage query over the room_daily_usage rollup
+
+    Counts the days in [first_day, end_day), in whole days since the epoch, so it reads one
+    row per room and day with bookings instead of one per booking.
     """
-    bookings = session.query(Booking).all()
-    date_list = []
-    for booking in bookings:
-        date_list.append(convert_time(booking.start))
-    unique_dates = set(date.date() for date in date_list)
-    return len(unique_dates)
-
-def total_bookings_per_room(session: Session):
+    day_filters = []
+    if first_day is not None:
+        day_filters.append(RoomDailyUsage.day >= first_day)
+    if end_day is not None:
+        day_filters.append(RoomDailyUsage.day < end_day)
+
+    open_minutes = minutes(Room.closing) - minutes(Room.opening)
+    booked_minutes = func.coalesce(func.sum(RoomDailyUsage.booked_minutes), 0)
+    days_in_range = select(func.count(func.distinct(RoomDailyUsage.day))).where(*day_filters).scalar_subquery()
+
+    query = (
+        select(Room.room_id, open_minutes, booked_minutes, days_in_range)
+        .outerjoin(RoomDailyUsage, and_(RoomDailyUsage.id_room == Room.room_id, *day_filters))
+        .group_by(Room.room_id)
+    )
+    if room_ids:
+        query = query.where(Room.room_id.in_(room_ids))
+    return query
+
+def booked_days_query(start: int = None, end: int = None, rollup: bool = False):
     """
-    Calculates total time each room was used
+    Selects the distinct days, in whole days since the epoch, on which a booking starts in [start, end)
+
+    With 'rollup', reads room_daily_usage and expects 'start'/'end' on midnight.
     """
-    bookings = session.query(Booking).all()
-    total_room_usage = {}
-    for booking in bookings:
-        room_id = booking.id_room
-        start = convert_time(booking.start)
-        end = convert_time(booking.end)
-        booking_time = end - start
-
-        if room_id not in total_room_usage:
-            total_room_usage[room_id] = booking_time
-        else:
-            total_room_usage[room_id] += booking_time
-    return total_room_usage
+    if rollup:
+        day = RoomDailyUsage.day
+        filters = [RoomDailyUsage.day >= start // MINUTES_PER_DAY] if start is not None else []
+        if end is not None:
+            filters.append(RoomDailyUsage.day < end // MINUTES_PER_DAY)
+    else:
+        day = minutes(Booking.start) // MINUTES_PER_DAY
+        filters = [Booking.start >= start] if start is not None else []
+        if end is not None:
+            filters.append(Booking.start < end)
+    return select(day).where(*filters).distinct()
 
-def total_open_hours_per_room(session: Session):
+def add_occurrences(rows, booked_days, rules, start: int = None, end: int = None) -> list:
     """
-    Calculates total time each room is open
+    Adds the occurrences of recurring bookings starting in [start, end) to usage query rows
+
+    Each occurrence counts like a booking: its minutes towards its room, and its day towards
+    the days in range. Only the occurrences inside the window are expanded.
+
+    Args:
+        rows (iterable): (room_id, open minutes per day, booked minutes, days in range) rows.
+        booked_days (iterable): Days on which a booking starts in the window.
+        rules (iterable): Rows of rules_query.
     """
-    open_hours = {}
-    rooms_open_hours = room_open_hours(session)
-    num_unique_dates = total_days_in_range(session)
-    for key, value in rooms_open_hours.items():
-        open_hours[key] = timedelta(hours=value * num_unique_dates)
-    return open_hours
-
-def calculate_percentage_per_room(session: Session):
+    occurrence_minutes = {}
+    days = set(booked_days)
+    for occurrence in expand(rules, start, end):
+        if start is not None and occurrence.start < start:
+            continue
+        occurrence_minutes[occurrence.id_room] = occurrence_minutes.get(occurrence.id_room, 0) + occurrence.end - occurrence.start
+        days.add(occurrence.start // MINUTES_PER_DAY)
+    return [
+        (room_id, open_minutes, booked_minutes + occurrence_minutes.get(room_id, 0), len(days))
+        for room_id, open_minutes, booked_minutes, _ in rows
+    ]
+
+def calculate_percentage_per_room(session: Session, start: int = None, end: int = None, room_ids: list = None):
     """
     Calculates time room was used against open as a percentage
+
+    Reads the room_daily_usage rollup when the window starts and ends on midnight (or is
+    open), and the bookings themselves for windows that cut through a day. Occurrences of
+    recurring bookings are expanded for the window only and added on top.
+    """
+    rollup = all(bound is None or bound % MINUTES_PER_DAY == 0 for bound in (start, end))
+    if rollup:
+        query = rollup_usage_query(
+            None if start is None else start // MINUTES_PER_DAY,
+            None if end is None else end // MINUTES_PER_DAY,
+            room_ids,
+        )
+    else:
+        query = room_usage_query(start, end, room_ids)
+
+    rules = session.execute(rules_query(start, end)).all()
+    if not rules:
+        return percentages(session.execute(query))
+    booked_days = session.scalars(booked_days_query(start, end, rollup))
+    return percentages(add_occurrences(session.execute(query).all(), booked_days, rules, start, end))
+
+def percentages(rows) -> dict:
+    """
+    Turns (room_id, open minutes per day, booked minutes, days in range) rows into percentages
     """
-    bookings_per_room = total_bookings_per_room(session)
-    open_hours_per_room = total_open_hours_per_room(session)
     percentage_dict = {}
-    
-    for room_id, timedelta1 in open_hours_per_room.items():
-        if room_id in bookings_per_room:
-            timedelta2 = bookings_per_room[room_id]
-            if timedelta1.total_seconds() == 0:
-                percentage = 0.0
-            else:
-                percentage = round((timedelta2.total_seconds() / timedelta1.total_seconds()) * 100, 0)
-        else:
+
+    for room_id, open_minutes, booked_minutes, days_in_range in rows:
+        available_minutes = open_minutes * days_in_range
+        if available_minutes == 0:
             percentage = 0.0
-        
+        else:
+            percentage = round((booked_minutes / available_minutes) * 100, 0)
+
         percentage_dict[room_id] = f'{percentage}%'
-    
-    return percentage_dict
\ No newline at end of file
+
+    return percentage_dict